@@ -0,0 +1,98 @@
+"""Response size and encode/decode cost of the API's wire formats.
+
+    python -m benchmarks.api_formats [--page-size 100]
+
+Takes one page of movies (all fields) and one page of reviews as the views
+produce them, then renders each with DRF's stock ``JSONRenderer``, the orjson
+``FastJSONRenderer`` and ``MessagePackRenderer``, and parses the bytes back
+with the matching client-side decoder.
+"""
+
+import argparse
+import json
+
+from benchmarks.harness import api_view, benchmark_database, measure, print_table, seed_movies, setup, summarize
+
+
+def seed_reviews(movie, count):
+    # pylint: disable=import-outside-toplevel
+    from decimal import Decimal
+
+    from django.contrib.auth import get_user_model
+
+    from reviews.models import Rating, Review
+
+    User = get_user_model()
+    users = User.objects.bulk_create(
+        [User(username=f"critic{i}", email=f"critic{i}@bench.local") for i in range(count)]
+    )
+    Rating.objects.bulk_create(
+        [Rating(movie=movie, user=user, score=Decimal(i % 11) / 2) for i, user in enumerate(users)]
+    )
+    text = "A long, patient film about memory and winter light. " * 8
+    Review.objects.bulk_create([Review(movie=movie, user=user, text=f"{text}#{i}") for i, user in enumerate(users)])
+
+
+def pages(page_size):
+    # pylint: disable=import-outside-toplevel
+    from movies.models import Movie
+    from movies.serializers import MovieSerializer
+    from movies.views_api import MovieViewSet
+    from reviews.views import ReviewViewSet
+
+    movie_view, factory = api_view(MovieViewSet)
+    params = {"fields": ",".join(MovieSerializer.Meta.fields), "page_size": page_size}
+    movies = movie_view(factory.get("/api/v1/movies/", params)).data
+
+    movie = Movie.objects.order_by("id").first()
+    seed_reviews(movie, page_size)
+    review_view, _ = api_view(ReviewViewSet, pagination_class=None)
+    reviews = review_view(factory.get("/api/v1/reviews/reviews/", {"movie": movie.pk})).data
+    assert len(reviews) == page_size
+    return (("movies", movies), ("reviews", reviews))
+
+
+def run(movie_count, page_size, repeat):
+    # pylint: disable=import-outside-toplevel
+    import msgpack
+    import orjson
+    from rest_framework.renderers import JSONRenderer
+
+    from movies.renderers import FastJSONRenderer, MessagePackRenderer
+
+    seed_movies(movie_count)
+    formats = (
+        ("json", JSONRenderer(), json.loads),
+        ("orjson", FastJSONRenderer(), orjson.loads),
+        ("msgpack", MessagePackRenderer(), msgpack.unpackb),
+    )
+    rows = []
+    for label, data in pages(page_size):
+        reference = json.loads(JSONRenderer().render(data))
+        for name, renderer, loads in formats:
+            body = renderer.render(data)
+            assert loads(body) == reference
+            render = summarize(measure(lambda renderer=renderer: renderer.render(data), repeat))
+            parse = summarize(measure(lambda loads=loads, body=body: loads(body), repeat))
+            rows.append((label, name, f"{len(body):,}", render["p50_ms"], parse["p50_ms"]))
+
+    print_table(
+        f"{page_size} items per page (p50 ms)",
+        ["page", "format", "bytes", "render", "parse"],
+        rows,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=1_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+    setup()
+    with benchmark_database():
+        run(args.movies, args.page_size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
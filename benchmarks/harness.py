@@ -0,0 +1,117 @@
+"""Shared helpers for the benchmark scripts.
+
+Every benchmark runs against a throwaway copy of the test database, so it can
+be pointed at the same Postgres the test suite uses without touching real data:
+
+    python -m benchmarks.rating_writes
+"""
+
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.test_settings")
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """Create the test database, yield, and drop it again."""
+    # pylint: disable=import-outside-toplevel
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat):
+    """Run ``func`` ``repeat`` times and return the wall-clock samples in seconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return {
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": p95 * 1000,
+        "p99_ms": p99 * 1000,
+    }
+
+
+def _cell(value):
+    return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+
+def print_table(title, headers, rows):
+    cells = [[_cell(value) for value in row] for row in rows]
+    widths = [max(len(str(header)), *(len(row[i]) for row in cells)) for i, header in enumerate(headers)]
+    print(f"\n{title}")
+    print("  ".join(str(header).rjust(width) for header, width in zip(headers, widths)))
+    for row in cells:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+# Vocabulary for synthetic titles and descriptions; 25 is coprime with the multipliers
+# used below, so word combinations vary from row to row.
+SEED_WORDS = (
+    "night city dream river silence mirror winter stranger garden road memory island light shadow journey "
+    "war love sea house train mountain storm letter ghost summer"
+).split()
+
+
+def seed_movies(count):
+    """Bulk-insert ``count`` synthetic movies with a single INSERT ... SELECT."""
+    # pylint: disable=import-outside-toplevel
+    from django.db import connection
+
+    from movies.models import Movie
+
+    table = Movie._meta.db_table
+    words = len(SEED_WORDS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (
+                title, original_title, director, release_year, description, runtime, country, movement,
+                cinematographer, created_at, updated_at, slug, average_rating, total_ratings, rating_sum, weighted_score
+            )
+            SELECT initcap(w[1 + n %% {words}]) || ' ' || initcap(w[1 + n * 7 %% {words}]) || ' ' || n, '',
+                   'Director ' || (n %% 5000), 1900 + (n %% 125),
+                   'A ' || w[1 + n * 3 %% {words}] || ' of ' || w[1 + n * 11 %% {words}] || ' and '
+                       || w[1 + n / 25 %% {words}] || ', number ' || n || '.',
+                   60 + (n %% 120), 'Country ' || (n %% 60), 'Movement ' || (n %% 40), '', now(), now(),
+                   'movie-' || n, round((random() * 5)::numeric, 2), n %% 500, 0, 0
+            FROM generate_series(1, %s) AS n, (SELECT %s::text[] AS w) AS vocabulary
+            """,
+            [count, SEED_WORDS],
+        )
+        cursor.execute(f"ANALYZE {table}")
+
+
+def api_view(viewset, actions=None, **initkwargs):
+    """Return a throttling-free view callable for a viewset, plus a request factory."""
+    # pylint: disable=import-outside-toplevel
+    from rest_framework.test import APIRequestFactory
+
+    view_class = type(f"Benchmark{viewset.__name__}", (viewset,), {"throttle_classes": []})
+    return view_class.as_view(actions or {"get": "list"}, **initkwargs), APIRequestFactory()
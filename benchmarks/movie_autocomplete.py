@@ -0,0 +1,55 @@
+"""Autocomplete latency on a large movie table, uncached and through the endpoint cache.
+
+    python -m benchmarks.movie_autocomplete [--movies 1000000] [--repeat 50]
+"""
+
+import argparse
+
+from benchmarks.harness import api_view, benchmark_database, measure, print_table, seed_movies, setup, summarize
+
+# Prefixes of titles and directors, then misspellings and words inside titles that need the fuzzy stage.
+TERMS = ["ni", "night", "night ci", "director 42", "director 4242", "drem", "mountan", "wintr storm", "ghost 9"]
+
+
+def run(movie_count, repeat):
+    # pylint: disable=import-outside-toplevel
+    from django.core.cache import cache
+
+    from movies.search import autocomplete_movies
+    from movies.views_api import MovieViewSet
+
+    seed_movies(movie_count)
+    view, factory = api_view(MovieViewSet, {"get": "autocomplete"})
+    rows = []
+    for term in TERMS:
+        autocomplete_movies(term, 8)  # warm up
+        uncached = summarize(measure(lambda term=term: autocomplete_movies(term, 8), repeat))
+
+        def call(term=term):
+            response = view(factory.get("/api/v1/movies/autocomplete/", {"q": term}))
+            assert response.status_code == 200, response.status_code
+            response.render()
+
+        cache.clear()
+        cached = summarize(measure(call, repeat))
+        rows.append((term, uncached["p50_ms"], uncached["p99_ms"], cached["p50_ms"], cached["p99_ms"]))
+
+    print_table(
+        f"Autocomplete latency on {movie_count:,} movies",
+        ["term", "query p50", "query p99", "endpoint p50", "endpoint p99"],
+        rows,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    setup()
+    with benchmark_database():
+        run(args.movies, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
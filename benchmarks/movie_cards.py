@@ -0,0 +1,66 @@
+"""Movie cards rendered every time vs served from the fragment cache.
+
+    python -m benchmarks.movie_cards [--movies 1000] [--page-size 12]
+
+Times the cards of one page through ``movie_cards`` with an empty fragment cache
+(every card rendered and stored, the cost before fragment caching plus one
+``set_many``) and with a warm one (a single ``get_many``), then the whole movie
+list template both ways.
+"""
+
+import argparse
+
+from benchmarks.harness import benchmark_database, measure, print_table, seed_movies, setup, summarize
+
+
+def run(movie_count, page_size, repeat):
+    # pylint: disable=import-outside-toplevel
+    from django.core.cache import cache
+    from django.template.loader import render_to_string
+    from django.test import RequestFactory
+
+    from movies.models import Movie
+    from movies.templatetags.movie_tags import movie_cards
+
+    seed_movies(movie_count)
+    page = list(Movie.objects.order_by("-release_year", "-id")[:page_size])
+    request = RequestFactory().get("/")
+
+    def cards():
+        movie_cards(page)
+
+    def template():
+        render_to_string("movies/movie_list.html", {"movies": page, "request": request}, request)
+
+    rows = []
+    for label, render in (("cards", cards), ("movie_list.html", template)):
+
+        def cold(render=render):
+            cache.clear()
+            render()
+
+        render()
+        cold_stats, warm_stats = summarize(measure(cold, repeat)), summarize(measure(render, repeat))
+        speedup = cold_stats["p50_ms"] / warm_stats["p50_ms"]
+        rows.append((label, cold_stats["p50_ms"], warm_stats["p50_ms"], f"{speedup:.1f}x"))
+
+    print_table(
+        f"{page_size} movie cards, {movie_count:,} movies (p50 ms)",
+        ["case", "rendered", "cached", "speedup"],
+        rows,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+    setup()
+    with benchmark_database():
+        run(args.movies, args.page_size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
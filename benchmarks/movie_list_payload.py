@@ -0,0 +1,76 @@
+"""Payload size and latency of /api/v1/movies/?page_size=100 per representation.
+
+    python -m benchmarks.movie_list_payload [--movies 100000] [--description-length 600]
+
+Compares the full MovieSerializer (requested with ?fields= listing all of its
+fields), the lean list default and a minimal sparse fieldset.
+"""
+
+import argparse
+
+from benchmarks.harness import api_view, benchmark_database, measure, print_table, seed_movies, setup, summarize
+
+
+def run(movie_count, description_length, repeat):
+    # pylint: disable=import-outside-toplevel
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from movies.models import Movie
+    from movies.serializers import MovieSerializer
+    from movies.views_api import MovieViewSet
+
+    seed_movies(movie_count)
+    # Synthetic descriptions are one short sentence; pad them to a typical synopsis length.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {Movie._meta.db_table} SET description = left(repeat(description || ' ', 50), %s)",
+            [description_length],
+        )
+        cursor.execute(f"VACUUM ANALYZE {Movie._meta.db_table}")
+    view, factory = api_view(MovieViewSet)
+
+    cases = [
+        ("full", ",".join(MovieSerializer.Meta.fields)),
+        ("lean (default)", None),
+        ("sparse id,title,slug", "id,title,slug"),
+    ]
+    rows = []
+    for label, fields in cases:
+        params = {"page_size": 100, "page": 3}
+        if fields:
+            params["fields"] = fields
+
+        def call(params=params):
+            response = view(factory.get("/api/v1/movies/", params))
+            assert response.status_code == 200, response.status_code
+            return response.render()
+
+        call()  # warm up (and prime the cached count)
+        with CaptureQueriesContext(connection) as context:
+            payload = len(call().content)
+        select = next(q["sql"] for q in context.captured_queries if "LIMIT" in q["sql"])
+        columns = select.split(" FROM ")[0].count(",") + 1
+        stats = summarize(measure(call, repeat))
+        rows.append((label, columns, payload, stats["p50_ms"], stats["p95_ms"]))
+
+    print_table(
+        f"/api/v1/movies/?page_size=100 on {movie_count:,} movies ({description_length}-char descriptions)",
+        ["representation", "columns", "bytes", "p50 ms", "p95 ms"],
+        rows,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--description-length", type=int, default=600)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    setup()
+    with benchmark_database():
+        run(args.movies, args.description_length, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
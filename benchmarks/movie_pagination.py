@@ -0,0 +1,65 @@
+"""Page-number vs keyset pagination latency on a large movie table.
+
+    python -m benchmarks.movie_pagination [--movies 1000000] [--page 5000]
+"""
+
+import argparse
+
+from benchmarks.harness import api_view, benchmark_database, measure, print_table, seed_movies, setup, summarize
+
+
+def run(movie_count, deep_page, repeat):
+    # pylint: disable=import-outside-toplevel
+    from movies.models import Movie
+    from movies.pagination import KeysetPagination
+    from movies.views_api import MovieViewSet
+
+    seed_movies(movie_count)
+    view, factory = api_view(MovieViewSet)
+    page_size = KeysetPagination.page_size
+
+    # Build the cursor pointing just before the deep page, outside the timed section.
+    paginator = KeysetPagination()
+    paginator.ordering = paginator.ordering + ("-id",)
+    paginator.base_url = "http://testserver/api/v1/movies/?pagination=cursor"
+    edge = Movie.objects.order_by(*paginator.ordering)[(deep_page - 1) * page_size - 1]
+    deep_cursor = paginator.encode_cursor(edge, reverse=False)
+
+    cases = [
+        ("page-number", "page 1", {"page": 1}),
+        ("page-number", f"page {deep_page}", {"page": deep_page}),
+        ("cursor", "page 1", {"pagination": "cursor"}),
+        ("cursor", f"page {deep_page}", deep_cursor),
+    ]
+    rows = []
+    for mode, label, params in cases:
+        if isinstance(params, str):
+            request_for = lambda url=params: factory.get(url)  # noqa: E731
+        else:
+            request_for = lambda params=params: factory.get("/api/v1/movies/", params)  # noqa: E731
+
+        def call(request_for=request_for):
+            response = view(request_for())
+            assert response.status_code == 200, response.status_code
+            response.render()
+
+        call()  # warm up
+        stats = summarize(measure(call, repeat))
+        rows.append((mode, label, stats["p50_ms"], stats["p95_ms"]))
+
+    print_table(f"/api/v1/movies/ latency on {movie_count:,} movies", ["mode", "page", "p50 ms", "p95 ms"], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    setup()
+    with benchmark_database():
+        run(args.movies, args.page, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Full-text search latency vs the icontains SearchFilter it replaced.
+
+    python -m benchmarks.movie_search [--movies 500000] [--repeat 20]
+"""
+
+import argparse
+
+from benchmarks.harness import api_view, benchmark_database, measure, print_table, seed_movies, setup, summarize
+
+QUERIES = [
+    ("rare name", "director 4242"),
+    ("common word", "winter"),
+    ("two words", "stranger island"),
+    ("title prefix", "mount"),
+]
+
+
+def run(movie_count, repeat):
+    # pylint: disable=import-outside-toplevel
+    from django_filters import rest_framework as django_filters
+    from rest_framework import filters
+
+    from movies.views_api import MovieViewSet
+
+    class IcontainsSearchViewSet(MovieViewSet):
+        filter_backends = [django_filters.DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+        search_fields = ["title", "director", "description"]
+
+    seed_movies(movie_count)
+    backends = [("icontains", api_view(IcontainsSearchViewSet)), ("tsvector", api_view(MovieViewSet))]
+    rows = []
+    for label, text in QUERIES:
+        row = [label, text]
+        for _, (view, factory) in backends:
+
+            def call(view=view, factory=factory):
+                response = view(factory.get("/api/v1/movies/", {"search": text}))
+                assert response.status_code == 200, response.status_code
+                response.render()
+
+            call()  # warm up
+            stats = summarize(measure(call, repeat))
+            row.extend([stats["p50_ms"], stats["p95_ms"]])
+        rows.append(row)
+
+    print_table(
+        f"/api/v1/movies/?search= latency on {movie_count:,} movies",
+        ["query", "text", "icontains p50", "icontains p95", "tsvector p50", "tsvector p95"],
+        rows,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    setup()
+    with benchmark_database():
+        run(args.movies, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
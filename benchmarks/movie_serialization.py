@@ -0,0 +1,74 @@
+"""Serializer path vs the row-based read path for movie pages.
+
+    python -m benchmarks.movie_serialization [--movies 20000] [--page-size 100]
+
+Times serialization plus JSON rendering of one page (the queryset is fetched in
+the timed section too, since model instantiation is part of the saving), and
+the whole /api/v1/movies/ request through each path.
+"""
+
+import argparse
+
+from benchmarks.harness import api_view, benchmark_database, measure, print_table, seed_movies, setup, summarize
+
+
+def run(movie_count, page_size, repeat):
+    # pylint: disable=import-outside-toplevel
+    from rest_framework.renderers import JSONRenderer
+
+    from movies.fastpath import read_plan
+    from movies.models import Movie
+    from movies.renderers import FastJSONRenderer
+    from movies.serializers import MovieListSerializer, MovieSerializer
+    from movies.views_api import MovieViewSet
+
+    seed_movies(movie_count)
+    page = Movie.objects.order_by("-release_year", "-id")
+    rows = []
+    for label, serializer_class in (("full", MovieSerializer), ("lean", MovieListSerializer)):
+        plan = read_plan(serializer_class)
+        fields = [MovieViewSet.field_columns.get(name, name) for name in serializer_class.Meta.fields]
+
+        def drf(serializer_class=serializer_class, fields=fields):
+            movies = list(page.only(*fields)[:page_size])
+            return JSONRenderer().render(serializer_class(movies, many=True).data)
+
+        def fast(plan=plan):
+            return FastJSONRenderer().render(plan.serialize_many(plan.rows(page)[:page_size]))
+
+        assert drf() == fast()
+        drf_stats, fast_stats = summarize(measure(drf, repeat)), summarize(measure(fast, repeat))
+        speedup = drf_stats["p50_ms"] / fast_stats["p50_ms"]
+        rows.append((f"{label} serialize+render", drf_stats["p50_ms"], fast_stats["p50_ms"], f"{speedup:.1f}x"))
+
+    fast_view, factory = api_view(MovieViewSet)
+    drf_view, _ = api_view(MovieViewSet, get_read_plan=lambda: None, renderer_classes=[JSONRenderer])
+    for label, params in (("full request", {"fields": ",".join(MovieSerializer.Meta.fields)}), ("lean request", {})):
+        params = {**params, "page_size": page_size}
+        timings = [
+            summarize(measure(lambda view=view: view(factory.get("/api/v1/movies/", params)).render(), repeat))
+            for view in (drf_view, fast_view)
+        ]
+        speedup = timings[0]["p50_ms"] / timings[1]["p50_ms"]
+        rows.append((label, timings[0]["p50_ms"], timings[1]["p50_ms"], f"{speedup:.1f}x"))
+
+    print_table(
+        f"{page_size} movies per page, {movie_count:,} movies (p50 ms)",
+        ["case", "serializer", "read plan", "speedup"],
+        rows,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    setup()
+    with benchmark_database():
+        run(args.movies, args.page_size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""In-process suggestion index: build cost, memory and prefix latency next to the database autocomplete.
+
+    python -m benchmarks.movie_suggest [--movies 1000000] [--max-movies 100000] [--repeat 1000]
+"""
+
+import argparse
+import time
+
+from benchmarks.harness import benchmark_database, measure, print_table, seed_movies, setup, summarize
+
+TERMS = ["n", "ni", "night", "night ci", "city stranger 1", "director 42", "director 4242", "zzz"]
+
+
+def run(movie_count, max_movies, repeat):
+    # pylint: disable=import-outside-toplevel
+    from movies.search import autocomplete_movies
+    from movies.suggest import SuggestIndex
+
+    seed_movies(movie_count)
+    started = time.perf_counter()
+    index = SuggestIndex.build(max_movies)
+    print(
+        f"Built index over {len(index.movies):,} of {movie_count:,} movies: {len(index):,} entries, "
+        f"~{index.nbytes() / 2**20:.1f} MiB in {time.perf_counter() - started:.2f}s"
+    )
+    rows = []
+    for term in TERMS:
+        memory = summarize(measure(lambda term=term: index.search(term, 8), repeat))
+        database = summarize(measure(lambda term=term: autocomplete_movies(term, 8), max(repeat // 20, 10)))
+        rows.append((term, memory["p50_ms"] * 1000, memory["p99_ms"] * 1000, database["p50_ms"], database["p99_ms"]))
+
+    print_table(
+        "Prefix suggestions, 8 per query",
+        ["term", "memory p50 us", "memory p99 us", "database p50 ms", "database p99 ms"],
+        rows,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=1_000_000)
+    parser.add_argument("--max-movies", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+    setup()
+    with benchmark_database():
+        run(args.movies, args.max_movies, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
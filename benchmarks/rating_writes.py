@@ -0,0 +1,97 @@
+"""Per-write cost of rating aggregate maintenance as a movie's rating count grows.
+
+Compares the incremental path used by ``Rating.save``/``Rating.delete`` with the
+full ``Movie.update_rating`` recompute it replaced:
+
+    python -m benchmarks.rating_writes [--sizes 1000 10000 50000] [--writes 200]
+"""
+
+import argparse
+from decimal import Decimal
+
+from benchmarks.harness import benchmark_database, measure, print_table, setup, summarize
+
+
+def seed_ratings(movie, count):
+    # pylint: disable=import-outside-toplevel
+    from django.contrib.auth import get_user_model
+
+    from reviews.models import Rating
+
+    User = get_user_model()
+    prefix = f"m{movie.pk}-"
+    users = User.objects.bulk_create(
+        [User(username=f"{prefix}{i}", email=f"{prefix}{i}@bench.local") for i in range(count)], batch_size=5000
+    )
+    Rating.objects.bulk_create(
+        [Rating(movie=movie, user=user, score=Decimal(i % 11) / 2) for i, user in enumerate(users)], batch_size=5000
+    )
+    movie.update_rating()
+
+
+def run(sizes, writes):
+    # pylint: disable=import-outside-toplevel
+    from django.contrib.auth import get_user_model
+
+    from movies.models import Movie
+    from reviews.models import Rating
+
+    User = get_user_model()
+    rows = []
+    for size in sizes:
+        movie = Movie.objects.create(
+            title=f"Benchmark {size}",
+            director="Bench Director",
+            release_year=2000,
+            description="Benchmark movie",
+            runtime=100,
+            country="Nowhere",
+            movement="Benchmark",
+        )
+        seed_ratings(movie, size)
+        writers = User.objects.bulk_create(
+            [User(username=f"w{size}-{i}", email=f"w{size}-{i}@bench.local") for i in range(writes)]
+        )
+        pending = iter(writers)
+        inserted = []
+
+        def insert():
+            inserted.append(Rating.objects.create(movie=movie, user=next(pending), score=Decimal("4.5")))
+
+        updates = iter(inserted)
+
+        def update():
+            rating = next(updates)
+            rating.score = Decimal("2.0")
+            rating.save()
+
+        deletes = iter(inserted)
+
+        def delete():
+            next(deletes).delete()
+
+        insert_ms = summarize(measure(insert, writes))["mean_ms"]
+        update_ms = summarize(measure(update, writes))["mean_ms"]
+        delete_ms = summarize(measure(delete, writes))["mean_ms"]
+        recompute_ms = summarize(measure(movie.update_rating, max(writes // 10, 5)))["mean_ms"]
+        rows.append((size, insert_ms, update_ms, delete_ms, recompute_ms))
+
+    print_table(
+        "Mean milliseconds per rating write",
+        ["ratings", "insert", "update", "delete", "full recompute"],
+        rows,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--writes", type=int, default=200)
+    args = parser.parse_args()
+    setup()
+    with benchmark_database():
+        run(args.sizes, args.writes)
+
+
+if __name__ == "__main__":
+    main()
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Third party apps
     "rest_framework",
     "rest_framework_simplejwt",
@@ -160,12 +161,20 @@ REST_FRAMEWORK = {
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/day",
         "user": "1000/day",
+        "autocomplete": "120/minute",
     },
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "movies.renderers.FastJSONRenderer",
+        "movies.renderers.MessagePackRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PARSER_CLASSES": [
+        "movies.parsers.FastJSONParser",
+        "movies.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_PAGINATION_CLASS": "movies.pagination.CountingPageNumberPagination",
     "PAGE_SIZE": 10,
 }
 
@@ -281,12 +290,71 @@ CACHES = {
     }
 }
 
-# Cache timeout settings
+# Cache timeout settings: generation-keyed entries, including cached anonymous
+# responses (movies/conditional.py), are dropped after this even if still current.
 CACHE_TTL = 60 * 15  # 15 minutes
-CACHE_MIDDLEWARE_SECONDS = CACHE_TTL
+# Rendered movie cards and review blocks (movies/fragments.py), keyed by their object's version.
+FRAGMENT_CACHE_TIMEOUT = env.int("FRAGMENT_CACHE_TIMEOUT", default=60 * 60 * 24)  # seconds
 
 # Cache timeout for popular movies (12 hours)
 POPULAR_MOVIES_CACHE_TIMEOUT = 60 * 60 * 12
+# Trending movies (movies/trending.py): hours of activity counted, hours for an event's weight to
+# halve, and movies kept in the cached ranked list.
+TRENDING_WINDOW_HOURS = env.int("TRENDING_WINDOW_HOURS", default=7 * 24)
+TRENDING_HALF_LIFE_HOURS = env.int("TRENDING_HALF_LIFE_HOURS", default=24)
+TRENDING_MOVIES_LIMIT = env.int("TRENDING_MOVIES_LIMIT", default=50)
+
+# Rating aggregates: "sync" updates the movie on every rating write, "deferred"
+# only marks it dirty and lets flush_rating_aggregates recompute in batches.
+RATING_AGGREGATES_MODE = env("RATING_AGGREGATES_MODE", default="sync")
+RATING_AGGREGATES_MAX_STALENESS = env.int("RATING_AGGREGATES_MAX_STALENESS", default=5)  # seconds
+RATING_AGGREGATES_BATCH_SIZE = env.int("RATING_AGGREGATES_BATCH_SIZE", default=500)
+RATING_AGGREGATES_IN_PROCESS_FLUSHER = env.bool("RATING_AGGREGATES_IN_PROCESS_FLUSHER", default=False)
+# Pseudo-ratings of the global mean added to every movie's weighted_score (Bayesian average); the
+# mean itself is recomputed by refresh_rating_prior.
+RATING_PRIOR_WEIGHT = env.int("RATING_PRIOR_WEIGHT", default=10)
+
+# Paginated counts: exact COUNT(*) results are cached per query until the model
+# changes; results the planner estimates at or above the threshold skip COUNT(*)
+# and are reported with count_is_approximate = true.
+PAGINATION_COUNT_CACHE_TIMEOUT = env.int("PAGINATION_COUNT_CACHE_TIMEOUT", default=300)  # seconds
+PAGINATION_ESTIMATE_THRESHOLD = env.int("PAGINATION_ESTIMATE_THRESHOLD", default=100000)
+
+# Typeahead: results per prefix are cached (and sent with Cache-Control max-age) this long;
+# the fuzzy (misspelling) stage is abandoned when it would take longer than its timeout.
+AUTOCOMPLETE_CACHE_TIMEOUT = env.int("AUTOCOMPLETE_CACHE_TIMEOUT", default=30)  # seconds
+AUTOCOMPLETE_FUZZY_TIMEOUT = env.int("AUTOCOMPLETE_FUZZY_TIMEOUT", default=10)  # milliseconds
+# "database" (trigram/prefix queries) or "memory" (per-worker prefix index, see movies/suggest.py);
+# requests can pick one with ?engine=.
+AUTOCOMPLETE_ENGINE = env("AUTOCOMPLETE_ENGINE", default="database")
+SUGGEST_INDEX_MAX_MOVIES = env.int("SUGGEST_INDEX_MAX_MOVIES", default=100000)  # most rated movies indexed
+SUGGEST_INDEX_MAX_OVERLAY = env.int("SUGGEST_INDEX_MAX_OVERLAY", default=1000)  # changed movies before a rebuild
+SUGGEST_INDEX_MAX_AGE = env.int("SUGGEST_INDEX_MAX_AGE", default=3600)  # seconds
+SUGGEST_INDEX_SYNC_INTERVAL = env.int("SUGGEST_INDEX_SYNC_INTERVAL", default=5)  # seconds
+
+# Stored movie detail documents (movies/documents.py); "missing" entries cover unknown and deleted movies.
+MOVIE_DOCUMENT_TIMEOUT = env.int("MOVIE_DOCUMENT_TIMEOUT", default=60 * 60 * 24)  # seconds
+MOVIE_DOCUMENT_MISSING_TIMEOUT = env.int("MOVIE_DOCUMENT_MISSING_TIMEOUT", default=30)  # seconds
+
+# Item-to-item similar movies (movies/similarity.py), rebuilt by build_movie_similarity: neighbours
+# kept per movie, and users who must have rated both movies for a pair to count.
+MOVIE_SIMILARITY_TOP_K = env.int("MOVIE_SIMILARITY_TOP_K", default=20)
+MOVIE_SIMILARITY_MIN_CORATERS = env.int("MOVIE_SIMILARITY_MIN_CORATERS", default=3)
+# Memory-mapped TF-IDF vectors behind content-based neighbours (movies/content.py), written by
+# build_content_similarity and read by every worker; must be shared by all of them.
+MOVIE_CONTENT_INDEX_DIR = env("MOVIE_CONTENT_INDEX_DIR", default=str(BASE_DIR / "var" / "content_index"))
+
+# Personalized recommendations (movies/recommender.py): factors written by train_recommender to a
+# directory every worker maps, plus the ALS rank, iterations per run and L2 regularization.
+RECOMMENDER_DIR = env("RECOMMENDER_DIR", default=str(BASE_DIR / "var" / "recommender"))
+RECOMMENDER_FACTORS = env.int("RECOMMENDER_FACTORS", default=32)
+RECOMMENDER_ITERATIONS = env.int("RECOMMENDER_ITERATIONS", default=10)
+RECOMMENDER_REGULARIZATION = env.float("RECOMMENDER_REGULARIZATION", default=0.1)
+
+# Poster variants (movies/posters.py): processes rendering them with Pillow (0 renders inline on the
+# calling thread) and the JPEG/WebP quality they are encoded at.
+POSTER_WORKERS = env.int("POSTER_WORKERS", default=2)
+POSTER_VARIANT_QUALITY = env.int("POSTER_VARIANT_QUALITY", default=80)
 
 # XSS Protection
 SECURE_BROWSER_XSS_FILTER = True
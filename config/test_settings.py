@@ -47,6 +47,9 @@ CACHES = {
     }
 }
 
+# Render poster variants inline instead of in worker processes
+POSTER_WORKERS = 0
+
 # Disable debug mode
 DEBUG = False
 
@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+# Imported after the application so apps are loaded. Only workers on the memory autocomplete engine keep a
+# suggestion index; it is built in the background.
+from django.conf import settings  # noqa: E402  # pylint: disable=wrong-import-position
+
+if settings.AUTOCOMPLETE_ENGINE == "memory":
+    from movies.suggest import warm_suggest_index
+
+    warm_suggest_index()
@@ -1,7 +1,8 @@
 # pylint: disable=relative-beyond-top-level
 from django.contrib import admin
 
-from .models import Movie
+from .models import Director, Movement, Movie
+from .pagination import CountingPaginator
 
 
 @admin.register(Movie)
@@ -12,6 +13,8 @@ class MovieAdmin(admin.ModelAdmin):
     prepopulated_fields = {"slug": ("title",)}
     readonly_fields = ("average_rating", "total_ratings", "created_at", "updated_at")
     ordering = ("-release_year", "-average_rating")
+    paginator = CountingPaginator
+    show_full_result_count = False
 
     fieldsets = (
         (None, {"fields": ("title", "original_title", "slug", "director", "release_year")}),
@@ -19,3 +22,15 @@ class MovieAdmin(admin.ModelAdmin):
         ("Statistics", {"fields": ("average_rating", "total_ratings"), "classes": ("collapse",)}),
         ("Metadata", {"fields": ("created_at", "updated_at"), "classes": ("collapse",)}),
     )
+
+
+@admin.register(Director, Movement)
+class CatalogEntityAdmin(admin.ModelAdmin):
+    list_display = ("name", "movie_count", "rating_count", "avg_rating", "top_movie")
+    list_select_related = ("top_movie",)
+    search_fields = ("name",)
+    # Names follow movie credits; edit the movies to rename or merge entities.
+    readonly_fields = ("name", "movie_count", "rating_count", "rating_sum", "avg_rating", "top_movie")
+    ordering = ("name",)
+    paginator = CountingPaginator
+    show_full_result_count = False
@@ -0,0 +1,86 @@
+"""Versioned directories of memory-mapped NumPy arrays.
+
+Offline jobs (the content index, the recommender) write each build to a new
+subdirectory of ``.npy`` files plus a ``metadata.json``, then atomically point a
+``CURRENT`` file at it and remove older builds. Workers map the arrays read-only,
+so every process on a host shares one copy in the page cache, and remap when
+``CURRENT`` names a newer build; a process still mapping a removed build keeps
+reading it until then.
+"""
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+CURRENT = "CURRENT"
+METADATA = "metadata.json"
+
+
+def write_build(directory, arrays, metadata=None):
+    """Write ``{name: array}`` and ``metadata`` as a new build, make it current and return its id."""
+    directory = Path(directory)
+    build_id = str(time.time_ns())
+    path = directory / build_id
+    path.mkdir(parents=True)
+    for name, array in arrays.items():
+        np.save(path / f"{name}.npy", np.asarray(array))
+    (path / METADATA).write_text(json.dumps(metadata or {}))
+    pointer = directory / f"{CURRENT}.{build_id}"
+    pointer.write_text(build_id)
+    os.replace(pointer, directory / CURRENT)
+    for old in directory.iterdir():
+        if old.is_dir() and old.name != build_id:
+            shutil.rmtree(old, ignore_errors=True)
+    return build_id
+
+
+def current_build_id(directory):
+    """Return the id of the current build in ``directory``, or ``None`` before the first one."""
+    try:
+        return (Path(directory) / CURRENT).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+def read_build(directory, build_id):
+    """Return ``({name: memory-mapped array}, metadata)`` of a build."""
+    path = Path(directory) / build_id
+    arrays = {entry.stem: np.load(entry, mmap_mode="r") for entry in path.glob("*.npy")}
+    return arrays, json.loads((path / METADATA).read_text())
+
+
+def row_of(ids, value):
+    """Return the position of ``value`` in the sorted array ``ids``, or ``-1`` if it is not there."""
+    position = int(np.searchsorted(ids, value))
+    if position < len(ids) and ids[position] == value:
+        return position
+    return -1
+
+
+class CurrentBuild:
+    """This process's view of the current build in the directory named by a setting.
+
+    ``load(arrays, metadata, build_id)`` turns a build into the object ``get`` returns;
+    it runs once per build and process.
+    """
+
+    def __init__(self, setting, load):
+        self.setting = setting
+        self.load = load
+        self._loaded = None
+
+    def get(self):
+        """Return the loaded current build, or ``None`` if nothing has been built yet."""
+        directory = getattr(settings, self.setting)
+        build_id = current_build_id(directory)
+        if build_id is None:
+            return None
+        loaded = self._loaded
+        if loaded is None or loaded[0] != (directory, build_id):
+            loaded = self._loaded = (directory, build_id), self.load(*read_build(directory, build_id), build_id)
+        return loaded[1]
@@ -0,0 +1,53 @@
+"""Helpers shared by the cache-backed features of the catalog."""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def get_redis_client(alias="default"):
+    """Return the raw Redis client behind a django-redis cache, or ``None``.
+
+    Features that need Redis data structures (sets, sorted sets) fall back to
+    an in-process implementation when the cache is not Redis, e.g. the locmem
+    cache used by the test settings.
+    """
+    backend = settings.CACHES.get(alias, {}).get("BACKEND", "")
+    if not backend.startswith("django_redis."):
+        return None
+    # pylint: disable=import-outside-toplevel
+    from django_redis import get_redis_connection
+
+    return get_redis_connection(alias)
+
+
+def _generation_key(name):
+    return f"catalog:generation:{name}"
+
+
+def get_generation(name):
+    """Return the current generation number for ``name`` (usually a model label).
+
+    Cache entries derived from a model embed its generation in their key, so
+    bumping the generation invalidates all of them at once without deleting
+    anything. A missing counter is seeded from the clock, so a counter that was
+    evicted never comes back with a value older entries were written under.
+    """
+    key = _generation_key(name)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns() // 1_000_000, timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(name):
+    """Invalidate every cache entry keyed on the generation of ``name``."""
+    key = _generation_key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        generation = time.time_ns() // 1_000_000
+        cache.set(key, generation, timeout=None)
+        return generation
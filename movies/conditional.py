@@ -0,0 +1,165 @@
+"""Conditional GET (``ETag``/``Last-Modified``) and response caching from cheap version stamps.
+
+A view describes what its response depends on with a version stamp: the
+generations (see ``movies.caching``) of the tables it reads, or a row's
+``updated_at``. The stamp is hashed with the request path and representation
+into a strong ETag, so a client polling an unchanged resource gets a 304 before
+any queryset, serializer or template runs. Anonymous GETs are also cached under
+the ETag; a write bumps the generation, so stale entries are never read again
+and simply expire.
+"""
+
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from prometheus_client import Counter
+
+from movies.caching import get_generation
+
+# not_modified / (not_modified + modified) is the 304 hit rate of requests that sent validators.
+CONDITIONAL_REQUESTS = Counter(
+    "catalog_conditional_requests_total",
+    "GETs answered by version-stamped views, by whether they were revalidated into a 304",
+    ["view", "outcome"],
+)
+RESPONSE_CACHE = Counter(
+    "catalog_response_cache_total", "Anonymous GETs looked up in the response cache", ["view", "result"]
+)
+
+
+def cached_response(request, key, view_name, respond):
+    """Return the response stored under ``key``, or ``respond()`` and store it once it is rendered.
+
+    The body is stored with its headers (``Vary``, ``Allow``, ``Cache-Control``
+    and the rest), so a hit answers exactly as the miss did. Only 200s are
+    stored, and not pages that used the CSRF token or set cookies, since those
+    carry something of the visitor's own.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        RESPONSE_CACHE.labels(view_name, "hit").inc()
+        content, headers = entry
+        return HttpResponse(content, headers=headers)
+    RESPONSE_CACHE.labels(view_name, "miss").inc()
+    response = respond()
+
+    def store(rendered):
+        if rendered.status_code == 200 and not rendered.cookies and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+            cache.set(key, (rendered.content, dict(rendered.items())), settings.CACHE_TTL)
+
+    # DRF and template responses are rendered after the view returns.
+    if hasattr(response, "add_post_render_callback"):
+        response.add_post_render_callback(store)
+    else:
+        store(response)
+    return response
+
+
+def conditional_get(request, view_name, stamp, last_modified, respond, cache_response=False):
+    """Answer ``request`` with a 304 if its validators match ``stamp``/``last_modified``, else with ``respond()``.
+
+    ``stamp`` is a tuple of values that change whenever the response would;
+    ``last_modified`` is an aware datetime covering the whole response, or
+    ``None`` when no single timestamp does (only the ETag is sent then).
+    With ``cache_response``, full responses are served from and stored in the
+    response cache under the ETag.
+    """
+    digest = hashlib.sha1("|".join(map(str, (request.get_full_path(), *stamp))).encode()).hexdigest()
+    etag = quote_etag(digest)
+    if cache_response:
+        respond = partial(cached_response, request, f"catalog:cached-response:{view_name}:{digest}", view_name, respond)
+
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None and response.status_code == 304:
+        outcome = "not_modified"
+    else:
+        revalidating = "HTTP_IF_NONE_MATCH" in request.META or "HTTP_IF_MODIFIED_SINCE" in request.META
+        outcome = "modified" if revalidating else "unconditional"
+        if response is None:
+            response = respond()
+    CONDITIONAL_REQUESTS.labels(view_name, outcome).inc()
+    if response.status_code in (200, 304):
+        response["ETag"] = etag
+        if timestamp is not None:
+            response["Last-Modified"] = http_date(timestamp)
+    return response
+
+
+class VersionStampMixin:
+    """Version stamps shared by the API and page mixins below."""
+
+    # Model labels whose generations version every response of the view.
+    version_models: tuple[str, ...] = ()
+    # Whether anonymous GETs are served from the response cache.
+    cache_anonymous = True
+
+    def get_version(self):
+        """Return ``(stamp, last_modified)`` for this request, or ``None`` to answer unconditionally."""
+        return tuple(get_generation(label) for label in self.version_models), None
+
+    def should_cache(self, request):
+        return self.cache_anonymous and request.method == "GET" and not request.user.is_authenticated
+
+
+class ConditionalGetMixin(VersionStampMixin):
+    """Serve 304s for a viewset's ``list``/``retrieve`` in the data-only formats.
+
+    The browsable API renders forms and the current user, so it is not
+    versioned. Permissions and throttles still run before the check.
+    """
+
+    conditional_actions = ("list", "retrieve")
+    conditional_formats = ("json", "msgpack")
+
+    def conditional(self, handler, request, *args, **kwargs):
+        renderer = getattr(request, "accepted_renderer", None)
+        version = None
+        if self.action in self.conditional_actions and renderer and renderer.format in self.conditional_formats:
+            version = self.get_version()
+        if version is None:
+            return handler(request, *args, **kwargs)
+        stamp, last_modified = version
+        return conditional_get(
+            request,
+            type(self).__name__,
+            (request.accepted_media_type, *stamp),
+            last_modified,
+            lambda: handler(request, *args, **kwargs),
+            self.should_cache(request),
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalPageMixin(VersionStampMixin):
+    """Serve 304s for a template view's GET.
+
+    Pages show the signed-in user, so the user is part of the stamp; a page
+    with flash messages waiting is always rendered so they are shown.
+    """
+
+    def get(self, request, *args, **kwargs):
+        handler = super().get
+        version = None if messages.get_messages(request) else self.get_version()
+        if version is None:
+            return handler(request, *args, **kwargs)
+        stamp, last_modified = version
+        return conditional_get(
+            request,
+            type(self).__name__,
+            (request.user.pk, *stamp),
+            last_modified,
+            lambda: handler(request, *args, **kwargs),
+            self.should_cache(request),
+        )
@@ -0,0 +1,178 @@
+"""Content-based similar movies from descriptions and credits.
+
+Titles nobody has rated yet have no collaborative neighbours, so every movie is
+also described by a TF-IDF vector over the words of its description plus its
+director, movement, country and cinematographer, each credit kept whole as one
+term. ``build_content_similarity`` L2-normalizes the vectors, writes them with the
+vocabulary and IDF weights to ``MOVIE_CONTENT_INDEX_DIR`` as a build of ``.npy``
+files that workers memory-map (see ``movies.builds``), and stores the
+``MOVIE_SIMILARITY_TOP_K`` nearest movies by cosine as ``content`` rows of
+``MovieSimilarity``, scoring movies in batches.
+
+Saving a movie rescores it against the stored vectors after commit, weighted with
+the vocabulary and IDF of the last build (words it has never seen are ignored).
+Other movies take the saved one, or its new text, into account from the next build.
+"""
+
+import logging
+import math
+import re
+import time
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from prometheus_client import Histogram
+from scipy import sparse
+
+from movies.builds import CurrentBuild, row_of, write_build
+from movies.caching import bump_generation
+from movies.models import Movie, MovieSimilarity
+from movies.similarity import normalize_rows, store_neighbours, top_neighbours
+from movies.suggest import normalize_suggest_key
+
+logger = logging.getLogger(__name__)
+
+BUILD_SECONDS = Histogram("movie_content_similarity_build_seconds", "Time spent building content-based similarities")
+
+# Credits are single terms weighted above description words, so a shared director counts most.
+CREDIT_WEIGHTS = {"director": 3.0, "movement": 2.0, "country": 1.0, "cinematographer": 1.5}
+CONTENT_FIELDS = ("description", *CREDIT_WEIGHTS)
+WORD = re.compile(r"[^\W\d_]{3,}")
+STOP_WORDS = frozenset(
+    "about after again all also and any are around back been before but can could down each even every for from "
+    "gets had has have her hers him his how into its just more most much not now off one only other our out over "
+    "own she such than that the their them then there these they this those through too under until upon very "
+    "was were what when where which while who whom why will with would you your".split()
+)
+# Movies scored per batch; a batch's similarity block is batch × movies.
+BATCH_SIZE = 256
+
+
+def term_weights(fields):
+    """Return ``{term: tf}`` for a movie's ``CONTENT_FIELDS`` values: log-scaled word counts and credit weights."""
+    description, *credits = fields
+    words = Counter(word for word in WORD.findall(normalize_suggest_key(description or "")) if word not in STOP_WORDS)
+    weights = {word: 1.0 + math.log(count) for word, count in words.items()}
+    for (field, weight), value in zip(CREDIT_WEIGHTS.items(), credits):
+        value = normalize_suggest_key(value or "")
+        if value:
+            weights[f"{field}:{value}"] = weight
+    return weights
+
+
+class ContentIndex:
+    """Normalized TF-IDF vectors of movies, with the vocabulary and IDF weights they were built with."""
+
+    def __init__(self, movie_ids, vectors, terms, idf, build_id=None):
+        self.movie_ids = movie_ids
+        self.vectors = vectors
+        self.terms = terms
+        self.idf = idf
+        self.build_id = build_id
+        self.columns = {term: column for column, term in enumerate(terms)}
+
+    @classmethod
+    def build(cls, rows):
+        """Build the index from ``(movie id, *CONTENT_FIELDS)`` rows ordered by id."""
+        movie_ids, positions, columns, weights = [], [], [], []
+        vocabulary = {}
+        for position, (movie_id, *fields) in enumerate(rows):
+            movie_ids.append(movie_id)
+            for term, weight in term_weights(fields).items():
+                positions.append(position)
+                columns.append(vocabulary.setdefault(term, len(vocabulary)))
+                weights.append(weight)
+        shape = (len(movie_ids), len(vocabulary))
+        tf = sparse.csr_matrix((np.array(weights, dtype=np.float64), (positions, columns)), shape=shape)
+        document_frequency = np.bincount(np.array(columns, dtype=np.int64), minlength=len(vocabulary))
+        idf = np.log((1.0 + len(movie_ids)) / (1.0 + document_frequency)) + 1.0
+        vectors = normalize_rows(tf @ sparse.diags(idf)) if vocabulary else tf
+        return cls(np.array(movie_ids, dtype=np.int64), vectors, list(vocabulary), idf)
+
+    def vectorize(self, fields):
+        """Return the normalized 1 × terms vector of ``CONTENT_FIELDS`` values, ignoring unknown terms."""
+        weights = {
+            self.columns[term]: weight * self.idf[self.columns[term]]
+            for term, weight in term_weights(fields).items()
+            if term in self.columns
+        }
+        vector = sparse.csr_matrix(
+            (list(weights.values()), ([0] * len(weights), list(weights))), shape=(1, len(self.terms))
+        )
+        return normalize_rows(vector)
+
+    def save(self, directory):
+        """Write the index as a new build of ``directory`` and make it current."""
+        arrays = {
+            "movie_ids": self.movie_ids,
+            "data": self.vectors.data,
+            "indices": self.vectors.indices,
+            "indptr": self.vectors.indptr,
+            "idf": self.idf,
+        }
+        self.build_id = write_build(directory, arrays, {"terms": self.terms})
+
+    @classmethod
+    def load(cls, arrays, metadata, build_id):
+        """Wrap the memory-mapped arrays of a build."""
+        terms = metadata["terms"]
+        vectors = sparse.csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]), shape=(len(arrays["movie_ids"]), len(terms))
+        )
+        return cls(arrays["movie_ids"], vectors, terms, arrays["idf"], build_id)
+
+
+_current = CurrentBuild("MOVIE_CONTENT_INDEX_DIR", ContentIndex.load)
+
+
+def current_content_index():
+    """Return the current build, memory-mapped once per process, or ``None`` before the first build."""
+    return _current.get()
+
+
+def build_content_similarity(top_k=None, batch_size=None):
+    """Rebuild the content index from every movie and store each movie's content neighbours.
+
+    Returns ``(movies scored, neighbour rows stored)``.
+    """
+    top_k = top_k or settings.MOVIE_SIMILARITY_TOP_K
+    batch_size = batch_size or BATCH_SIZE
+    computed_at = timezone.now()
+    started = time.monotonic()
+
+    rows = Movie.objects.order_by("pk").values_list("pk", *CONTENT_FIELDS).iterator(chunk_size=5000)
+    index = ContentIndex.build(rows)
+    index.save(settings.MOVIE_CONTENT_INDEX_DIR)
+
+    stored = 0
+    for start in range(0, len(index.movie_ids), batch_size):
+        batch = np.arange(start, min(start + batch_size, len(index.movie_ids)))
+        neighbours = top_neighbours(index.vectors[batch] @ index.vectors.T, batch, top_k)
+        owners = index.movie_ids[batch].tolist()
+        stored += store_neighbours(MovieSimilarity.CONTENT, index.movie_ids, owners, neighbours, computed_at)
+
+    MovieSimilarity.objects.filter(source=MovieSimilarity.CONTENT, computed_at__lt=computed_at).delete()
+    transaction.on_commit(lambda: bump_generation(MovieSimilarity._meta.label_lower))
+    BUILD_SECONDS.observe(time.monotonic() - started)
+    logger.info(
+        "Indexed %d movies and %d terms, stored %d content neighbours", len(index.movie_ids), len(index.terms), stored
+    )
+    return len(index.movie_ids), stored
+
+
+def update_content_neighbours(movie_id):
+    """Rescore one movie against the current build, e.g. after it was saved; returns the neighbours stored."""
+    index = current_content_index()
+    if index is None:
+        return 0
+    fields = Movie.objects.filter(pk=movie_id).values_list(*CONTENT_FIELDS).first()
+    if fields is None:
+        return 0
+    similarities = index.vectorize(fields) @ index.vectors.T
+    neighbours = top_neighbours(similarities, [row_of(index.movie_ids, movie_id)], settings.MOVIE_SIMILARITY_TOP_K)
+    stored = store_neighbours(MovieSimilarity.CONTENT, index.movie_ids, [movie_id], neighbours, timezone.now())
+    bump_generation(MovieSimilarity._meta.label_lower)
+    return stored
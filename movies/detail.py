@@ -0,0 +1,57 @@
+"""Data for the movie detail page.
+
+However many reviews and ratings a movie has, the page is assembled with a fixed
+number of queries besides the movie itself: the latest reviews with their authors,
+the ratings those authors (and the viewer) gave the movie, the viewer's review unless
+it is among the latest, whether the viewer favorited the movie, and similar movies
+(with one more query for movies that have no precomputed neighbours yet).
+"""
+
+from django.db.models import Q
+
+from movies.models import Movie, MovieSimilarity
+from reviews.models import Rating
+from users.models import UserFavoriteMovie
+
+REVIEWS_SHOWN = 5
+SIMILAR_SHOWN = 4
+
+
+def similar_movies(movie):
+    """Nearest neighbours by ratings or content, or movies sharing ``movie``'s director or movement until it has any."""
+    neighbours = MovieSimilarity.neighbours(movie.pk, SIMILAR_SHOWN)
+    if neighbours:
+        return neighbours
+    return list(
+        Movie.objects.filter(Q(director=movie.director) | Q(movement=movie.movement)).exclude(id=movie.id)[
+            :SIMILAR_SHOWN
+        ]
+    )
+
+
+def load_detail_context(movie, user):
+    """Return the reviews, ratings, similar movies and viewer state shown on ``movie``'s page."""
+    reviews = list(movie.reviews.select_related("user").order_by("-created_at")[:REVIEWS_SHOWN])
+    viewer_id = user.pk if user.is_authenticated else None
+
+    # One query for the scores of every author shown and of the viewer.
+    raters = {review.user_id for review in reviews}
+    if viewer_id:
+        raters.add(viewer_id)
+    ratings = {}
+    if raters:
+        ratings = {rating.user_id: rating for rating in Rating.objects.filter(movie=movie, user_id__in=raters)}
+
+    context = {
+        "reviews": reviews,
+        "user_ratings": {review.user_id: ratings[review.user_id] for review in reviews if review.user_id in ratings},
+        "similar_movies": similar_movies(movie),
+    }
+    if viewer_id:
+        user_review = next((review for review in reviews if review.user_id == viewer_id), None)
+        if user_review is None:
+            user_review = movie.reviews.filter(user_id=viewer_id).first()
+        context["user_review"] = user_review
+        context["user_rating"] = ratings.get(viewer_id)
+        context["is_favorite"] = UserFavoriteMovie.objects.filter(user_id=viewer_id, movie=movie).exists()
+    return context
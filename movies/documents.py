@@ -0,0 +1,130 @@
+"""Stored movie detail documents.
+
+The JSON detail of each movie is rendered once and kept in the cache under
+both its slug and its id, so ``GET /api/v1/movies/<slug or id>/`` is answered
+with the stored bytes and no query. Saves drop the stored entries at once and store
+the new document after commit; deletes and lookups that match nothing store a
+short-lived ``MISSING`` entry.
+A miss is rebuilt by one worker while concurrent requests for the same lookup
+wait for its result. Rebuilds only ``add`` entries, so a document read before a
+concurrent save committed never replaces the one that save stored.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from prometheus_client import Counter
+
+from movies.fastpath import read_plan
+from movies.models import Movie
+from movies.renderers import FastJSONRenderer
+from movies.serializers import MovieSerializer
+
+# Stored for lookups that match no movie.
+MISSING = "missing"
+# How long a rebuild may hold its lock, and how long other requests wait for its result (seconds).
+REBUILD_LOCK_TIMEOUT = 5
+REBUILD_WAIT = 0.5
+
+DOCUMENT_LOOKUPS = Counter("movie_document_lookups_total", "Movie detail document lookups by outcome", ["result"])
+
+
+def _key(kind, value):
+    return f"movies:document:{kind}:{value}"
+
+
+def _lookup_keys(value):
+    """Keys a slug-or-id lookup may be stored under, slug first as in ``MovieViewSet.get_object``."""
+    return [_key("slug", value), _key("id", value)] if value.isdigit() else [_key("slug", value)]
+
+
+def _document_rows():
+    plan = read_plan(MovieSerializer)
+    return plan, plan.rows(Movie.objects.all(), "updated_at")
+
+
+def _document(plan, row):
+    return FastJSONRenderer().render(plan.serialize(row)), row.updated_at
+
+
+def _stored(value):
+    """Return the stored document or ``MISSING`` for a slug or id, or ``None`` if it has to be rebuilt.
+
+    The slug entry wins, as in ``MovieViewSet.get_object``. A movie stored
+    through its slug has no entry for the slug its id spells, so when that
+    entry is absent the document stored under the id is served.
+    """
+    keys = _lookup_keys(value)
+    found = cache.get_many(keys)
+    entries = [found.get(key) for key in keys]
+    for entry in entries:
+        if entry is not None and entry != MISSING:
+            return entry
+    return MISSING if all(entry == MISSING for entry in entries) else None
+
+
+def _rebuild(value):
+    """Load the movie matching a slug or id with one query and store documents for every key it resolves."""
+    plan, rows = _document_rows()
+    match = Q(slug=value) | Q(pk=int(value)) if value.isdigit() else Q(slug=value)
+    found = {}
+    for row in rows.filter(match):
+        document = _document(plan, row)
+        found[_key("id", row.id)] = found[_key("slug", row.slug)] = document
+        cache.add(_key("id", row.id), document, settings.MOVIE_DOCUMENT_TIMEOUT)
+        cache.add(_key("slug", row.slug), document, settings.MOVIE_DOCUMENT_TIMEOUT)
+    for key in _lookup_keys(value):
+        if key not in found:
+            cache.add(key, MISSING, settings.MOVIE_DOCUMENT_MISSING_TIMEOUT)
+    return next((found[key] for key in _lookup_keys(value) if key in found), MISSING)
+
+
+def load_document(value):
+    """Return ``(json bytes, updated_at)`` for the movie with slug or id ``value``, or ``MISSING``."""
+    value = str(value)
+    document = _stored(value)
+    if document is not None:
+        DOCUMENT_LOOKUPS.labels("missing" if document == MISSING else "hit").inc()
+        return document
+    lock = _key("lock", value)
+    locked = cache.add(lock, 1, REBUILD_LOCK_TIMEOUT)
+    if not locked:
+        deadline = time.monotonic() + REBUILD_WAIT
+        while document is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+            document = _stored(value)
+        if document is not None:
+            DOCUMENT_LOOKUPS.labels("waited").inc()
+            return document
+    DOCUMENT_LOOKUPS.labels("rebuilt").inc()
+    try:
+        return _rebuild(value)
+    finally:
+        if locked:
+            cache.delete(lock)
+
+
+def refresh_document(movie_id, stale_slug=None):
+    """Store a movie's document after a save; ``stale_slug``, a slug it no longer has, is marked missing."""
+    plan, rows = _document_rows()
+    row = rows.filter(pk=movie_id).first()
+    if row is None:
+        forget_document(movie_id, stale_slug)
+        return
+    document = _document(plan, row)
+    cache.set_many({_key("id", row.id): document, _key("slug", row.slug): document}, settings.MOVIE_DOCUMENT_TIMEOUT)
+    if stale_slug and stale_slug != row.slug:
+        cache.set(_key("slug", stale_slug), MISSING, settings.MOVIE_DOCUMENT_MISSING_TIMEOUT)
+
+
+def discard_document(movie_id, *slugs):
+    """Drop a movie's stored entries, so lookups rebuild it until the writing transaction stores the new one."""
+    cache.delete_many([_key("id", movie_id), *(_key("slug", slug) for slug in slugs if slug)])
+
+
+def forget_document(movie_id, slug):
+    """Mark a deleted movie's id and slug missing, so a rebuild that read it before the delete cannot store it."""
+    keys = [_key("id", movie_id)] + ([_key("slug", slug)] if slug else [])
+    cache.set_many(dict.fromkeys(keys, MISSING), settings.MOVIE_DOCUMENT_MISSING_TIMEOUT)
@@ -0,0 +1,170 @@
+"""Read-only serialization straight from ``values_list`` rows.
+
+``ModelSerializer`` output for a page of movies costs a model instance, an
+attribute walk and a ``to_representation`` call per field and row. A
+``ReadPlan`` compiles a serializer's readable fields once into the columns to
+fetch and the conversions to apply, then builds each item from a row tuple.
+Fields whose DRF representation of a database value is the value itself (text,
+integers, booleans) are copied as-is; everything else goes through the DRF
+field's own ``to_representation``, so the output matches the serializer's.
+"""
+
+from functools import lru_cache
+from operator import itemgetter
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+from movies.renderers import FastJSONRenderer, MessagePackRenderer
+
+# DRF fields whose to_representation returns a database value of the matching column unchanged.
+IDENTITY_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ReadOnlyField,
+)
+# DRF fields that subclass the above but transform the value.
+CONVERTED_FIELDS = (serializers.ChoiceField, serializers.FilePathField)
+
+
+class ReadPlan:
+    """The columns a serializer reads and how to turn one row of them into its representation."""
+
+    def __init__(self, serializer, sources=None, prefix="", columns=None):
+        sources = dict(sources or {})
+        self.columns = [] if columns is None else columns
+        # A nested representation is null when its relation is, i.e. when the related pk is.
+        self.pk_index = self._column(f"{prefix}pk") if prefix else None
+        self.keys, indices, self.converted, self.nested = [], [], [], []
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            name = field.field_name
+            if prefix == "" and name in sources:
+                index = self._column(sources[name])
+            elif isinstance(field, serializers.BaseSerializer):
+                if isinstance(field, serializers.ListSerializer) or field.source == "*":
+                    raise ImproperlyConfigured(f"{type(serializer).__name__}.{name} cannot be read from rows")
+                nested = ReadPlan(field, prefix=f"{prefix}{field.source.replace('.', '__')}__", columns=self.columns)
+                index = nested.pk_index
+                self.nested.append((name, nested))
+            else:
+                if field.source == "*" or isinstance(
+                    field, (serializers.SerializerMethodField, serializers.RelatedField)
+                ):
+                    raise ImproperlyConfigured(
+                        f"{type(serializer).__name__}.{name} needs an entry in sources to be read from rows"
+                    )
+                index = self._column(f"{prefix}{field.source.replace('.', '__')}")
+                if not isinstance(field, IDENTITY_FIELDS) or isinstance(field, CONVERTED_FIELDS):
+                    self.converted.append((name, index, field.to_representation))
+            self.keys.append(name)
+            indices.append(index)
+        # itemgetter with one index returns the bare value rather than a 1-tuple.
+        self.pick = itemgetter(*indices) if len(indices) > 1 else (lambda row, index=indices[0]: (row[index],))
+
+    def _column(self, source):
+        if isinstance(source, str) and source in self.columns:
+            return self.columns.index(source)
+        self.columns.append(source)
+        return len(self.columns) - 1
+
+    def rows(self, queryset, *extra):
+        """Return ``queryset`` as named rows of the plan's columns, plus ``extra`` fields (e.g. for cursors)."""
+        fields, expressions = [], {}
+        for index, source in enumerate(self.columns):
+            if isinstance(source, str):
+                fields.append(source)
+            else:
+                alias = f"plan_column_{index}"
+                expressions[alias] = source
+                fields.append(alias)
+        rows = queryset.annotate(**expressions) if expressions else queryset
+        # Cursor pagination reads the ordering fields back from the rows by attribute name.
+        return rows.values_list(*fields, *(name for name in extra if name not in fields), named=True)
+
+    def serialize(self, row):
+        data = dict(zip(self.keys, self.pick(row)))
+        for name, index, to_representation in self.converted:
+            value = row[index]
+            if value is not None:
+                data[name] = to_representation(value)
+        for name, nested in self.nested:
+            data[name] = None if row[nested.pk_index] is None else nested.serialize(row)
+        return data
+
+    def serialize_many(self, rows):
+        serialize = self.serialize
+        return [serialize(row) for row in rows]
+
+
+@lru_cache(maxsize=64)
+def read_plan(serializer_class, fields=None, sources=()):
+    """Return the cached plan for ``serializer_class``, limited to ``fields`` (see ``SparseFieldsMixin``).
+
+    ``sources`` maps fields that cannot be derived from the serializer, such
+    as method fields, to a lookup or expression giving their representation.
+    """
+    serializer = serializer_class(fields=list(fields)) if fields is not None else serializer_class()
+    return ReadPlan(serializer, sources)
+
+
+class ReadPlanMixin:
+    """Serve JSON and MessagePack ``list``/``retrieve`` responses from rows through a ``ReadPlan``.
+
+    The browsable API and every other action keep the serializer path, so
+    forms, validation and writes are unchanged.
+    """
+
+    # Renderer formats that only need the data, not the serializer.
+    read_plan_formats = (FastJSONRenderer.format, MessagePackRenderer.format)
+    # (field name, lookup or expression) pairs for fields a plan cannot derive from the serializer.
+    read_sources: tuple = ()
+    # The subset of the serializer's fields to render, or ``None`` for all of them.
+    read_fields: tuple[str, ...] | None = None
+
+    def get_read_fields(self):
+        return self.read_fields
+
+    def get_read_plan(self):
+        """Return the plan for this request, or ``None`` when its renderer needs the serializer."""
+        renderer = getattr(self.request, "accepted_renderer", None)
+        if renderer is None or renderer.format not in self.read_plan_formats:
+            return None
+        fields = self.get_read_fields()
+        return read_plan(self.get_serializer_class(), None if fields is None else tuple(fields), self.read_sources)
+
+    def get_plan_rows(self, plan, queryset):
+        return plan.rows(queryset)
+
+    def get_plan_object(self, plan):
+        """Return the plan row of the object a ``retrieve`` displays."""
+        return self.get_object(self.get_plan_rows(plan, self.filter_queryset(self.get_queryset())))
+
+    def get_object(self, queryset=None):
+        """``GenericAPIView.get_object``, optionally looking the object up among plan rows."""
+        if queryset is None:
+            queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_read_plan()
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        rows = self.get_plan_rows(plan, self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(plan.serialize_many(rows))
+        return self.get_paginated_response(plan.serialize_many(page))
+
+    def retrieve(self, request, *args, **kwargs):
+        plan = self.get_read_plan()
+        if plan is None:
+            return super().retrieve(request, *args, **kwargs)
+        return Response(plan.serialize(self.get_plan_object(plan)))
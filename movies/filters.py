@@ -1,14 +1,63 @@
 # pylint: disable=relative-beyond-top-level
 from django_filters import rest_framework as django_filters
 
-from .models import Movie
+from .models import Director, Movement, Movie
+
+# Average ratings are bucketed by their integer part; bucket 4 also holds perfect 5.0 averages.
+# Unrated movies have an average of 0 but belong to no bucket.
+RATING_BUCKETS = range(5)
 
 
 class MovieFilter(django_filters.FilterSet):
     release_year = django_filters.NumberFilter()
-    movement = django_filters.CharFilter(lookup_expr="iexact")
-    director = django_filters.CharFilter(lookup_expr="iexact")
+    # Names are matched case-insensitively against Director/Movement and filtered by foreign key.
+    movement = django_filters.CharFilter(lookup_expr="iexact", method="filter_entity")
+    director = django_filters.CharFilter(lookup_expr="iexact", method="filter_entity")
+    director_id = django_filters.NumberFilter(field_name="director_ref")
+    movement_id = django_filters.NumberFilter(field_name="movement_ref")
+    country = django_filters.CharFilter(lookup_expr="iexact")
+    decade = django_filters.NumberFilter(method="filter_decade")
+    rating_bucket = django_filters.TypedChoiceFilter(
+        choices=[(bucket, bucket) for bucket in RATING_BUCKETS], coerce=int, method="filter_rating_bucket"
+    )
 
     class Meta:
         model = Movie
-        fields = ["release_year", "movement", "director"]
+        fields = [
+            "release_year",
+            "movement",
+            "director",
+            "movement_id",
+            "director_id",
+            "country",
+            "decade",
+            "rating_bucket",
+        ]
+
+    def filter_entity(self, queryset, name, value):
+        entity_id = {"director": Director, "movement": Movement}[name].lookup_id(value)
+        return queryset.none() if entity_id is None else queryset.filter(**{f"{name}_ref": entity_id})
+
+    def filter_decade(self, queryset, name, value):
+        decade = int(value) // 10 * 10
+        return queryset.filter(release_year__gte=decade, release_year__lte=decade + 9)
+
+    def filter_rating_bucket(self, queryset, name, value):
+        queryset = queryset.filter(total_ratings__gt=0)
+        if value == RATING_BUCKETS[-1]:
+            return queryset.filter(average_rating__gte=value)
+        return queryset.filter(average_rating__gte=value, average_rating__lt=value + 1)
+
+    def normalized_filters(self):
+        """Return the applied filters as sorted ``(name, value)`` pairs, e.g. for cache keys.
+
+        Case-insensitive filters are lowercased so equivalent requests share a key.
+        """
+        items = []
+        for name, value in self.form.cleaned_data.items():
+            if value in (None, ""):
+                continue
+            if getattr(self.filters[name], "lookup_expr", None) == "iexact":
+                value = value.lower()
+            items.append((name, str(value)))
+        return sorted(items)
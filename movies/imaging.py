@@ -0,0 +1,58 @@
+"""Resized poster variants rendered with Pillow.
+
+Runs in the worker processes of ``movies.posters``, so it imports nothing from
+Django and the workers can load it without setting up the project.
+"""
+
+import os
+import tempfile
+
+from PIL import Image, ImageOps
+
+# File extension -> Pillow format name and save options.
+SAVE_OPTIONS = {
+    "webp": ("WEBP", {"method": 4}),
+    "jpg": ("JPEG", {"optimize": True, "progressive": True}),
+}
+
+
+def _save(image, path, ext, quality):
+    """Write ``image`` to ``path`` through a temporary file, so readers never see a partial variant."""
+    pillow_format, options = SAVE_OPTIONS[ext]
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=f".{ext}.tmp")
+    try:
+        with os.fdopen(handle, "wb") as output:
+            image.save(output, pillow_format, quality=quality, **options)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def render_variants(source, directory, widths, extensions, quality):
+    """Write ``<variant>.<ext>`` to ``directory`` for each ``{variant: width}`` and extension.
+
+    Variants already on disk are kept, images are never upscaled, and the
+    source is decoded once. Returns the file names written.
+    """
+    missing = [
+        (variant, width, ext)
+        for variant, width in widths.items()
+        for ext in extensions
+        if not os.path.exists(os.path.join(directory, f"{variant}.{ext}"))
+    ]
+    if not missing:
+        return []
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    with Image.open(source) as original:
+        # Posters are opaque; RGB is what both JPEG and lossy WebP store.
+        image = ImageOps.exif_transpose(original).convert("RGB")
+    resized = {}
+    for variant, width, ext in missing:
+        if variant not in resized:
+            resized[variant] = image.copy()
+            resized[variant].thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        _save(resized[variant], os.path.join(directory, f"{variant}.{ext}"), ext, quality)
+        written.append(f"{variant}.{ext}")
+    return written
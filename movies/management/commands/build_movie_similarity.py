@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from movies.similarity import CHUNK_SIZE, COSINE, MEASURES, build_similarity, movies_rated_since_last_build
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute each movie's most similar movies from the rating table (item-to-item collaborative "
+        "filtering), e.g. nightly in full and every few minutes with --incremental."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--incremental", action="store_true", help="Only rescore movies rated since the previous build."
+        )
+        parser.add_argument("--measure", choices=MEASURES, default=COSINE, help="Similarity measure.")
+        parser.add_argument("--top-k", type=int, help="Neighbours kept per movie (MOVIE_SIMILARITY_TOP_K).")
+        parser.add_argument(
+            "--min-coraters", type=int, help="Common raters a pair needs (MOVIE_SIMILARITY_MIN_CORATERS)."
+        )
+        parser.add_argument("--workers", type=int, help="Scoring processes (default: one per CPU).")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Movies scored per task.")
+
+    def handle(self, *args, **options):
+        movie_ids = movies_rated_since_last_build() if options["incremental"] else None
+        if options["incremental"] and movie_ids is None:
+            self.stdout.write("No previous build, scoring every movie")
+        started = time.monotonic()
+        scored, stored = build_similarity(
+            movie_ids,
+            measure=options["measure"],
+            top_k=options["top_k"],
+            min_coraters=options["min_coraters"],
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+        )
+        self.stdout.write(
+            f"Scored {scored} movies, stored {stored} similar movies in {time.monotonic() - started:.2f}s"
+        )
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from movies.caching import bump_generation
+from movies.documents import refresh_document
+from movies.models import Movie
+from movies.posters import poster_digest, prune_variants, render_many, source_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Hash every movie's poster and render its missing variants in the POSTER_WORKERS pool, e.g. after "
+        "importing posters, changing the variant settings or restoring MEDIA_ROOT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prune", action="store_true", help="Delete variant directories no movie's poster_digest refers to."
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        jobs, changed = {}, []
+        movies = Movie.objects.exclude(poster="").exclude(poster=None).only("pk", "poster", "poster_digest")
+        for movie in movies.iterator(chunk_size=1000):
+            digest = poster_digest(movie.poster)
+            if digest != movie.poster_digest:
+                changed.append((movie.pk, digest))
+            if digest:
+                jobs[digest] = source_path(movie.poster.name)
+        # A plain update: re-saving would rescore neighbours and move facet counts for nothing.
+        with transaction.atomic():
+            for movie_id, digest in changed:
+                Movie.objects.filter(pk=movie_id).update(poster_digest=digest)
+        for movie_id, _ in changed:
+            refresh_document(movie_id)
+        if changed:
+            bump_generation(Movie._meta.label_lower)
+        written = render_many((source, digest) for digest, source in jobs.items())
+        summary = f"Rendered {written} variants for {len(jobs)} posters ({len(changed)} rehashed)"
+        if options["prune"]:
+            digests = set(Movie.objects.exclude(poster_digest=None).values_list("poster_digest", flat=True))
+            summary += f", pruned {prune_variants(digests)} stale directories"
+        self.stdout.write(f"{summary} in {time.monotonic() - started:.2f}s")
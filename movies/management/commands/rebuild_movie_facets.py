@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from movies.models import MovieFacet
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized facet counts, e.g. after bulk imports or queryset.update() calls."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Rebuilt {MovieFacet.rebuild()} facet values")
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from movies.suggest import rebuild_suggest_index, request_rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the in-process suggestion index in every worker, e.g. after bulk imports or queryset.update() calls."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-movies", type=int, help="Index at most this many movies (most rated first).")
+
+    def handle(self, *args, **options):
+        request_rebuild()
+        # Workers rebuild in the background; building here too reports what each of them will hold.
+        started = time.monotonic()
+        index = rebuild_suggest_index(options["max_movies"])
+        self.stdout.write(
+            f"Rebuilt suggestion index: {len(index.movies)} movies, {len(index)} entries, "
+            f"~{index.nbytes() / 2**20:.1f} MiB in {time.monotonic() - started:.2f}s"
+        )
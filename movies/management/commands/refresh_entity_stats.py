@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from movies.models import Director, Movement
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute director and movement stats and top movies from the movie table, "
+        "e.g. on a schedule or after bulk imports and queryset.update() calls."
+    )
+
+    def handle(self, *args, **options):
+        for entity in (Director, Movement):
+            refreshed = entity.refresh_stats()
+            self.stdout.write(f"Refreshed {refreshed} {entity._meta.verbose_name_plural}")
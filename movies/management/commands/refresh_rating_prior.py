@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from movies.models import RatingPrior
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the global mean rating behind weighted_score from the movie table and rescore movies if it "
+        "moved, e.g. hourly or after changing RATING_PRIOR_WEIGHT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--weight", type=int, help="Pseudo-ratings of the mean per movie (RATING_PRIOR_WEIGHT).")
+
+    def handle(self, *args, **options):
+        rescored = RatingPrior.refresh(options["weight"])
+        prior = RatingPrior.objects.get(pk=RatingPrior.ID)
+        self.stdout.write(f"Prior is {prior}; rescored {rescored} movies")
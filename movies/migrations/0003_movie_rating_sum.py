@@ -0,0 +1,42 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:12
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Movie = apps.get_model("movies", "Movie")
+    Rating = apps.get_model("reviews", "Rating")
+    totals = (
+        Rating.objects.filter(movie=OuterRef("pk"))
+        .order_by()
+        .values("movie")
+        .annotate(score_sum=Sum("score"), count=Count("id"))
+    )
+    movies = Movie.objects.annotate(
+        score_sum=Subquery(totals.values("score_sum")), count=Subquery(totals.values("count"))
+    ).filter(count__gt=0)
+    for movie in movies.iterator(chunk_size=2000):
+        average = (movie.score_sum / movie.count).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        Movie.objects.filter(pk=movie.pk).update(
+            rating_sum=movie.score_sum, total_ratings=movie.count, average_rating=average
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0002_initial"),
+        ("reviews", "0003_alter_rating_score"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="movie",
+            name="rating_sum",
+            field=models.DecimalField(decimal_places=1, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0003_movie_rating_sum"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="movie",
+            name="movies_movi_release_164bb1_idx",
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["-release_year", "-average_rating", "-id"], name="movies_movi_release_5f621a_idx"
+            ),
+        ),
+    ]
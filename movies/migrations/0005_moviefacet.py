@@ -0,0 +1,50 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+FACET_FIELDS = ("director", "movement", "release_year", "country")
+
+
+def build_facets(apps, schema_editor):
+    MovieFacet = apps.get_model("movies", "MovieFacet")
+    Movie = apps.get_model("movies", "Movie")
+    selects = " UNION ALL ".join(
+        f"SELECT '{field}', {field}::varchar, COUNT(*) FROM {Movie._meta.db_table} GROUP BY {field}"
+        for field in FACET_FIELDS
+    )
+    schema_editor.execute(f"INSERT INTO {MovieFacet._meta.db_table} (facet, value, movie_count) {selects}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0004_movie_keyset_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MovieFacet",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "facet",
+                    models.CharField(
+                        choices=[
+                            ("director", "director"),
+                            ("movement", "movement"),
+                            ("release_year", "release_year"),
+                            ("country", "country"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("value", models.CharField(max_length=255)),
+                ("movie_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["facet", "value"],
+                "constraints": [models.UniqueConstraint(fields=("facet", "value"), name="unique_movie_facet_value")],
+            },
+        ),
+        migrations.RunPython(build_facets, migrations.RunPython.noop),
+    ]
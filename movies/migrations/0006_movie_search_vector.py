@@ -0,0 +1,53 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR = """
+    setweight(to_tsvector('pg_catalog.english', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('pg_catalog.english', coalesce({row}original_title, '')), 'A') ||
+    setweight(to_tsvector('pg_catalog.english', coalesce({row}director, '')), 'B') ||
+    setweight(to_tsvector('pg_catalog.english', coalesce({row}cinematographer, '')), 'C') ||
+    setweight(to_tsvector('pg_catalog.english', coalesce({row}description, '')), 'D')
+"""
+
+CREATE_TRIGGER = f"""
+CREATE FUNCTION movies_movie_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR.format(row="NEW.")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER movies_movie_search_vector
+BEFORE INSERT OR UPDATE OF title, original_title, director, cinematographer, description, search_vector
+ON movies_movie FOR EACH ROW EXECUTE FUNCTION movies_movie_search_vector_update();
+
+UPDATE movies_movie SET search_vector = {SEARCH_VECTOR.format(row="")};
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS movies_movie_search_vector ON movies_movie;
+DROP FUNCTION IF EXISTS movies_movie_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0005_moviefacet"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="movie",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+        migrations.AddIndex(
+            model_name="movie",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["search_vector"], name="movies_movie_search_gin"),
+        ),
+    ]
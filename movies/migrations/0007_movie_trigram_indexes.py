@@ -0,0 +1,91 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:10
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations, models
+
+import movies.models
+
+# unaccent() is only STABLE (its dictionary could change), so it cannot appear in an
+# index expression directly; pinning the dictionary makes the wrapper safe to mark IMMUTABLE.
+CREATE_UNACCENT_WRAPPER = """
+CREATE OR REPLACE FUNCTION movies_immutable_unaccent(text) RETURNS text AS $$
+    SELECT public.unaccent('public.unaccent'::regdictionary, $1)
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+"""
+
+DROP_UNACCENT_WRAPPER = "DROP FUNCTION IF EXISTS movies_immutable_unaccent(text);"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0006_movie_search_vector"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.RunSQL(CREATE_UNACCENT_WRAPPER, DROP_UNACCENT_WRAPPER),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Lower(movies.models.ImmutableUnaccent("title")),
+                    name="text_pattern_ops",
+                ),
+                name="movies_movie_title_prefix",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Lower(movies.models.ImmutableUnaccent("original_title")),
+                    name="text_pattern_ops",
+                ),
+                name="movies_movie_orig_title_prefix",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Lower(movies.models.ImmutableUnaccent("director")),
+                    name="text_pattern_ops",
+                ),
+                name="movies_movie_director_prefix",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Lower(movies.models.ImmutableUnaccent("title")),
+                    name="gin_trgm_ops",
+                ),
+                name="movies_movie_title_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Lower(movies.models.ImmutableUnaccent("original_title")),
+                    name="gin_trgm_ops",
+                ),
+                name="movies_movie_orig_title_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Lower(movies.models.ImmutableUnaccent("director")),
+                    name="gin_trgm_ops",
+                ),
+                name="movies_movie_director_trgm",
+            ),
+        ),
+    ]
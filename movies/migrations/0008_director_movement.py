@@ -0,0 +1,135 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:02
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Min
+from django.db.models.functions import Upper
+from django.utils.text import slugify
+
+ENTITIES = (("Director", "director"), ("Movement", "movement"))
+
+
+def backfill_entities(apps, schema_editor):
+    Movie = apps.get_model("movies", "Movie")
+    movie_table = Movie._meta.db_table
+    for model_name, column in ENTITIES:
+        Entity = apps.get_model("movies", model_name)
+        table = Entity._meta.db_table
+        # Names that differ only in case share an entity, named after the first spelling.
+        names = (
+            Movie.objects.exclude(**{column: ""})
+            .values(key=Upper(column))
+            .annotate(name=Min(column))
+            .order_by("name")
+            .values_list("name", flat=True)
+        )
+        entities, slugs = [], set()
+        for name in names.iterator(chunk_size=5000):
+            base_slug = slugify(name)[:240] or model_name.lower()
+            slug, suffix = base_slug, 1
+            while slug in slugs:
+                suffix += 1
+                slug = f"{base_slug}-{suffix}"
+            slugs.add(slug)
+            entities.append(Entity(name=name, slug=slug))
+        Entity.objects.bulk_create(entities, batch_size=5000)
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {movie_table} AS movie SET {column}_ref_id = entity.id
+                FROM {table} AS entity WHERE UPPER(movie.{column}) = UPPER(entity.name)
+                """
+            )
+            cursor.execute(
+                f"""
+                UPDATE {table} AS entity
+                SET movie_count = stats.movie_count,
+                    rating_count = stats.rating_count,
+                    rating_sum = stats.rating_sum,
+                    avg_rating = ROUND(stats.rating_sum / NULLIF(stats.rating_count, 0), 2)
+                FROM (
+                    SELECT {column}_ref_id AS id, COUNT(*) AS movie_count,
+                           SUM(total_ratings) AS rating_count, SUM(rating_sum) AS rating_sum
+                    FROM {movie_table} WHERE {column}_ref_id IS NOT NULL GROUP BY {column}_ref_id
+                ) AS stats
+                WHERE entity.id = stats.id
+                """
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0007_movie_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Director",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=255)),
+                ("slug", models.SlugField(max_length=255, unique=True)),
+                ("movie_count", models.IntegerField(default=0)),
+                ("rating_count", models.IntegerField(default=0)),
+                ("rating_sum", models.DecimalField(decimal_places=1, default=0, max_digits=14)),
+                ("avg_rating", models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+            ],
+            options={
+                "ordering": ["name"],
+                "abstract": False,
+                "constraints": [
+                    models.UniqueConstraint(
+                        django.db.models.functions.text.Upper("name"), name="unique_director_name_ci"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="Movement",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=255)),
+                ("slug", models.SlugField(max_length=255, unique=True)),
+                ("movie_count", models.IntegerField(default=0)),
+                ("rating_count", models.IntegerField(default=0)),
+                ("rating_sum", models.DecimalField(decimal_places=1, default=0, max_digits=14)),
+                ("avg_rating", models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+            ],
+            options={
+                "ordering": ["name"],
+                "abstract": False,
+                "constraints": [
+                    models.UniqueConstraint(
+                        django.db.models.functions.text.Upper("name"), name="unique_movement_name_ci"
+                    )
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="movie",
+            name="director_ref",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="movies",
+                to="movies.director",
+            ),
+        ),
+        migrations.AddField(
+            model_name="movie",
+            name="movement_ref",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="movies",
+                to="movies.movement",
+            ),
+        ),
+        migrations.RunPython(backfill_entities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+ENTITIES = (("Director", "director"), ("Movement", "movement"))
+
+
+def backfill_top_movies(apps, schema_editor):
+    movie_table = apps.get_model("movies", "Movie")._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        for model_name, column in ENTITIES:
+            table = apps.get_model("movies", model_name)._meta.db_table
+            cursor.execute(
+                f"""
+                UPDATE {table} AS entity SET top_movie_id = top.id
+                FROM (
+                    SELECT DISTINCT ON ({column}_ref_id) {column}_ref_id AS entity_id, id
+                    FROM {movie_table} WHERE {column}_ref_id IS NOT NULL
+                    ORDER BY {column}_ref_id, average_rating DESC, total_ratings DESC, id
+                ) AS top
+                WHERE entity.id = top.entity_id
+                """
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0008_director_movement"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="director",
+            name="top_movie",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="movies.movie",
+            ),
+        ),
+        migrations.AddField(
+            model_name="movement",
+            name="top_movie",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="movies.movie",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["director_ref", "-average_rating", "-total_ratings", "id"], name="movies_director_top_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["movement_ref", "-average_rating", "-total_ratings", "id"], name="movies_movement_top_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_top_movies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0009_entity_top_movie"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MovieSimilarity",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("score", models.FloatField()),
+                ("computed_at", models.DateTimeField()),
+                (
+                    "movie",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="similarities", to="movies.movie"
+                    ),
+                ),
+                (
+                    "similar",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="movies.movie"),
+                ),
+            ],
+            options={
+                "ordering": ["movie", "-score"],
+                "indexes": [models.Index(fields=["movie", "-score"], name="movies_similarity_rank_idx")],
+                "constraints": [models.UniqueConstraint(fields=("movie", "similar"), name="unique_movie_similarity")],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0010_moviesimilarity"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="moviesimilarity",
+            name="unique_movie_similarity",
+        ),
+        migrations.AddField(
+            model_name="moviesimilarity",
+            name="source",
+            field=models.CharField(
+                choices=[("ratings", "ratings"), ("content", "content")], default="ratings", max_length=10
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="moviesimilarity",
+            constraint=models.UniqueConstraint(
+                fields=("movie", "similar", "source"), name="unique_movie_similarity_source"
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.1.4 on 2026-10-18 21:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_weighted_scores(apps, schema_editor):
+    movie_table = apps.get_model("movies", "Movie")._meta.db_table
+    prior_table = apps.get_model("movies", "RatingPrior")._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {prior_table} (id, mean, weight, updated_at)
+            SELECT 1, COALESCE(ROUND(SUM(rating_sum) / NULLIF(SUM(total_ratings), 0), 2), 0), %s, NOW()
+            FROM {movie_table}
+            """,
+            [settings.RATING_PRIOR_WEIGHT],
+        )
+        cursor.execute(
+            f"""
+            UPDATE {movie_table} AS movie
+            SET weighted_score = ROUND(
+                (prior.weight * prior.mean + movie.rating_sum) / (prior.weight + movie.total_ratings), 4
+            )
+            FROM {prior_table} AS prior
+            WHERE prior.id = 1 AND movie.total_ratings > 0
+            """
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0011_moviesimilarity_source"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RatingPrior",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("mean", models.DecimalField(decimal_places=2, default=0, max_digits=3)),
+                ("weight", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="movie",
+            name="weighted_score",
+            field=models.DecimalField(decimal_places=4, default=0, editable=False, max_digits=6),
+        ),
+        migrations.AddField(
+            model_name="movie",
+            name="decade",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.F("release_year") / 10 * 10,
+                output_field=models.IntegerField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(fields=["-weighted_score", "-id"], name="movies_weighted_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(fields=["director_ref", "-weighted_score", "-id"], name="movies_director_weighted_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(fields=["movement_ref", "-weighted_score", "-id"], name="movies_movement_weighted_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(fields=["decade", "-weighted_score", "-id"], name="movies_decade_weighted_idx"),
+        ),
+        migrations.RunPython(backfill_weighted_scores, migrations.RunPython.noop),
+    ]
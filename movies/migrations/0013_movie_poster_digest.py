@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0012_movie_weighted_score"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="movie",
+            name="poster_digest",
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32, null=True),
+        ),
+    ]
@@ -1,16 +1,243 @@
+import logging
 import uuid
-from decimal import ROUND_HALF_UP, Decimal
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-from django.db.models import Avg
+from django.db import connection, models, transaction
+from django.db.models import F, Func, TextField
+from django.db.models.functions import Lower, Upper
 from django.utils import timezone
 from django.utils.text import slugify
 
+from movies.caching import bump_generation, get_generation
+
+logger = logging.getLogger(__name__)
+
+
+class ImmutableUnaccent(Func):  # pylint: disable=abstract-method
+    """``unaccent()`` through the IMMUTABLE wrapper created in migration 0007, usable in index expressions."""
+
+    function = "movies_immutable_unaccent"
+    output_field = TextField()
+
+
+def prefix_index(field, name):
+    """Btree index over ``lower(unaccent(field))`` that serves prefix (``^@``) range scans in index order."""
+    return models.Index(OpClass(Lower(ImmutableUnaccent(field)), name="text_pattern_ops"), name=name)
+
+
+def trigram_index(field, name):
+    """GIN trigram index over ``lower(unaccent(field))``, the form autocomplete matches against."""
+    return GinIndex(OpClass(Lower(ImmutableUnaccent(field)), name="gin_trgm_ops"), name=name)
+
+
+class CatalogEntity(models.Model):
+    """A director or movement that movies are credited to, with stats kept current on write.
+
+    ``movie_count``, the rating totals and the top movie over all of the
+    entity's movies are shifted by ``movies.signals`` when a movie is created,
+    re-credited or deleted, and by ``Movie.apply_rating_delta``/
+    ``Movie.recompute_ratings`` when ratings change, so listing entities never
+    aggregates ``movies_movie``. ``refresh_stats`` recomputes them from scratch.
+    """
+
+    # The top movie is the best rated, ties going to the most rated, then the oldest row.
+    TOP_MOVIE_ORDER = "average_rating DESC, total_ratings DESC, id"
+    # Ratings score 0 to 5; totals whose average falls outside that disagree, and the entity gets no average.
+    MAX_SCORE = 5
+    # Generation label -> stats its writes change in SQL, without bumping this model's generation.
+    DERIVED_FIELDS = {
+        "movies.movie": ("movie_count", "rating_count", "rating_sum", "avg_rating", "top_movie"),
+        "reviews.rating": ("rating_count", "rating_sum", "avg_rating", "top_movie"),
+    }
+
+    name = models.CharField(max_length=255)
+    slug = models.SlugField(max_length=255, unique=True)
+    movie_count = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+    rating_sum = models.DecimalField(max_digits=14, decimal_places=1, default=0)
+    avg_rating = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)
+    top_movie = models.ForeignKey("Movie", null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+
+    class Meta:
+        abstract = True
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            base_slug = slugify(self.name) or self._meta.model_name
+            taken = type(self).objects.filter(slug=base_slug).exists()
+            self.slug = f"{base_slug}-{uuid.uuid4().hex[:8]}" if taken else base_slug
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def for_name(cls, name):
+        """Return the entity credited as ``name`` (case-insensitively), creating it on first use."""
+        entity, _ = cls.objects.get_or_create(name__iexact=name, defaults={"name": name})
+        return entity
+
+    @classmethod
+    def lookup_id(cls, name):
+        """Resolve a name to an id through the unique ``UPPER(name)`` index, or ``None``."""
+        return cls.objects.filter(name__iexact=name).values_list("id", flat=True).first()
+
+    @classmethod
+    def _avg_rating_sql(cls, rating_sum, rating_count):
+        """SQL for the average of ``rating_count`` ratings adding up to ``rating_sum``, ``NULL`` if they disagree."""
+        return f"""
+            CASE WHEN ({rating_sum}) BETWEEN 0 AND {cls.MAX_SCORE} * ({rating_count})
+                THEN ROUND(({rating_sum}) / NULLIF({rating_count}, 0), 2)
+            END
+        """
+
+    @classmethod
+    def _top_movie_sql(cls, exclude=""):
+        """Subquery for the id of the entity's top movie, served by the movie's ``(ref, rank)`` index."""
+        column = cls.movies.field.column
+        return f"""
+            SELECT id FROM {cls.movies.field.model._meta.db_table}
+            WHERE {column} = entity.id {exclude} ORDER BY {cls.TOP_MOVIE_ORDER} LIMIT 1
+        """
+
+    @classmethod
+    def move_movie(cls, old_id, new_id, rating_sum, rating_count):
+        """Move one movie, with its rating totals, from entity ``old_id`` to ``new_id`` (either may be ``None``).
+
+        Runs after the movie row is written, so both entities pick their top
+        movie from their current movies.
+        """
+        shifts = [(entity_id, sign) for entity_id, sign in ((old_id, -1), (new_id, 1)) if entity_id is not None]
+        if old_id == new_id or not shifts:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {cls._meta.db_table} AS entity
+                SET movie_count = entity.movie_count + shift.sign,
+                    rating_count = entity.rating_count + shift.sign * %(count)s,
+                    rating_sum = entity.rating_sum + shift.sign * %(sum)s,
+                    avg_rating = {cls._avg_rating_sql(
+                        "entity.rating_sum + shift.sign * %(sum)s", "entity.rating_count + shift.sign * %(count)s"
+                    )},
+                    top_movie_id = ({cls._top_movie_sql()})
+                FROM unnest(%(ids)s::bigint[], %(signs)s::integer[]) AS shift(id, sign)
+                WHERE entity.id = shift.id
+                """,
+                {
+                    "ids": [entity_id for entity_id, _ in shifts],
+                    "signs": [sign for _, sign in shifts],
+                    "sum": rating_sum,
+                    "count": rating_count,
+                },
+            )
+
+    @classmethod
+    def shift_ratings_sql(cls, column):
+        """SQL updating the rating totals of entities from a ``changed`` CTE of per-movie rating deltas.
+
+        ``changed`` must expose ``column`` (the movie's foreign key to this
+        entity), ``score_delta``, ``count_delta`` and the movie's new ``id``,
+        ``average_rating`` and ``total_ratings``. Statements in one query share
+        a snapshot, so the top movie is the better of the best changed movie
+        and the best movie outside ``changed``.
+        """
+        return f"""
+            UPDATE {cls._meta.db_table} AS entity
+            SET rating_sum = entity.rating_sum + delta.score,
+                rating_count = entity.rating_count + delta.count,
+                avg_rating = {cls._avg_rating_sql(
+                    "entity.rating_sum + delta.score", "entity.rating_count + delta.count"
+                )},
+                top_movie_id = (
+                    SELECT id FROM (
+                        SELECT delta.movie_id AS id, delta.average_rating, delta.total_ratings
+                        UNION ALL
+                        SELECT id, average_rating, total_ratings FROM {cls.movies.field.model._meta.db_table}
+                        WHERE id = ({cls._top_movie_sql("AND id NOT IN (SELECT id FROM changed)")})
+                    ) AS candidate
+                    ORDER BY {cls.TOP_MOVIE_ORDER} LIMIT 1
+                )
+            FROM (
+                SELECT DISTINCT ON ({column})
+                    {column} AS id, id AS movie_id, average_rating, total_ratings,
+                    SUM(score_delta) OVER entity_movies AS score, SUM(count_delta) OVER entity_movies AS count
+                FROM changed WHERE {column} IS NOT NULL
+                WINDOW entity_movies AS (PARTITION BY {column})
+                ORDER BY {column}, {cls.TOP_MOVIE_ORDER}
+            ) AS delta
+            WHERE entity.id = delta.id AND (delta.score <> 0 OR delta.count <> 0)
+        """
+
+    @classmethod
+    def refresh_stats(cls):
+        """Recompute every entity's stats from ``movies_movie`` and return how many changed."""
+        table = cls._meta.db_table
+        movie_table = cls.movies.field.model._meta.db_table
+        column = cls.movies.field.column
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Concurrent movie and rating writes wait for the refresh, then apply their deltas on top of it.
+            cursor.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+            cursor.execute(
+                f"""
+                UPDATE {table} AS entity
+                SET movie_count = COALESCE(stats.movie_count, 0),
+                    rating_count = COALESCE(stats.rating_count, 0),
+                    rating_sum = COALESCE(stats.rating_sum, 0),
+                    avg_rating = {cls._avg_rating_sql("stats.rating_sum", "stats.rating_count")},
+                    top_movie_id = stats.top_movie_id
+                FROM {table} AS stored
+                LEFT JOIN (
+                    SELECT {column} AS id, COUNT(*) AS movie_count, SUM(total_ratings) AS rating_count,
+                           SUM(rating_sum) AS rating_sum,
+                           (array_agg(id ORDER BY {cls.TOP_MOVIE_ORDER}))[1] AS top_movie_id
+                    FROM {movie_table} WHERE {column} IS NOT NULL GROUP BY {column}
+                ) AS stats ON stats.id = stored.id
+                WHERE entity.id = stored.id
+                  AND (entity.movie_count, entity.rating_count, entity.rating_sum, entity.top_movie_id)
+                      IS DISTINCT FROM (
+                          COALESCE(stats.movie_count, 0), COALESCE(stats.rating_count, 0),
+                          COALESCE(stats.rating_sum, 0), stats.top_movie_id
+                      )
+                """
+            )
+            refreshed = cursor.rowcount
+        transaction.on_commit(lambda: bump_generation(cls.movies.field.model._meta.label_lower))
+        return refreshed
+
+
+class Director(CatalogEntity):  # noqa: DJ08
+    class Meta(CatalogEntity.Meta):
+        constraints = [models.UniqueConstraint(Upper("name"), name="unique_director_name_ci")]
+
+
+class Movement(CatalogEntity):  # noqa: DJ08
+    class Meta(CatalogEntity.Meta):
+        constraints = [models.UniqueConstraint(Upper("name"), name="unique_movement_name_ci")]
+
 
 class Movie(models.Model):
+    FACET_FIELDS = ("director", "movement", "release_year", "country")
+    # Foreign key -> (name field it is resolved from, entity model).
+    ENTITY_FIELDS = {"director_ref": ("director", Director), "movement_ref": ("movement", Movement)}
+    # Fields Movie.leaderboard ranks within.
+    LEADERBOARDS = ("director_ref", "movement_ref", "decade")
+    # Written in SQL by rating writes (apply_rating_delta/recompute_ratings), never by saving a loaded movie.
+    RATING_FIELDS = ("rating_sum", "total_ratings", "average_rating", "weighted_score")
+    # Generation label -> fields its writes change in SQL (see CatalogEntity.DERIVED_FIELDS).
+    DERIVED_FIELDS = {"reviews.rating": RATING_FIELDS}
+    _stored_facets = None
+    _stored_refs = None
+    _stored_slug = None
+    _stored_poster = None
+    _stored_ratings = None
+
     title = models.CharField(max_length=255, db_index=True)
     original_title = models.CharField(max_length=255, blank=True, default="", db_index=True)
     director = models.CharField(max_length=255, db_index=True)
@@ -25,13 +252,33 @@ class Movie(models.Model):
     runtime = models.IntegerField(validators=[MinValueValidator(1)])
     country = models.CharField(max_length=100)
     movement = models.CharField(max_length=100, db_index=True)
+    # The director/movement names above resolved to entities by movies.signals on every save.
+    director_ref = models.ForeignKey(
+        Director, null=True, blank=True, editable=False, on_delete=models.SET_NULL, related_name="movies"
+    )
+    movement_ref = models.ForeignKey(
+        Movement, null=True, blank=True, editable=False, on_delete=models.SET_NULL, related_name="movies"
+    )
     cinematographer = models.CharField(max_length=255, blank=True)
     poster = models.ImageField(upload_to="posters/", null=True, blank=True)
+    # Content hash naming the poster's resized variants (movies/posters.py), set by movies.signals.
+    # NULL rather than "" marks a poster that has not been hashed yet.
+    poster_digest = models.CharField(max_length=32, null=True, blank=True, editable=False, db_index=True)  # noqa: DJ01
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     slug = models.SlugField(unique=True, blank=True, db_index=True)
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0, db_index=True)
     total_ratings = models.IntegerField(default=0)
+    rating_sum = models.DecimalField(max_digits=12, decimal_places=1, default=0)
+    # Bayesian average of the ratings and RatingPrior's pseudo-ratings of the global mean, 0 while
+    # unrated; maintained with the aggregates above and ranks the leaderboards (Movie.leaderboard).
+    weighted_score = models.DecimalField(max_digits=6, decimal_places=4, default=0, editable=False)
+    decade = models.GeneratedField(
+        expression=F("release_year") / 10 * 10, output_field=models.IntegerField(), db_persist=True
+    )
+    # Weighted tsvector over title/original_title (A), director (B), cinematographer (C) and
+    # description (D), maintained by the movies_movie_search_vector trigger (migration 0006).
+    search_vector = SearchVectorField(null=True, editable=False)
     favorited_by = models.ManyToManyField(
         settings.AUTH_USER_MODEL, through="users.UserFavoriteMovie", related_name="favorited_movies", blank=True
     )
@@ -43,7 +290,26 @@ class Movie(models.Model):
             models.Index(fields=["movement", "release_year"]),
             models.Index(fields=["average_rating", "release_year"]),
             models.Index(fields=["slug"]),
-            models.Index(fields=["-release_year", "-average_rating"]),
+            models.Index(fields=["-release_year", "-average_rating", "-id"]),
+            # Top movie per director/movement (CatalogEntity.TOP_MOVIE_ORDER) with a LIMIT 1 index scan.
+            models.Index(
+                fields=["director_ref", "-average_rating", "-total_ratings", "id"], name="movies_director_top_idx"
+            ),
+            models.Index(
+                fields=["movement_ref", "-average_rating", "-total_ratings", "id"], name="movies_movement_top_idx"
+            ),
+            # Leaderboards overall and per director, movement and decade, each one index range scan.
+            models.Index(fields=["-weighted_score", "-id"], name="movies_weighted_idx"),
+            models.Index(fields=["director_ref", "-weighted_score", "-id"], name="movies_director_weighted_idx"),
+            models.Index(fields=["movement_ref", "-weighted_score", "-id"], name="movies_movement_weighted_idx"),
+            models.Index(fields=["decade", "-weighted_score", "-id"], name="movies_decade_weighted_idx"),
+            GinIndex(fields=["search_vector"], name="movies_movie_search_gin"),
+            prefix_index("title", "movies_movie_title_prefix"),
+            prefix_index("original_title", "movies_movie_orig_title_prefix"),
+            prefix_index("director", "movies_movie_director_prefix"),
+            trigram_index("title", "movies_movie_title_trgm"),
+            trigram_index("original_title", "movies_movie_orig_title_trgm"),
+            trigram_index("director", "movies_movie_director_trgm"),
         ]
         ordering = ["-release_year", "-average_rating"]
 
@@ -57,6 +323,37 @@ class Movie(models.Model):
         # Fallback to default poster
         return "/static/movies/posters/default.jpg"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_facets()
+        return instance
+
+    def facet_values(self):
+        """Return the ``(facet, value)`` pairs this movie counts towards in ``MovieFacet``."""
+        return {(field, str(getattr(self, field))) for field in self.FACET_FIELDS}
+
+    def remember_facets(self):
+        """Record the stored facet values, entity references, slug, poster and ratings; a later save needs no read."""
+        deferred = self.get_deferred_fields()
+        self.remember_ratings()
+        self._stored_slug = self.__dict__.get("slug")
+        self._stored_poster = self.__dict__.get("poster")
+        self._stored_facets = None if deferred.intersection(self.FACET_FIELDS) else self.facet_values()
+        attnames = [f"{field}_id" for field in self.ENTITY_FIELDS]
+        self._stored_refs = (
+            None if deferred.intersection(attnames) else {name: getattr(self, name) for name in attnames}
+        )
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self.remember_ratings(self.RATING_FIELDS if fields is None else fields)
+
+    def remember_ratings(self, fields=RATING_FIELDS):
+        """Record the loaded ``fields`` of the rating aggregates as stored, so a save can tell they were edited."""
+        loaded = {name: self.__dict__[name] for name in self.RATING_FIELDS if name in fields and name in self.__dict__}
+        self._stored_ratings = {**(self._stored_ratings or {}), **loaded}
+
     def clean(self):
         super().clean()
         if self.release_year and self.release_year < 1888:
@@ -70,27 +367,327 @@ class Movie(models.Model):
         return f"{self.title} ({self.release_year}) - {self.director}"
 
     def save(self, *args, **kwargs):
-        self.full_clean()
+        # The entity references are resolved from the names in pre_save, after validation.
+        self.full_clean(exclude=list(self.ENTITY_FIELDS))
         if not self.slug:
             base_slug = slugify(self.title)
             if not Movie.objects.filter(slug=base_slug).exists():
                 self.slug = base_slug
             else:
                 self.slug = f"{base_slug}-{uuid.uuid4().hex[:8]}"
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if not self._state.adding and not args and update_fields is None and not kwargs.get("force_insert"):
+            # A movie loaded before a rating write would otherwise put its stale aggregates back.
+            self._warn_unsaved_ratings()
+            update_fields = kwargs["update_fields"] = self._saved_fields()
+        # Keep the row, its MovieFacet counts and its entities' stats (updated by movies.signals) in step.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+        self.remember_ratings(self.RATING_FIELDS if update_fields is None else update_fields)
+
+    def _warn_unsaved_ratings(self):
+        """Log rating aggregates edited in memory, which a save without ``update_fields`` leaves unwritten."""
+        stored = self._stored_ratings or {}
+        edited = [name for name, value in stored.items() if self.__dict__.get(name, value) != value]
+        if edited:
+            logger.warning(
+                "Not saving %s of movie %s: rating writes maintain them; pass update_fields to overwrite",
+                ", ".join(edited),
+                self.pk,
+            )
+
+    def _saved_fields(self):
+        """Return the loaded fields an ordinary save writes: all but the rating aggregates and generated columns."""
+        skipped = self.get_deferred_fields().union(self.RATING_FIELDS)
+        return [
+            field.attname
+            for field in self._meta.concrete_fields
+            if not (field.primary_key or field.generated or field.attname in skipped)
+        ]
 
     def update_rating(self):
-        ratings = self.ratings.all()
-        if ratings:
-            avg_rating = ratings.aggregate(Avg("score"))["score__avg"]
-            avg_decimal = Decimal(str(avg_rating)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            self.average_rating = avg_decimal
-            self.total_ratings = ratings.count()
-        else:
-            self.average_rating = Decimal("0.00")
-            self.total_ratings = 0
-        self.save(update_fields=["average_rating", "total_ratings"])
+        """Recompute the rating aggregates from scratch.
+
+        Rating writes keep the aggregates current through ``apply_rating_delta``;
+        this full recompute is only needed to reconcile after bulk changes.
+        """
+        Movie.recompute_ratings([self.pk])
+        self.refresh_from_db(fields=list(self.RATING_FIELDS))
+
+    @classmethod
+    def leaderboard(cls, limit, **scope):
+        """Return the ``limit`` movies with the best ``weighted_score``, optionally within one of ``LEADERBOARDS``.
+
+        ``scope`` is at most one ``field=value`` filter, so the ranking is read in
+        order from that field's ``(field, -weighted_score, -id)`` index.
+        """
+        unknown = set(scope) - set(cls.LEADERBOARDS)
+        if unknown or len(scope) > 1:
+            raise ValueError(f"Expected at most one of {', '.join(cls.LEADERBOARDS)}, got {', '.join(scope)}")
+        return cls.objects.filter(**scope).order_by("-weighted_score", "-id")[:limit]
+
+    @classmethod
+    def weighted_score_sql(cls, rating_sum, total_ratings):
+        """SQL for the ``weighted_score`` of a movie whose ratings add up to ``rating_sum`` over ``total_ratings``."""
+        prior = RatingPrior._meta.db_table
+        return f"""
+            CASE WHEN {total_ratings} > 0 THEN ROUND(
+                (COALESCE((SELECT weight * mean FROM {prior} WHERE id = {RatingPrior.ID}), 0) + {rating_sum})
+                / (COALESCE((SELECT weight FROM {prior} WHERE id = {RatingPrior.ID}), 0) + {total_ratings}),
+                4
+            ) ELSE 0 END
+        """
+
+    @classmethod
+    def _shift_entity_ratings_sql(cls, changed):
+        """Wrap ``changed``, a movie UPDATE returning per-movie rating deltas, so entity totals move with it."""
+        entity_updates = ", ".join(
+            f"{field}_shift AS ({entity.shift_ratings_sql(f'{field}_id')})"
+            for field, (_, entity) in cls.ENTITY_FIELDS.items()
+        )
+        return f"WITH changed AS ({changed}), {entity_updates}"
+
+    @classmethod
+    def apply_rating_delta(cls, movie_id, score_delta, count_delta):
+        """Shift a movie's rating aggregates, and its director's and movement's, by one rating write.
+
+        Returns the new ``(rating_sum, total_ratings, average_rating)`` or ``None``
+        if the movie no longer exists.
+        """
+        changed = f"""
+            UPDATE {cls._meta.db_table}
+            SET rating_sum = rating_sum + %(score)s,
+                total_ratings = total_ratings + %(count)s,
+                average_rating = COALESCE(
+                    ROUND((rating_sum + %(score)s) / NULLIF(total_ratings + %(count)s, 0), 2), 0
+                ),
+                weighted_score = {cls.weighted_score_sql("rating_sum + %(score)s", "total_ratings + %(count)s")}
+            WHERE id = %(id)s
+            RETURNING id, director_ref_id, movement_ref_id, %(score)s::numeric AS score_delta,
+                      %(count)s::integer AS count_delta, rating_sum, total_ratings, average_rating
+        """
+        returning = "SELECT rating_sum, total_ratings, average_rating FROM changed"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"{cls._shift_entity_ratings_sql(changed)} {returning}",
+                {"score": score_delta, "count": count_delta, "id": movie_id},
+            )
+            return cursor.fetchone()
+
+    @classmethod
+    def recompute_ratings(cls, movie_ids):
+        """Recompute the rating aggregates of many movies with one set-based UPDATE.
+
+        The movies' directors and movements are shifted by the difference, one
+        update per entity however many of its movies are in the batch.
+        """
+        rating_table = cls.ratings.field.model._meta.db_table
+        changed = f"""
+            UPDATE {cls._meta.db_table} AS movie
+            SET rating_sum = totals.score_sum,
+                total_ratings = totals.count,
+                average_rating = COALESCE(ROUND(totals.score_sum / NULLIF(totals.count, 0), 2), 0),
+                weighted_score = {cls.weighted_score_sql("totals.score_sum", "totals.count")}
+            FROM (
+                SELECT ids.id, COALESCE(SUM(rating.score), 0) AS score_sum, COUNT(rating.id) AS count
+                FROM unnest(%s::bigint[]) AS ids(id)
+                LEFT JOIN {rating_table} AS rating ON rating.movie_id = ids.id
+                GROUP BY ids.id
+            ) AS totals,
+            {cls._meta.db_table} AS stored
+            WHERE movie.id = totals.id AND stored.id = totals.id
+            RETURNING movie.id, movie.director_ref_id, movie.movement_ref_id,
+                      totals.score_sum - stored.rating_sum AS score_delta,
+                      (totals.count - stored.total_ratings)::integer AS count_delta,
+                      movie.average_rating, movie.total_ratings
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f"{cls._shift_entity_ratings_sql(changed)} SELECT COUNT(*) FROM changed", [list(movie_ids)])
+            return cursor.fetchone()[0]
 
     @property
     def year(self):
         return self.release_year
+
+
+class MovieFacet(models.Model):
+    """Number of movies per director, movement, release year and country.
+
+    Rows are moved incrementally by ``movies.signals`` whenever a movie is
+    created, edited or deleted, so list pages read facet counts without
+    aggregating ``movies_movie``. ``rebuild`` recomputes them from scratch.
+    """
+
+    facet = models.CharField(max_length=20, choices=[(field, field) for field in Movie.FACET_FIELDS])
+    value = models.CharField(max_length=255)
+    movie_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["facet", "value"], name="unique_movie_facet_value")]
+        ordering = ["facet", "value"]
+
+    def __str__(self):
+        return f"{self.facet}={self.value} ({self.movie_count})"
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """Add ``{(facet, value): delta}`` to the stored counts in one upsert and drop rows that reach zero."""
+        keys = sorted(key for key, delta in deltas.items() if delta)
+        if not keys:
+            return
+        facets = [facet for facet, _ in keys]
+        values = [value for _, value in keys]
+        table = cls._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (facet, value, movie_count)
+                SELECT * FROM unnest(%s::varchar[], %s::varchar[], %s::integer[])
+                ON CONFLICT (facet, value) DO UPDATE SET movie_count = {table}.movie_count + EXCLUDED.movie_count
+                """,
+                [facets, values, [deltas[key] for key in keys]],
+            )
+            cursor.execute(
+                f"""
+                DELETE FROM {table}
+                WHERE movie_count <= 0 AND (facet, value) IN (SELECT * FROM unnest(%s::varchar[], %s::varchar[]))
+                """,
+                [facets, values],
+            )
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every facet count from ``movies_movie``."""
+        table = cls._meta.db_table
+        movie_table = Movie._meta.db_table
+        selects = " UNION ALL ".join(
+            f"SELECT '{field}', {field}::varchar, COUNT(*) FROM {movie_table} GROUP BY {field}"
+            for field in Movie.FACET_FIELDS
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Concurrent movie writes wait for the rebuild, then apply their deltas on top of it.
+            cursor.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+            cursor.execute(f"DELETE FROM {table}")
+            cursor.execute(f"INSERT INTO {table} (facet, value, movie_count) {selects}")
+            rebuilt = cursor.rowcount
+        transaction.on_commit(lambda: bump_generation(Movie._meta.label_lower))
+        return rebuilt
+
+    @classmethod
+    def snapshot(cls):
+        """Return ``{facet: [{facet: value, "movie_count": n}, ...]}``, cached until the next movie write.
+
+        Values are sorted ascending, except release years which are newest first.
+        """
+        key = f"movies:facets:{get_generation(Movie._meta.label_lower)}"
+        facets = cache.get(key)
+        if facets is None:
+            facets = {field: [] for field in Movie.FACET_FIELDS}
+            rows = cls.objects.filter(movie_count__gt=0).values_list("facet", "value", "movie_count")
+            for facet, value, movie_count in rows:
+                facets[facet].append({facet: value, "movie_count": movie_count})
+            for entry in facets["release_year"]:
+                entry["release_year"] = int(entry["release_year"])
+            facets["release_year"].sort(key=lambda entry: entry["release_year"], reverse=True)
+            cache.set(key, facets, settings.CACHE_TTL)
+        return facets
+
+
+class RatingPrior(models.Model):
+    """The prior every movie's ``weighted_score`` is shrunk towards: ``weight`` ratings of the global ``mean``.
+
+    A single row read by the rating aggregate UPDATEs. The mean drifts slowly, so
+    ``refresh`` recomputes it on a schedule from the movies' stored rating totals
+    and rescores every movie only when it (or ``RATING_PRIOR_WEIGHT``) changed.
+    """
+
+    ID = 1
+
+    mean = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    weight = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.weight} ratings of {self.mean}"
+
+    @classmethod
+    def refresh(cls, weight=None):
+        """Recompute the mean, store ``weight`` (default ``RATING_PRIOR_WEIGHT``) and return the movies rescored."""
+        weight = settings.RATING_PRIOR_WEIGHT if weight is None else weight
+        table = cls._meta.db_table
+        movie_table = Movie._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"SELECT mean, weight FROM {table} WHERE id = %s FOR UPDATE", [cls.ID])
+            stored = cursor.fetchone()
+            cursor.execute(
+                f"SELECT COALESCE(ROUND(SUM(rating_sum) / NULLIF(SUM(total_ratings), 0), 2), 0) FROM {movie_table}"
+            )
+            prior = (cursor.fetchone()[0], weight)
+            if prior == stored:
+                return 0
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (id, mean, weight, updated_at) VALUES (%s, %s, %s, NOW())
+                ON CONFLICT (id) DO UPDATE
+                SET mean = EXCLUDED.mean, weight = EXCLUDED.weight, updated_at = EXCLUDED.updated_at
+                """,
+                [cls.ID, *prior],
+            )
+            score = Movie.weighted_score_sql("rating_sum", "total_ratings")
+            cursor.execute(f"UPDATE {movie_table} SET weighted_score = {score} WHERE weighted_score <> {score}")
+            rescored = cursor.rowcount
+        transaction.on_commit(lambda: bump_generation(Movie._meta.label_lower))
+        return rescored
+
+
+class MovieSimilarity(models.Model):
+    """One of a movie's nearest neighbours, by ratings or by metadata.
+
+    Rows are precomputed by ``movies.similarity`` from the rating table (see
+    ``manage.py build_movie_similarity``) and by ``movies.content`` from titles'
+    descriptions and credits (``manage.py build_content_similarity``). Each movie
+    keeps at most ``MOVIE_SIMILARITY_TOP_K`` neighbours per source, replaced
+    together when it is rescored.
+    """
+
+    RATINGS, CONTENT = "ratings", "content"
+    # In order of preference: content neighbours stand in for titles nobody has rated yet.
+    SOURCES = (RATINGS, CONTENT)
+
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="similarities")
+    similar = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="+")
+    source = models.CharField(max_length=10, choices=[(source, source) for source in SOURCES], default=RATINGS)
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["movie", "similar", "source"], name="unique_movie_similarity_source")
+        ]
+        indexes = [models.Index(fields=["movie", "-score"], name="movies_similarity_rank_idx")]
+        ordering = ["movie", "-score"]
+
+    def __str__(self):
+        return f"{self.movie_id} ~ {self.similar_id} ({self.source} {self.score:.3f})"
+
+    @classmethod
+    def neighbours(cls, movie_id, limit, source=None):
+        """Return up to ``limit`` movies most similar to ``movie_id``, best first.
+
+        Each movie carries its ``similarity`` and ``similarity_source``. Without a
+        ``source`` the first of ``SOURCES`` the movie has neighbours from is used.
+        """
+        rows = cls.objects.filter(movie_id=movie_id).select_related("similar").order_by("-score", "similar_id")
+        if source is not None:
+            rows = rows.filter(source=source)[:limit]
+        by_source = {}
+        for row in rows:
+            by_source.setdefault(row.source, []).append(row)
+        for name in cls.SOURCES:
+            if by_source.get(name):
+                movies = []
+                for row in by_source[name][:limit]:
+                    row.similar.similarity, row.similar.similarity_source = row.score, row.source
+                    movies.append(row.similar)
+                return movies
+        return []
@@ -1,8 +1,200 @@
-from rest_framework.pagination import PageNumberPagination
+import binascii
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import DatabaseError, connection, connections
+from django.db.models import BooleanField, Q, QuerySet
+from django.db.models.expressions import Col, RawSQL
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from movies.caching import get_generation
+
+
+def estimate_count(queryset):
+    """Return the Postgres planner's row estimate for ``queryset``, or ``None``.
+
+    Unfiltered querysets read ``pg_class.reltuples`` (kept current by
+    autovacuum/ANALYZE); anything else uses the top-level row estimate of
+    ``EXPLAIN``. Neither touches the table's rows.
+    """
+    db_connection = connections[queryset.db]
+    if db_connection.vendor != "postgresql":
+        return None
+    query = queryset.order_by().query
+    try:
+        with db_connection.cursor() as cursor:
+            if not (query.where or query.distinct or query.group_by or query.combinator or query.is_sliced):
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [query.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+                # reltuples is -1 until the table is first vacuumed or analyzed.
+                return row[0] if row and row[0] >= 0 else None
+            sql, params = query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+    except DatabaseError:
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _filtered_fields(query):
+    """Return the names of the model fields read by ``query``'s WHERE clause."""
+    fields, nodes = set(), [query.where]
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, Col):
+            fields.add(node.target.name)
+        elif hasattr(node, "get_source_expressions"):
+            nodes.extend(expression for expression in node.get_source_expressions() if expression is not None)
+    return fields
+
+
+def _count_generations(queryset):
+    """Return the generation labels a cached count of ``queryset`` is keyed on.
+
+    That is the model's own label plus, when the query filters on columns that
+    other models' writes maintain in SQL (a model's ``DERIVED_FIELDS``), the
+    labels of those models.
+    """
+    label = queryset.model._meta.label_lower
+    derived = getattr(queryset.model, "DERIVED_FIELDS", {})
+    filtered = _filtered_fields(queryset.query) if derived else set()
+    return [label, *(source for source, fields in derived.items() if filtered.intersection(fields))]
+
+
+def _count_cache_key(queryset):
+    """Return the cache key for the count of ``queryset``, or ``None`` if it matches nothing."""
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    signature = hashlib.sha1(f"{sql}|{params!r}".encode()).hexdigest()
+    generations = ":".join(str(get_generation(label)) for label in _count_generations(queryset))
+    return f"pagination:count:{queryset.model._meta.label_lower}:{generations}:{signature}"
+
+
+def count_queryset(queryset):
+    """Count ``queryset`` and return ``(count, is_approximate)``.
+
+    Counts are cached per query and per model generation, so any write to the
+    model (see ``movies.signals``), or to a model whose writes change the
+    columns it filters on (``_count_generations``), invalidates them. On a cache miss the
+    planner estimate is used as-is when it is at least
+    ``PAGINATION_ESTIMATE_THRESHOLD`` rows; smaller results get an exact
+    ``COUNT(*)``.
+    """
+    key = _count_cache_key(queryset)
+    if key is None:
+        return 0, False
+    cached = cache.get(key)
+    if cached is not None:
+        return tuple(cached)
+
+    estimate = estimate_count(queryset)
+    if estimate is not None and estimate >= settings.PAGINATION_ESTIMATE_THRESHOLD:
+        result = (estimate, True)
+    else:
+        result = (queryset.count(), False)
+    cache.set(key, result, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+    return result
+
 
+def remember_count(queryset, count):
+    """Store an exact count obtained elsewhere so paginating ``queryset`` skips ``COUNT(*)``."""
+    key = _count_cache_key(queryset)
+    if key is not None:
+        cache.set(key, (count, False), settings.PAGINATION_COUNT_CACHE_TIMEOUT)
 
-class CustomPagination(PageNumberPagination):
+
+class CountingPage(Page):
+    """Page whose ``has_next`` does not trust an approximate count."""
+
+    has_more = None
+
+    def has_next(self):
+        if self.has_more is not None:
+            return self.has_more
+        return super().has_next()
+
+
+class CountingPaginator(Paginator):
+    """Paginator backed by ``count_queryset``: exact, cached or estimated counts.
+
+    When the count is approximate, pages past the estimate are still served and
+    the presence of a next page is decided by fetching one extra row, so a
+    stale estimate never hides or invents rows. ``count_is_approximate`` tells
+    callers whether ``count``/``num_pages`` can be shown as exact.
+    """
+
+    count_is_approximate = False
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        count, self.count_is_approximate = count_queryset(self.object_list)
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.count_is_approximate or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_approximate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        page = self._get_page(rows[: self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+    def _get_page(self, *args, **kwargs):
+        return CountingPage(*args, **kwargs)
+
+
+class CountingPageNumberPagination(PageNumberPagination):
+    """Default DRF pagination: page numbers over a ``CountingPaginator``."""
+
+    django_paginator_class = CountingPaginator
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.page.paginator.count,
+                "count_is_approximate": self.page.paginator.count_is_approximate,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_is_approximate"] = {"type": "boolean", "example": False}
+        return response_schema
+
+
+class CustomPagination(CountingPageNumberPagination):
     page_size = 12
     page_size_query_param = "page_size"
     max_page_size = 100
@@ -11,9 +203,158 @@ class CustomPagination(PageNumberPagination):
         return Response(
             {
                 "count": self.page.paginator.count,
+                "count_is_approximate": self.page.paginator.count_is_approximate,
                 "next": self.get_next_link(),
                 "previous": self.get_previous_link(),
                 "total_pages": self.page.paginator.num_pages,
                 "results": data,
             }
         )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["total_pages"] = {"type": "integer", "example": 12}
+        return response_schema
+
+
+class KeysetPagination(BasePagination):  # pylint: disable=abstract-method
+    """Cursor pagination that seeks on the full ordering tuple instead of using OFFSET.
+
+    The cursor is an opaque token holding the ordering values of the row at the
+    edge of the current page, so every page costs one index range scan no
+    matter how deep it is, and no COUNT query is issued. ``id`` is appended to
+    the ordering as a tiebreaker so the ordering is total.
+    """
+
+    page_size = 12
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering = ("-release_year", "-average_rating")
+    tiebreaker = "id"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.base_url = None
+        self.model = None
+        self.page = []
+        self.has_next = self.has_previous = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+        values, reverse = self.decode_cursor(request)
+
+        ordering = [self.flip(field) for field in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.seek_condition(ordering, values))
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        """Return the requested ordering (validated by OrderingFilter) plus the tiebreaker."""
+        ordering = list(self.ordering)
+        ordering_filter = OrderingFilter()
+        params = request.query_params.get(ordering_filter.ordering_param)
+        if params and view is not None:
+            fields = [param.strip() for param in params.split(",")]
+            requested = ordering_filter.remove_invalid_fields(queryset, fields, view, request)
+            if requested:
+                ordering = requested
+        names = [field.lstrip("-") for field in ordering]
+        if self.tiebreaker not in names and "pk" not in names:
+            ordering.append(("-" if ordering[-1].startswith("-") else "") + self.tiebreaker)
+        return tuple(ordering)
+
+    @staticmethod
+    def flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def seek_condition(self, ordering, values):
+        """Build the "comes after this row" condition for the given ordering."""
+        fields = [self.model._meta.get_field(field.lstrip("-")) for field in ordering]
+        descending = [field.startswith("-") for field in ordering]
+        if len(set(descending)) == 1:
+            # Uniform direction: a row-value comparison that Postgres can match to a composite index.
+            table = connection.ops.quote_name(self.model._meta.db_table)
+            columns = ", ".join(f"{table}.{connection.ops.quote_name(field.column)}" for field in fields)
+            placeholders = ", ".join(["%s"] * len(values))
+            operator = "<" if descending[0] else ">"
+            return RawSQL(f"({columns}) {operator} ({placeholders})", values, output_field=BooleanField())
+
+        condition = Q()
+        for index, field in enumerate(fields):
+            lookup = "lt" if descending[index] else "gt"
+            clause = Q(**{f"{field.name}__{lookup}": values[index]})
+            for previous, value in zip(fields[:index], values[:index]):
+                clause &= Q(**{previous.name: value})
+            condition |= clause
+        return condition
+
+    def encode_cursor(self, row, reverse):
+        values = [getattr(row, field.lstrip("-")) for field in self.ordering]
+        payload = {"o": list(self.ordering), "v": [str(value) for value in values]}
+        if reverse:
+            payload["r"] = 1
+        token = urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+            if payload["o"] != list(self.ordering) or len(payload["v"]) != len(self.ordering):
+                raise ValueError("cursor does not match the ordering")
+            values = [
+                self.model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, payload["v"])
+            ]
+        except (TypeError, ValueError, KeyError, binascii.Error, FieldDoesNotExist, ValidationError) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+        return values, bool(payload.get("r"))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "previous": self.get_previous_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
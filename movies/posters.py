@@ -0,0 +1,201 @@
+"""Responsive poster variants in WebP and JPEG.
+
+Each poster is offered at the ``VARIANTS`` widths in every ``FORMATS`` format,
+rendered by ``movies.imaging`` in a pool of ``POSTER_WORKERS`` processes so the
+resizing never runs on a request thread. Variants live under
+``MEDIA_ROOT/posters/variants/<digest>/``, where the digest hashes the poster's
+bytes and the variant settings: ``Movie.poster_digest`` is recomputed whenever
+the poster is uploaded or imported, so a variant URL never changes content and
+is served as immutable.
+
+Saving a movie with a new poster queues its variants after commit. A variant
+that is not on disk yet (a queued render, a wiped media volume, posters imported
+before this pipeline) is rendered on its first request by ``poster_variant`` and
+served from disk from then on; ``manage.py generate_poster_variants`` renders
+them all ahead of time.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from prometheus_client import Histogram
+
+from movies.imaging import render_variants
+
+logger = logging.getLogger(__name__)
+
+RENDER_SECONDS = Histogram(
+    "movie_poster_variants_seconds", "Time spent rendering a poster's missing variants", ["trigger"]
+)
+
+# Variant name -> width in pixels; heights follow the poster's aspect ratio.
+VARIANTS = {"thumb": 160, "card": 320, "detail": 640}
+# Extension -> media type, preferred format first; the last one is the <img> fallback.
+FORMATS = {"webp": "image/webp", "jpg": "image/jpeg"}
+# The ``sizes`` a variant is laid out at, so the browser picks the narrowest sufficient width.
+SIZES = {"thumb": "160px", "card": "320px", "detail": "(min-width: 768px) 25vw, 100vw"}
+VARIANTS_PATH = "posters/variants/"
+# Variant URLs are content-hashed, so clients may keep them for good.
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def source_path(name):
+    """Return the file a stored poster name refers to: an upload in media storage or a bundled static file."""
+    if not name:
+        return None
+    if default_storage.exists(name):
+        return default_storage.path(name)
+    return finders.find(f"movies/{name}")
+
+
+def poster_digest(poster):
+    """Return the content hash naming ``poster``'s variants, or ``None`` when its file cannot be found.
+
+    ``poster`` is a ``FieldFile``; an upload is hashed before it is written to storage.
+    """
+    if not poster:
+        return None
+    digest = hashlib.sha256(repr((VARIANTS, tuple(FORMATS), settings.POSTER_VARIANT_QUALITY)).encode())
+    if not poster._committed:
+        for chunk in poster.chunks():
+            digest.update(chunk)
+        return digest.hexdigest()[:32]
+    path = source_path(poster.name)
+    if path is None:
+        return None
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def variant_directory(digest):
+    return Path(settings.MEDIA_ROOT) / VARIANTS_PATH / digest
+
+
+def variant_url(digest, variant, ext):
+    return f"{settings.MEDIA_URL}{VARIANTS_PATH}{digest}/{variant}.{ext}"
+
+
+def poster_srcset(digest, ext):
+    """Return the ``srcset`` listing every variant of one format with its width."""
+    return ", ".join(f"{variant_url(digest, variant, ext)} {width}w" for variant, width in VARIANTS.items())
+
+
+def poster_variants(digest):
+    """Return the variant URLs of a poster by name and extension, plus a ``srcset`` per extension."""
+    return {
+        "variants": {
+            variant: {"width": width, **{ext: variant_url(digest, variant, ext) for ext in FORMATS}}
+            for variant, width in VARIANTS.items()
+        },
+        "srcset": {ext: poster_srcset(digest, ext) for ext in FORMATS},
+    }
+
+
+def variant_pool():
+    """Return this process's render pool, started on first use, or ``None`` when ``POSTER_WORKERS`` is 0.
+
+    Workers are spawned rather than forked, so they share no state (connections,
+    threads) with the web process.
+    """
+    global _pool  # pylint: disable=global-statement
+    if settings.POSTER_WORKERS < 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(settings.POSTER_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _render_args(source, digest):
+    return source, str(variant_directory(digest)), VARIANTS, tuple(FORMATS), settings.POSTER_VARIANT_QUALITY
+
+
+def _failed_key(digest):
+    return f"posters:failed:{digest}"
+
+
+def _render_failed(digest, error):
+    """Log a failed render and skip the poster's renders for ``CACHE_TTL``, so requests do not retry it each time."""
+    logger.error("Rendering poster variants %s failed: %s", digest, error)
+    cache.set(_failed_key(digest), True, settings.CACHE_TTL)
+
+
+def _rendered(future, digest, trigger, started):
+    error = future.exception()
+    if error is not None:
+        _render_failed(digest, error)
+    elif future.result():
+        RENDER_SECONDS.labels(trigger).observe(time.perf_counter() - started)
+
+
+def queue_variants(source, digest, trigger="upload"):
+    """Render a poster's missing variants in the pool without waiting for them (inline without a pool)."""
+    pool = variant_pool()
+    if pool is None:
+        render_poster_variants(source, digest, trigger)
+        return
+    started = time.perf_counter()
+    future = pool.submit(render_variants, *_render_args(source, digest))
+    future.add_done_callback(lambda done: _rendered(done, digest, trigger, started))
+
+
+def render_poster_variants(source, digest, trigger="lazy"):
+    """Render a poster's missing variants in the pool and wait for them; returns the file names written.
+
+    A poster that cannot be read or decoded writes nothing; the failure is
+    logged and the poster is not tried again until it expires.
+    """
+    if cache.get(_failed_key(digest)):
+        return []
+    started = time.perf_counter()
+    pool = variant_pool()
+    try:
+        if pool is None:
+            written = render_variants(*_render_args(source, digest))
+        else:
+            written = pool.submit(render_variants, *_render_args(source, digest)).result()
+    except OSError as error:  # Pillow's UnidentifiedImageError included
+        _render_failed(digest, error)
+        return []
+    if written:
+        RENDER_SECONDS.labels(trigger).observe(time.perf_counter() - started)
+    return written
+
+
+def render_many(jobs):
+    """Render the missing variants of ``(source, digest)`` pairs across the pool; returns the files written."""
+    args = [_render_args(source, digest) for source, digest in jobs]
+    pool = variant_pool()
+    if pool is None or not args:
+        results = [render_variants(*job) for job in args]
+    else:
+        results = pool.map(render_variants, *zip(*args))
+    return sum(len(written) for written in results)
+
+
+def prune_variants(digests):
+    """Delete the variant directories of digests not in ``digests``; returns how many were removed."""
+    root = Path(settings.MEDIA_ROOT) / VARIANTS_PATH
+    if not root.is_dir():
+        return 0
+    removed = 0
+    for directory in root.iterdir():
+        if directory.is_dir() and directory.name not in digests:
+            shutil.rmtree(directory, ignore_errors=True)
+            removed += 1
+    return removed
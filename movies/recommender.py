@@ -0,0 +1,222 @@
+"""Personalized movie recommendations from an offline matrix factorization.
+
+``train_recommender`` approximates every rating, minus the global mean, by the dot
+product of a ``RECOMMENDER_FACTORS``-dimensional user vector and movie vector,
+fitted with alternating least squares: all user vectors are solved for at once
+with batched ``numpy.linalg.solve`` over blocks of at most ``ALS_BLOCK_RATINGS``
+ratings, then all movie vectors, ``RECOMMENDER_ITERATIONS`` times. Ratings are
+streamed from the database in chunks. The factors are written to
+``RECOMMENDER_DIR`` as a build of ``.npy`` files that workers memory-map (see
+``movies.builds``). A run starts from the current build's factors for the users
+and movies it already has, and from random ones for newcomers, so the factors
+move on from the last run instead of being drawn afresh.
+
+Serving scores every movie with one matrix-vector product, drops the movies the
+user has rated (one indexed query) and selects the best with ``argpartition``.
+Users who were not in the training data get no recommendations until the next run.
+"""
+
+import logging
+import time
+
+import numpy as np
+from django.conf import settings
+from prometheus_client import Histogram
+
+from movies.builds import CurrentBuild, row_of, write_build
+from movies.similarity import load_ratings
+from reviews.models import Rating
+
+logger = logging.getLogger(__name__)
+
+TRAIN_SECONDS = Histogram("movie_recommender_train_seconds", "Time spent training the recommender")
+RECOMMEND_SECONDS = Histogram(
+    "movie_recommendation_seconds",
+    "Time spent ranking movies for one user",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+# Ratings per batched solve; the block's Gram matrices take ALS_BLOCK_RATINGS × factors² floats.
+ALS_BLOCK_RATINGS = 20000
+# Standard deviation of the random factors new users and movies start from.
+INIT_SCALE = 0.1
+
+
+class RecommenderModel:
+    """User and movie factor matrices, rows aligned with the sorted ``user_ids``/``movie_ids``."""
+
+    def __init__(self, user_ids, user_factors, movie_ids, movie_factors, mean, build_id=None):
+        self.user_ids = user_ids
+        self.user_factors = user_factors
+        self.movie_ids = movie_ids
+        self.movie_factors = movie_factors
+        self.mean = mean
+        self.build_id = build_id
+
+    @property
+    def factors(self):
+        return self.user_factors.shape[1]
+
+    def save(self, directory):
+        """Write the factors as a new build of ``directory`` and make it current."""
+        arrays = {
+            "user_ids": self.user_ids,
+            "user_factors": self.user_factors,
+            "movie_ids": self.movie_ids,
+            "movie_factors": self.movie_factors,
+        }
+        self.build_id = write_build(directory, arrays, {"mean": self.mean})
+
+    @classmethod
+    def load(cls, arrays, metadata, build_id):
+        """Wrap the memory-mapped arrays of a build."""
+        return cls(
+            arrays["user_ids"],
+            arrays["user_factors"],
+            arrays["movie_ids"],
+            arrays["movie_factors"],
+            metadata["mean"],
+            build_id,
+        )
+
+    def recommend(self, user_id, limit, exclude=()):
+        """Return up to ``limit`` ``(movie id, predicted rating)`` for ``user_id``, best first.
+
+        Movie ids in ``exclude`` are skipped; users the model has not seen get nothing.
+        """
+        row = row_of(self.user_ids, user_id)
+        if row < 0 or limit < 1:
+            return []
+        scores = self.movie_factors @ self.user_factors[row]
+        excluded = np.fromiter(exclude, dtype=np.int64)
+        positions = np.searchsorted(self.movie_ids, excluded)
+        known = positions < len(self.movie_ids)
+        known[known] = self.movie_ids[positions[known]] == excluded[known]
+        scores[positions[known]] = -np.inf
+        if limit < len(scores):
+            best = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        best = best[np.isfinite(scores[best])]
+        return [
+            (int(movie_id), float(score) + self.mean) for movie_id, score in zip(self.movie_ids[best], scores[best])
+        ]
+
+
+_current = CurrentBuild("RECOMMENDER_DIR", RecommenderModel.load)
+
+
+def current_recommender():
+    """Return the current model, memory-mapped once per process, or ``None`` before the first training run."""
+    return _current.get()
+
+
+def recommend_movies(user_id, limit):
+    """Return ``(movie id, predicted rating)`` for movies ``user_id`` has not rated, or ``None`` without a model."""
+    started = time.perf_counter()
+    model = current_recommender()
+    if model is None:
+        return None
+    rated = Rating.objects.filter(user_id=user_id).values_list("movie_id", flat=True)
+    recommendations = model.recommend(user_id, limit, rated)
+    RECOMMEND_SECONDS.observe(time.perf_counter() - started)
+    return recommendations
+
+
+def _solve(owner_rows, other_rows, residuals, other_factors, owners, regularization):
+    """One ALS half-step: the regularized least-squares factors of every owner given the other side's factors.
+
+    The rating arrays must be sorted by ``owner_rows``, and every owner must have a rating.
+    """
+    factors = other_factors.shape[1]
+    counts = np.bincount(owner_rows, minlength=owners)
+    starts = np.concatenate(([0], np.cumsum(counts)))
+    solved = np.empty((owners, factors))
+    owner = 0
+    while owner < owners:
+        # The owners whose ratings fit in one block, and at least one.
+        end = int(np.searchsorted(starts, starts[owner] + ALS_BLOCK_RATINGS, side="right")) - 1
+        end = min(max(end, owner + 1), owners)
+        first, last = starts[owner], starts[end]
+        vectors = other_factors[other_rows[first:last]]
+        offsets = starts[owner:end] - first
+        gram = np.add.reduceat(np.einsum("ni,nj->nij", vectors, vectors), offsets)
+        gram += regularization * counts[owner:end, None, None] * np.eye(factors)
+        targets = np.add.reduceat(vectors * residuals[first:last, None], offsets)
+        solved[owner:end] = np.linalg.solve(gram, targets[..., None])[..., 0]
+        owner = end
+    return solved
+
+
+def _initial_factors(ids, factors, rng, previous_ids=None, previous_factors=None):
+    """Random factors for ``ids``, taking the previous build's vectors for ids it already had."""
+    initial = rng.normal(0.0, INIT_SCALE, (len(ids), factors))
+    if previous_ids is not None and len(previous_ids):
+        positions = np.searchsorted(previous_ids, ids)
+        known = positions < len(previous_ids)
+        known[known] = previous_ids[positions[known]] == ids[known]
+        initial[known] = previous_factors[positions[known]]
+    return initial
+
+
+def _rmse(user_rows, movie_rows, residuals, user_factors, movie_factors):
+    squared = 0.0
+    for start in range(0, len(residuals), ALS_BLOCK_RATINGS):
+        chunk = slice(start, start + ALS_BLOCK_RATINGS)
+        predicted = np.einsum("ni,ni->n", user_factors[user_rows[chunk]], movie_factors[movie_rows[chunk]])
+        squared += float(np.sum((predicted - residuals[chunk]) ** 2))
+    return (squared / len(residuals)) ** 0.5
+
+
+def train_recommender(factors=None, iterations=None, regularization=None, warm_start=True, seed=0):
+    """Fit user and movie factors to every rating and make them the current model.
+
+    Returns ``(model, training RMSE)``, or ``(None, None)`` when there are no ratings.
+    """
+    factors = factors or settings.RECOMMENDER_FACTORS
+    iterations = iterations or settings.RECOMMENDER_ITERATIONS
+    regularization = settings.RECOMMENDER_REGULARIZATION if regularization is None else regularization
+    started = time.monotonic()
+
+    ratings = load_ratings()
+    if len(ratings) == 0:
+        return None, None
+    user_ids, user_rows = np.unique(ratings["user"], return_inverse=True)
+    movie_ids, movie_rows = np.unique(ratings["movie"], return_inverse=True)
+    mean = float(ratings["score"].mean())
+    residuals = ratings["score"] - mean
+
+    rng = np.random.default_rng(seed)
+    previous = current_recommender() if warm_start else None
+    if previous is not None and previous.factors != factors:
+        previous = None
+    user_factors = _initial_factors(
+        user_ids, factors, rng, *((previous.user_ids, previous.user_factors) if previous else ())
+    )
+    movie_factors = _initial_factors(
+        movie_ids, factors, rng, *((previous.movie_ids, previous.movie_factors) if previous else ())
+    )
+
+    by_user = np.argsort(user_rows, kind="stable")
+    by_movie = np.argsort(movie_rows, kind="stable")
+    user_step = user_rows[by_user], movie_rows[by_user], residuals[by_user]
+    movie_step = movie_rows[by_movie], user_rows[by_movie], residuals[by_movie]
+    for _ in range(iterations):
+        user_factors = _solve(*user_step, movie_factors, len(user_ids), regularization)
+        movie_factors = _solve(*movie_step, user_factors, len(movie_ids), regularization)
+
+    rmse = _rmse(user_rows, movie_rows, residuals, user_factors, movie_factors)
+    model = RecommenderModel(
+        user_ids, user_factors.astype(np.float32), movie_ids, movie_factors.astype(np.float32), mean
+    )
+    model.save(settings.RECOMMENDER_DIR)
+    TRAIN_SECONDS.observe(time.monotonic() - started)
+    logger.info(
+        "Trained recommender on %d ratings (%d users, %d movies), RMSE %.3f",
+        len(ratings),
+        len(user_ids),
+        len(movie_ids),
+        rmse,
+    )
+    return model, rmse
@@ -0,0 +1,56 @@
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+# Types orjson would format differently from DRF's encoder are handed to the encoder's default().
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` output, byte for byte, produced by orjson.
+
+    Compact responses with the default unicode/strict settings are encoded by
+    orjson, with anything it does not handle natively (decimals, datetimes,
+    lazy strings, ...) converted by DRF's own encoder. Indented output, other
+    settings and payloads orjson rejects fall back to ``JSONRenderer``.
+
+    The one difference is floats: orjson spells exponents differently from
+    ``json`` (``1e16`` vs ``1e+16``) and writes NaN as null. The API's
+    representations have no floats (ratings are decimal strings).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            self.ensure_ascii
+            or not self.compact
+            or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Like JSONRenderer, escape the separators that are not valid in JavaScript strings.
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack responses for ``Accept: application/msgpack`` or ``?format=msgpack``.
+
+    Values carry the same types as in the JSON representation: decimals and
+    datetimes become the strings DRF's JSON encoder would produce.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    encoder_class = JSONRenderer.encoder_class
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=self.encoder_class().default, use_bin_type=True, datetime=False)
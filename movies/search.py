@@ -0,0 +1,275 @@
+"""Movie search: full-text matching, typeahead autocomplete and filter-aware facet counts.
+
+Full-text search runs against ``Movie.search_vector``, a weighted tsvector kept
+current by a database trigger and backed by a GIN index. Autocomplete matches
+prefixes of ``lower(unaccent(...))`` of the title, original title and director
+through btree indexes, and misspellings through trigram GIN indexes over the
+same expressions. Facets and
+the total for the search endpoint are computed in a single ``GROUPING SETS``
+query over the filtered queryset, and cached per normalized filter key until
+movies or ratings change.
+"""
+
+import hashlib
+import json
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import OperationalError, connection, connections, transaction
+from django.db.models import F
+from prometheus_client import Counter
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from movies.caching import get_generation
+from movies.models import Movie
+
+# Must match the configuration the movies_movie_search_vector trigger indexes with.
+SEARCH_CONFIG = "english"
+
+
+def build_search_query(text):
+    """Turn free text into a tsquery matching every word as a prefix, or ``None`` if it has no words."""
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return SearchQuery(" & ".join(f"{word}:*" for word in words), search_type="raw", config=SEARCH_CONFIG)
+
+
+def search_movies(queryset, text):
+    """Restrict ``queryset`` to movies matching ``text``, annotated with ``search_rank``."""
+    query = build_search_query(text)
+    if query is None:
+        return queryset
+    return queryset.filter(search_vector=query).annotate(search_rank=SearchRank(F("search_vector"), query))
+
+
+class MovieSearchFilter(BaseFilterBackend):
+    """Full-text ``?search=`` backend for movies, ranked unless an ordering is requested.
+
+    List it after ``OrderingFilter`` so the rank ordering replaces the view's
+    default ordering rather than being replaced by it.
+    """
+
+    search_param = api_settings.SEARCH_PARAM
+    ordering_param = api_settings.ORDERING_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, "")
+        if not text.strip():
+            return queryset
+        queryset = search_movies(queryset, text)
+        if request.query_params.get(self.ordering_param) or "search_rank" not in queryset.query.annotations:
+            return queryset
+        return queryset.order_by("-search_rank", "-id")
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Full-text search over titles, director, cinematographer and description.",
+                "schema": {"type": "string"},
+            }
+        ]
+
+
+# Field, and whether a prefix match on it ranks as a title match.
+AUTOCOMPLETE_FIELDS = (("title", True), ("original_title", True), ("director", False))
+AUTOCOMPLETE_COLUMNS = ("id", "slug", "title", "original_title", "director", "release_year")
+AUTOCOMPLETE_MAX_LIMIT = 20
+# Lowest pg_trgm word similarity a fuzzy-only match needs to be suggested.
+AUTOCOMPLETE_MIN_SIMILARITY = 0.6
+
+FUZZY_TIMEOUTS = Counter(
+    "movie_autocomplete_fuzzy_timeouts_total", "Autocomplete requests answered without fuzzy matches to stay in budget"
+)
+
+
+def _autocomplete_sql(table, fuzzy):
+    """Build one autocomplete stage: an index probe per field, then a ranking of the candidates.
+
+    The prefix stage range-scans a btree (``text_pattern_ops``) index per field
+    and stops after the first ``pool`` values starting with the term, so its
+    cost does not grow with the number of movies a short prefix matches. The
+    fuzzy stage looks up the term's trigrams in the GIN index of each field.
+    """
+    # The term goes through the same expression as the indexes; Postgres folds
+    # lower(movies_immutable_unaccent('literal')) to a constant, so the indexes stay usable.
+    term = "lower(movies_immutable_unaccent(%(term)s))"
+    probes = []
+    for field, is_title in AUTOCOMPLETE_FIELDS:
+        expression = f"lower(movies_immutable_unaccent(movie.{field}))"
+        if fuzzy:
+            probes.append(
+                f"""(
+                    SELECT movie.id, word_similarity({term}, {expression}) AS score
+                    FROM {table} AS movie WHERE {term} <%% {expression}
+                    ORDER BY score DESC LIMIT %(pool)s
+                )"""
+            )
+        else:
+            # ^@ (starts with) rather than LIKE: the trigram indexes serve LIKE too, and
+            # the planner would rather read every match from them than the ordered btree.
+            probes.append(
+                f"""(
+                    SELECT movie.id, {2 if is_title else 1} AS score
+                    FROM {table} AS movie WHERE {expression} ^@ {term}
+                    ORDER BY {expression} USING ~<~ LIMIT %(pool)s
+                )"""
+            )
+    return f"""
+        WITH candidates AS ({" UNION ALL ".join(probes)})
+        SELECT {", ".join(f"movie.{column}" for column in AUTOCOMPLETE_COLUMNS)}
+        FROM (SELECT id, MAX(score) AS score FROM candidates GROUP BY id) AS best
+        JOIN {table} AS movie ON movie.id = best.id
+        WHERE NOT movie.id = ANY(%(exclude)s)
+        ORDER BY best.score DESC, movie.total_ratings DESC, movie.id
+        LIMIT %(limit)s
+    """
+
+
+def normalize_autocomplete_term(text):
+    """Collapse whitespace and case so equivalent keystrokes share a cache entry."""
+    return " ".join(text.split()).casefold()
+
+
+def autocomplete_movies(text, limit):
+    """Return up to ``limit`` movies whose title, original title or director matches ``text``.
+
+    Titles starting with the term come first, then directors starting with it.
+    Only when those leave room does a fuzzy stage add the closest ``pg_trgm``
+    word-similarity matches, which also cover misspellings and words inside a
+    title. Accents and case are ignored throughout.
+
+    Trigram lookups get expensive for terms made of very common trigrams, so
+    the fuzzy stage runs under ``AUTOCOMPLETE_FUZZY_TIMEOUT`` and is dropped,
+    leaving the prefix matches, when it does not finish in time.
+    """
+    params = {
+        "term": text,
+        "pool": max(limit * 4, 32),
+        "limit": limit,
+        "exclude": [],
+    }
+    table = Movie._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(_autocomplete_sql(table, fuzzy=False), params)
+        rows = cursor.fetchall()
+        if len(rows) < limit:
+            params.update(limit=limit - len(rows), exclude=[row[0] for row in rows])
+            try:
+                with transaction.atomic():
+                    cursor.execute(
+                        "SELECT set_config('statement_timeout', %s, true), "
+                        "set_config('pg_trgm.word_similarity_threshold', %s, true)",
+                        [f"{settings.AUTOCOMPLETE_FUZZY_TIMEOUT}ms", str(AUTOCOMPLETE_MIN_SIMILARITY)],
+                    )
+                    cursor.execute(_autocomplete_sql(table, fuzzy=True), params)
+                    rows += cursor.fetchall()
+                    cursor.execute("SET LOCAL statement_timeout TO DEFAULT")
+            except OperationalError:
+                # The savepoint rollback also undoes the settings above.
+                FUZZY_TIMEOUTS.inc()
+    return [dict(zip(AUTOCOMPLETE_COLUMNS, row)) for row in rows]
+
+
+def cached_autocomplete(text, limit):
+    """``autocomplete_movies`` behind a short-lived cache shared by every user typing the same prefix."""
+    term = normalize_autocomplete_term(text)
+    signature = hashlib.sha1(f"{limit}:{term}".encode()).hexdigest()
+    key = f"movies:autocomplete:{get_generation('movies.movie')}:{signature}"
+    results = cache.get(key)
+    if results is None:
+        results = autocomplete_movies(term, limit)
+        cache.set(key, results, settings.AUTOCOMPLETE_CACHE_TIMEOUT)
+    return results
+
+
+# Response key, column expression over the filtered rows, and whether values are sorted newest/highest first.
+# Rows whose expression is NULL (unrated movies' rating bucket) are left out of that facet.
+SEARCH_FACETS = (
+    ("directors", "director", "director", False),
+    ("movements", "movement", "movement", False),
+    ("decades", "decade", "release_year / 10 * 10", True),
+    ("countries", "country", "country", False),
+    (
+        "rating_buckets",
+        "rating_bucket",
+        "CASE WHEN total_ratings > 0 THEN LEAST(FLOOR(average_rating), 4)::integer END",
+        True,
+    ),
+)
+
+
+def compute_search_facets(queryset):
+    """Return ``(total, facets)`` for ``queryset`` using one GROUPING SETS query.
+
+    ``facets`` maps each response key to ``[{<facet>: value, "movie_count": n}]``;
+    text facets are ordered by count, decades and rating buckets by value.
+    """
+    try:
+        sql, params = (
+            queryset.order_by()
+            .values("director", "movement", "release_year", "country", "average_rating", "total_ratings")
+            .query
+        ).sql_with_params()
+    except EmptyResultSet:
+        return 0, {key: [] for key, _, _, _ in SEARCH_FACETS}
+
+    columns = ", ".join(f"{expression} AS {name}" for _, name, expression, _ in SEARCH_FACETS)
+    names = [name for _, name, _, _ in SEARCH_FACETS]
+    grouping_sets = ", ".join(f"({name})" for name in names)
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT {", ".join(names)}, GROUPING({", ".join(names)}) AS grouping_id, COUNT(*)
+            FROM (SELECT {columns} FROM ({sql}) AS filtered) AS movie
+            GROUP BY GROUPING SETS ({grouping_sets}, ())
+            """,
+            params,
+        )
+        rows = cursor.fetchall()
+
+    # GROUPING() sets one bit per column that is *not* grouped, first column highest.
+    all_rolled_up = (1 << len(names)) - 1
+    bit_for = {name: 1 << (len(names) - 1 - index) for index, name in enumerate(names)}
+    total = 0
+    facets = {key: [] for key, _, _, _ in SEARCH_FACETS}
+    for row in rows:
+        grouping_id, movie_count = row[-2], row[-1]
+        if grouping_id == all_rolled_up:
+            total = movie_count
+            continue
+        for index, (key, name, _, _) in enumerate(SEARCH_FACETS):
+            if not grouping_id & bit_for[name]:
+                if row[index] is not None:
+                    facets[key].append({name: row[index], "movie_count": movie_count})
+                break
+    for key, name, _, by_value in SEARCH_FACETS:
+        if by_value:
+            facets[key].sort(key=lambda entry, name=name: entry[name], reverse=True)
+        else:
+            facets[key].sort(key=lambda entry, name=name: (-entry["movie_count"], entry[name]))
+    return total, facets
+
+
+def search_facets(queryset, filters):
+    """Return ``(total, facets)`` for ``queryset``, cached per normalized ``filters``.
+
+    ``filters`` must identify the queryset (see ``MovieFilter.normalized_filters``);
+    ratings are part of the key's generations because they move rating buckets.
+    """
+    generations = f"{get_generation('movies.movie')}:{get_generation('reviews.rating')}"
+    signature = hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    key = f"movies:search-facets:{generations}:{signature}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    result = compute_search_facets(queryset)
+    cache.set(key, result, settings.CACHE_TTL)
+    return result
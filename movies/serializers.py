@@ -4,14 +4,38 @@ from django.utils.html import escape
 from rest_framework import serializers
 
 from .models import Movie
+from .posters import poster_variants
 
 
-class MovieSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Let callers pass ``fields=[...]`` to serialize only those of the declared fields."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class PosterVariantsField(serializers.Field):
+    """A poster's variant URLs and ``srcset`` per format (see ``movies.posters``), read from ``poster_digest``."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("source", "poster_digest")
+        super().__init__(read_only=True, **kwargs)
+
+    def to_representation(self, value):
+        return poster_variants(value)
+
+
+class MovieSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     title = serializers.CharField(validators=[RegexValidator(r"^[^<>]*$", "HTML tags are not allowed")])
     description = serializers.CharField(validators=[RegexValidator(r"^[^<>]*$", "HTML tags are not allowed")])
     director = serializers.CharField(validators=[RegexValidator(r"^[^<>]*$", "HTML tags are not allowed")])
     movement = serializers.CharField(validators=[RegexValidator(r"^[^<>]*$", "HTML tags are not allowed")])
     country = serializers.CharField(validators=[RegexValidator(r"^[^<>]*$", "HTML tags are not allowed")])
+    # Null until the poster has been hashed, e.g. for movies without one.
+    poster = PosterVariantsField()
 
     def validate(self, data):
         # Clean all text fields
@@ -22,7 +46,18 @@ class MovieSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Movie
-        fields = ["id", "title", "director", "release_year", "description", "runtime", "country", "movement", "slug"]
+        fields = [
+            "id",
+            "title",
+            "director",
+            "release_year",
+            "description",
+            "runtime",
+            "country",
+            "movement",
+            "slug",
+            "poster",
+        ]
         read_only_fields = ["slug"]
 
 
@@ -33,21 +68,31 @@ class MovieListSerializer(serializers.ModelSerializer):
         read_only_fields = ["slug"]
 
 
-class DirectorSerializer(serializers.Serializer):
-    director = serializers.CharField(validators=[RegexValidator(r"^[^<>]*$", "HTML tags are not allowed")])
+class CatalogEntitySerializer(serializers.Serializer):
+    """Read-only entity stats; the name is exposed under the entity's own key (``director``/``movement``)."""
+
+    id = serializers.IntegerField(read_only=True)
+    slug = serializers.SlugField(read_only=True)
+    movie_count = serializers.IntegerField(read_only=True)
+    rating_count = serializers.IntegerField(read_only=True)
+    avg_rating = serializers.DecimalField(max_digits=3, decimal_places=2, read_only=True, allow_null=True)
+    top_movie_title = serializers.CharField(read_only=True, allow_null=True)
+    top_movie_slug = serializers.SlugField(read_only=True, allow_null=True)
+    name_field: str | None = None
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        if "director" in data and data["director"]:
-            data["director"] = escape(str(data["director"]))
+        for field in (self.name_field, "top_movie_title"):
+            if data.get(field):
+                data[field] = escape(str(data[field]))
         return data
 
 
-class MovementSerializer(serializers.Serializer):
-    movement = serializers.CharField(validators=[RegexValidator(r"^[^<>]*$", "HTML tags are not allowed")])
+class DirectorSerializer(CatalogEntitySerializer):
+    director = serializers.CharField(validators=[RegexValidator(r"^[^<>]*$", "HTML tags are not allowed")])
+    name_field = "director"
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        if "movement" in data and data["movement"]:
-            data["movement"] = escape(str(data["movement"]))
-        return data
+
+class MovementSerializer(CatalogEntitySerializer):
+    movement = serializers.CharField(validators=[RegexValidator(r"^[^<>]*$", "HTML tags are not allowed")])
+    name_field = "movement"
@@ -1 +1,212 @@
 # Signal handlers for movies app
+from collections import Counter
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from movies.caching import bump_generation
+from movies.content import update_content_neighbours
+from movies.documents import discard_document, forget_document, refresh_document
+from movies.models import Movie, MovieFacet
+from movies.posters import poster_digest, queue_variants, source_path
+from movies.suggest import SOURCE_COLUMNS, current_suggest_index
+from movies.trending import record_activity
+
+# Models whose cached counts (and other generation-keyed entries) are invalidated on write.
+GENERATION_MODELS = (
+    "movies.Movie",
+    "movies.Director",
+    "movies.Movement",
+    "reviews.Review",
+    "reviews.Rating",
+    "users.User",
+    "users.UserFavoriteMovie",
+)
+
+
+def bump_model_generation(sender, **kwargs):
+    """Invalidate generation-keyed cache entries for the model that was written.
+
+    The bump is repeated on commit so a reader that recomputed an entry from
+    pre-commit data in between does not keep it until the next write.
+    """
+    label = sender._meta.label_lower
+    bump_generation(label)
+    transaction.on_commit(lambda: bump_generation(label))
+
+
+for model in GENERATION_MODELS:
+    post_save.connect(bump_model_generation, sender=model, dispatch_uid=f"bump-generation-save-{model}")
+    post_delete.connect(bump_model_generation, sender=model, dispatch_uid=f"bump-generation-delete-{model}")
+
+
+@receiver(m2m_changed, sender=Movie.favorited_by.through)
+def bump_favorites_generation(sender, action, **kwargs):
+    """``favorited_by.add()``/``remove()`` write the through rows without ``post_save``/``post_delete``."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_model_generation(sender)
+
+
+@receiver(pre_save, sender=Movie)
+def load_stored_facets(sender, instance, **kwargs):
+    """Read the stored facet values and entity references when the instance was not loaded from the database."""
+    if instance._stored_facets is not None and instance._stored_refs is not None:
+        return
+    attnames = [f"{field}_id" for field in sender.ENTITY_FIELDS]
+    stored = None
+    if instance.pk is not None:
+        stored = sender.objects.filter(pk=instance.pk).values_list(*sender.FACET_FIELDS, *attnames).first()
+    if stored is None:
+        instance._stored_facets, instance._stored_refs = set(), dict.fromkeys(attnames)
+        return
+    facets, refs = stored[: len(sender.FACET_FIELDS)], stored[len(sender.FACET_FIELDS) :]
+    instance._stored_facets = {(f, str(v)) for f, v in zip(sender.FACET_FIELDS, facets)}
+    instance._stored_refs = dict(zip(attnames, refs))
+
+
+@receiver(pre_save, sender=Movie)
+def resolve_entities(sender, instance, **kwargs):
+    """Point ``director_ref``/``movement_ref`` at the entities named by ``director``/``movement``."""
+    for field, (name_field, entity) in sender.ENTITY_FIELDS.items():
+        name = getattr(instance, name_field)
+        if getattr(instance, f"{field}_id") is None or (name_field, name) not in instance._stored_facets:
+            setattr(instance, field, entity.for_name(name) if name else None)
+
+
+@receiver(post_save, sender=Movie)
+def move_facet_counts(sender, instance, **kwargs):
+    """Move this movie's counts from its previous facet values to the new ones."""
+    old, new = instance._stored_facets or set(), instance.facet_values()
+    deltas = Counter(dict.fromkeys(new - old, 1))
+    deltas.update(dict.fromkeys(old - new, -1))
+    MovieFacet.apply_deltas(deltas)
+    instance._stored_facets = new
+
+
+@receiver(post_delete, sender=Movie)
+def remove_facet_counts(sender, instance, **kwargs):
+    MovieFacet.apply_deltas(dict.fromkeys(instance._stored_facets or instance.facet_values(), -1))
+
+
+@receiver(post_save, sender=Movie)
+def move_entity_stats(sender, instance, **kwargs):
+    """Move this movie's count and rating totals from its previous director/movement to the current ones."""
+    for field, (_, entity) in sender.ENTITY_FIELDS.items():
+        attname = f"{field}_id"
+        entity.move_movie(
+            instance._stored_refs[attname], getattr(instance, attname), instance.rating_sum, instance.total_ratings
+        )
+    instance._stored_refs = {f"{field}_id": getattr(instance, f"{field}_id") for field in sender.ENTITY_FIELDS}
+
+
+@receiver(post_delete, sender=Movie)
+def remove_entity_stats(sender, instance, **kwargs):
+    for field, (_, entity) in sender.ENTITY_FIELDS.items():
+        stored = (instance._stored_refs or {}).get(f"{field}_id", getattr(instance, f"{field}_id"))
+        entity.move_movie(stored, None, instance.rating_sum, instance.total_ratings)
+
+
+@receiver(pre_save, sender=Movie)
+def load_stored_slug(sender, instance, **kwargs):
+    """Read the stored slug when the instance was not loaded from the database."""
+    if instance._stored_slug is None and instance.pk is not None:
+        instance._stored_slug = sender.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+
+
+@receiver(post_save, sender=Movie)
+def store_detail_document(sender, instance, **kwargs):
+    """Drop the movie's detail document now and store the new one once the save is committed.
+
+    A slug the movie no longer has is retired as well.
+    """
+    movie_id, stale_slug = instance.pk, instance._stored_slug
+    instance._stored_slug = instance.slug
+    discard_document(movie_id, instance.slug, stale_slug)
+    transaction.on_commit(lambda: refresh_document(movie_id, stale_slug))
+
+
+@receiver(post_delete, sender=Movie)
+def forget_detail_document(sender, instance, **kwargs):
+    movie_id, slug = instance.pk, instance.slug
+    discard_document(movie_id, slug)
+    transaction.on_commit(lambda: forget_document(movie_id, slug))
+
+
+@receiver(post_save, sender=Movie)
+def update_suggest_index(sender, instance, **kwargs):
+    """Let this worker's suggestion index see the saved fields once they are committed."""
+    index = current_suggest_index()
+    if index is not None:
+        row = tuple(getattr(instance, column) for column in SOURCE_COLUMNS)
+        transaction.on_commit(lambda: index.upsert(row))
+
+
+@receiver(post_delete, sender=Movie)
+def remove_from_suggest_index(sender, instance, **kwargs):
+    index = current_suggest_index()
+    if index is not None:
+        movie_id = instance.pk
+        transaction.on_commit(lambda: index.remove(movie_id))
+
+
+@receiver(post_save, sender=Movie)
+def rescore_content_neighbours(sender, instance, **kwargs):
+    """Give a new or edited movie content-based neighbours once it is committed.
+
+    Robust, so a missing or broken content index never fails the save that triggered it.
+    """
+    movie_id = instance.pk
+    transaction.on_commit(lambda: update_content_neighbours(movie_id), robust=True)
+
+
+@receiver(pre_save, sender=Movie)
+def fingerprint_poster(sender, instance, **kwargs):
+    """Hash an uploaded, replaced or imported poster (or one saved before variants existed) into ``poster_digest``."""
+    if "poster" in instance.get_deferred_fields():
+        return
+    poster = instance.poster
+    changed = not poster._committed or (poster.name or None) != (instance._stored_poster or None)
+    instance._poster_changed = changed or (bool(poster) and instance.poster_digest is None)
+    if instance._poster_changed:
+        instance.poster_digest = poster_digest(poster)
+
+
+@receiver(post_save, sender=Movie)
+def queue_poster_variants(sender, instance, **kwargs):
+    """Render a new poster's variants in the worker pool once the save is committed.
+
+    Robust, so a poster that cannot be decoded never fails the save; its variants
+    are retried when first requested.
+    """
+    if not getattr(instance, "_poster_changed", False):
+        return
+    instance._stored_poster, instance._poster_changed = instance.poster.name, False
+    if instance.poster_digest:
+        name, digest = instance.poster.name, instance.poster_digest
+        transaction.on_commit(lambda: queue_variants(source_path(name), digest), robust=True)
+
+
+@receiver(post_save, sender="reviews.Rating")
+def count_rating_activity(sender, instance, created, **kwargs):
+    if created:
+        record_activity("rating", [instance.movie_id])
+
+
+@receiver(post_save, sender="reviews.Review")
+def count_review_activity(sender, instance, created, **kwargs):
+    if created:
+        record_activity("review", [instance.movie_id])
+
+
+@receiver(post_save, sender="users.UserFavoriteMovie")
+def count_favorite_activity(sender, instance, created, **kwargs):
+    if created:
+        record_activity("favorite", [instance.movie_id])
+
+
+@receiver(m2m_changed, sender=Movie.favorited_by.through)
+def count_added_favorites(sender, instance, action, reverse, pk_set, **kwargs):
+    """``favorited_by.add()`` creates the through rows without ``post_save``."""
+    if action == "post_add" and pk_set:
+        record_activity("favorite", pk_set if reverse else [instance.pk] * len(pk_set))
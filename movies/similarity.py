@@ -0,0 +1,196 @@
+"""Item-to-item collaborative filtering over the rating table.
+
+``build_similarity`` loads every rating into a sparse movie × user matrix whose
+rows are L2-normalized, so the dot product of two rows is the cosine similarity of
+the two movies' ratings. With the adjusted measure each user's mean score is
+subtracted first, so generous and harsh raters count alike. Pairs rated by fewer
+than ``MOVIE_SIMILARITY_MIN_CORATERS`` common users are ignored, and the
+``MOVIE_SIMILARITY_TOP_K`` best positive neighbours of each movie are stored in
+``MovieSimilarity``.
+
+Movies are scored in chunks across a process pool that receives the matrix once
+per worker. An incremental build only rescores movies rated since the previous
+build: their rows are exact, while other movies keep their old scores against them
+until the next full build, which also drops movies whose ratings were all deleted.
+"""
+
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from prometheus_client import Histogram
+from scipy import sparse
+
+from movies.caching import bump_generation
+from movies.models import Movie, MovieSimilarity
+from reviews.models import Rating
+
+logger = logging.getLogger(__name__)
+
+BUILD_SECONDS = Histogram("movie_similarity_build_seconds", "Time spent building item-to-item movie similarities")
+
+COSINE, ADJUSTED_COSINE = "cosine", "adjusted"
+MEASURES = (COSINE, ADJUSTED_COSINE)
+# Movies scored per task; a chunk's similarity block is chunk × movies, kept sparse.
+CHUNK_SIZE = 500
+RATING_DTYPE = np.dtype([("user", np.int64), ("movie", np.int64), ("score", np.float64)])
+
+# Set in each pool worker by _init_worker.
+_vectors = None
+_raters = None
+
+
+def load_ratings():
+    """Return every rating as a ``RATING_DTYPE`` array, streamed from the database in chunks."""
+    rows = Rating.objects.values_list("user_id", "movie_id", "score").iterator(chunk_size=20000)
+    return np.fromiter(((user, movie, float(score)) for user, movie, score in rows), dtype=RATING_DTYPE)
+
+
+def rating_matrix(measure=COSINE):
+    """Return ``(movie ids, normalized movie × user scores, movie × user rater indicator)`` for all ratings."""
+    ratings = load_ratings()
+    movie_ids, movie_rows = np.unique(ratings["movie"], return_inverse=True)
+    user_ids, user_columns = np.unique(ratings["user"], return_inverse=True)
+    shape = (len(movie_ids), len(user_ids))
+    if len(ratings) == 0:
+        return movie_ids, sparse.csr_matrix(shape), sparse.csr_matrix(shape, dtype=np.float32)
+
+    scores = ratings["score"]
+    if measure == ADJUSTED_COSINE:
+        sums = np.bincount(user_columns, weights=scores, minlength=len(user_ids))
+        counts = np.bincount(user_columns, minlength=len(user_ids))
+        scores = scores - (sums / counts)[user_columns]
+
+    vectors = normalize_rows(sparse.csr_matrix((scores, (movie_rows, user_columns)), shape=shape))
+    raters = sparse.csr_matrix((np.ones(len(scores), dtype=np.float32), (movie_rows, user_columns)), shape=shape)
+    return movie_ids, vectors, raters
+
+
+def normalize_rows(matrix):
+    """Scale each row of a sparse matrix to unit length, so row dot products are cosine similarities."""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix)
+    matrix.eliminate_zeros()
+    return matrix
+
+
+def top_neighbours(similarities, own_columns, top_k):
+    """Return ``[(columns, scores), ...]`` of the ``top_k`` best positive scores in each row, best first.
+
+    ``own_columns[i]`` is the column of row ``i``'s own movie, skipped (``-1`` if it has none).
+    """
+    similarities = sparse.csr_matrix(similarities)
+    neighbours = []
+    for position, own_column in enumerate(own_columns):
+        start, end = similarities.indptr[position], similarities.indptr[position + 1]
+        columns, scores = similarities.indices[start:end], similarities.data[start:end]
+        keep = (columns != own_column) & (scores > 0)
+        columns, scores = columns[keep], scores[keep]
+        if len(scores) > top_k:
+            best = np.argpartition(-scores, top_k)[:top_k]
+            columns, scores = columns[best], scores[best]
+        order = np.lexsort((columns, -scores))
+        neighbours.append((columns[order], scores[order]))
+    return neighbours
+
+
+def store_neighbours(source, movie_ids, owners, neighbours, computed_at):
+    """Replace the ``source`` neighbours of the movies ``owners`` with ``neighbours`` (columns into ``movie_ids``).
+
+    Movies deleted since the vectors were loaded are skipped.
+    """
+    candidates = set(owners)
+    for columns, _ in neighbours:
+        candidates.update(movie_ids[columns].tolist())
+    existing = set(Movie.objects.filter(pk__in=candidates).values_list("pk", flat=True))
+    similarities = [
+        MovieSimilarity(
+            movie_id=movie_id, similar_id=similar_id, source=source, score=float(score), computed_at=computed_at
+        )
+        for movie_id, (columns, scores) in zip(owners, neighbours)
+        if movie_id in existing
+        for similar_id, score in zip(movie_ids[columns].tolist(), scores)
+        if similar_id in existing
+    ]
+    with transaction.atomic():
+        MovieSimilarity.objects.filter(source=source, movie_id__in=owners).delete()
+        MovieSimilarity.objects.bulk_create(similarities, batch_size=5000)
+    return len(similarities)
+
+
+def _init_worker(vectors, raters):
+    global _vectors, _raters  # pylint: disable=global-statement
+    _vectors, _raters = vectors, raters
+
+
+def _score_chunk(rows, top_k, min_coraters):
+    """Return ``[(neighbour rows, scores), ...]`` for each movie row in ``rows``, best first."""
+    similarities = _vectors[rows] @ _vectors.T
+    coraters = _raters[rows] @ _raters.T
+    return top_neighbours(similarities.multiply(coraters >= min_coraters), rows, top_k)
+
+
+def movies_rated_since_last_build():
+    """Return ids of movies rated since the previous build, or ``None`` if nothing has been built yet."""
+    built = MovieSimilarity.objects.filter(source=MovieSimilarity.RATINGS)
+    last_build = built.aggregate(last=Max("computed_at"))["last"]
+    if last_build is None:
+        return None
+    return set(Rating.objects.filter(updated_at__gte=last_build).values_list("movie_id", flat=True).distinct())
+
+
+def build_similarity(movie_ids=None, *, measure=COSINE, top_k=None, min_coraters=None, workers=None, chunk_size=None):
+    """Score movies against every rated movie and store their nearest neighbours.
+
+    Rescores only ``movie_ids`` when given, every rated movie otherwise (dropping
+    rows of movies that no longer have ratings). ``workers=1`` scores in this
+    process. Returns ``(movies scored, neighbour rows stored)``.
+    """
+    if measure not in MEASURES:
+        raise ValueError(f"Unknown similarity measure {measure!r}; expected one of {', '.join(MEASURES)}")
+    top_k = top_k or settings.MOVIE_SIMILARITY_TOP_K
+    min_coraters = min_coraters or settings.MOVIE_SIMILARITY_MIN_CORATERS
+    chunk_size = chunk_size or CHUNK_SIZE
+    # Ratings written while the build runs are picked up by the next incremental build.
+    computed_at = timezone.now()
+    started = time.monotonic()
+
+    all_ids, vectors, raters = rating_matrix(measure)
+    if movie_ids is None:
+        rows = np.arange(len(all_ids))
+    else:
+        rows = np.flatnonzero(np.isin(all_ids, np.fromiter(movie_ids, dtype=np.int64)))
+    chunks = [rows[start : start + chunk_size] for start in range(0, len(rows), chunk_size)]
+
+    def store(results):
+        return sum(
+            store_neighbours(MovieSimilarity.RATINGS, all_ids, all_ids[chunk].tolist(), neighbours, computed_at)
+            for chunk, neighbours in zip(chunks, results)
+        )
+
+    if workers == 1 or len(chunks) <= 1:
+        _init_worker(vectors, raters)
+        stored = store(map(_score_chunk, chunks, repeat(top_k), repeat(min_coraters)))
+    else:
+        # Forked workers must not share this process's database connections.
+        connections.close_all()
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(vectors, raters)) as pool:
+            stored = store(pool.map(_score_chunk, chunks, repeat(top_k), repeat(min_coraters)))
+
+    built = MovieSimilarity.objects.filter(source=MovieSimilarity.RATINGS)
+    if movie_ids is None:
+        built.filter(computed_at__lt=computed_at).delete()
+    else:
+        # Movies whose ratings were all deleted have no row in the matrix.
+        built.filter(movie_id__in=set(movie_ids) - set(all_ids.tolist())).delete()
+    transaction.on_commit(lambda: bump_generation(MovieSimilarity._meta.label_lower))
+    BUILD_SECONDS.observe(time.monotonic() - started)
+    logger.info("Scored %d movies, stored %d similar movie rows", len(rows), stored)
+    return len(rows), stored
@@ -0,0 +1,283 @@
+"""In-process prefix index for title and director suggestions.
+
+An alternative to the database autocomplete for typeahead: every worker keeps
+the normalized titles, original titles and directors of the most popular
+``SUGGEST_INDEX_MAX_MOVIES`` movies in sorted arrays and answers top-k prefix
+queries with two binary searches plus a merge of precomputed per-block top
+lists, without touching Postgres or the cache.
+
+The arrays are immutable once built. Saves and deletes in this process land in
+a small overlay right away; other workers notice the movie generation moving
+and pull rows changed since their last sync. Popularity drift and deletions
+made elsewhere are picked up by the periodic rebuild (``SUGGEST_INDEX_MAX_AGE``)
+or on demand through ``manage.py rebuild_suggest_index``.
+"""
+
+import bisect
+import heapq
+import logging
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from prometheus_client import Gauge, Histogram
+
+from movies.caching import bump_generation, get_generation
+from movies.models import Movie
+from movies.search import AUTOCOMPLETE_COLUMNS, AUTOCOMPLETE_MAX_LIMIT
+
+logger = logging.getLogger(__name__)
+
+INDEX_ENTRIES = Gauge("movie_suggest_index_entries", "Prefix entries held by the in-process suggestion index")
+INDEX_BYTES = Gauge("movie_suggest_index_bytes", "Approximate memory held by the in-process suggestion index")
+INDEX_OVERLAY = Gauge("movie_suggest_index_overlay_movies", "Movies changed since the suggestion index was built")
+BUILD_SECONDS = Histogram("movie_suggest_index_build_seconds", "Time spent building the suggestion index")
+
+# Generation bumped by rebuild_suggest_index to make every worker rebuild.
+REBUILD_GENERATION = "movies.suggest-index"
+# Entries per block whose heaviest entries are precomputed; ranges wider than two
+# blocks are answered by merging those lists instead of scanning every entry.
+BLOCK_SIZE = 256
+# Heaviest entries kept per block; the slack over the largest limit absorbs duplicates and overlaid movies.
+BLOCK_TOP = 2 * AUTOCOMPLETE_MAX_LIMIT
+# Prefix matches on a title rank above prefix matches on a director, as in the database engine.
+TITLE_TIER, DIRECTOR_TIER = 2, 1
+# Source columns: AUTOCOMPLETE_COLUMNS plus the popularity weight.
+SOURCE_COLUMNS = (*AUTOCOMPLETE_COLUMNS, "total_ratings")
+# updated_at is stamped by the application clock before commit, so syncs look back this
+# far to cover clock skew between workers and transactions still open at the last sync.
+SYNC_LOOKBACK = timedelta(minutes=1)
+
+
+def normalize_suggest_key(text):
+    """Case-fold, strip accents and collapse whitespace, like ``lower(unaccent(...))`` does for the database."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return " ".join("".join(char for char in decomposed if not unicodedata.combining(char)).split()).casefold()
+
+
+class PrefixTable:
+    """Sorted ``(key, weight, movie id)`` entries with the heaviest entries of each block precomputed."""
+
+    def __init__(self, entries):
+        entries = sorted(entries)
+        self.keys = [key for key, _, _ in entries]
+        self.weights = array("q", (weight for _, weight, _ in entries))
+        self.ids = array("q", (movie_id for _, _, movie_id in entries))
+        self.block_tops = [
+            array("q", self._heaviest(range(start, min(start + BLOCK_SIZE, len(entries))))[:BLOCK_TOP])
+            for start in range(0, len(entries), BLOCK_SIZE)
+        ]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _heaviest(self, positions):
+        return sorted(positions, key=lambda position: -self.weights[position])
+
+    def matches(self, prefix):
+        """Yield ``(weight, movie id)`` for keys starting with ``prefix``, heaviest first."""
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\U0010ffff", lo)
+        if hi - lo <= 2 * BLOCK_SIZE:
+            runs = [self._heaviest(range(lo, hi))]
+        else:
+            first, last = -(-lo // BLOCK_SIZE), hi // BLOCK_SIZE
+            runs = [
+                self._heaviest(range(lo, first * BLOCK_SIZE)),
+                *self.block_tops[first:last],
+                self._heaviest(range(last * BLOCK_SIZE, hi)),
+            ]
+        for position in heapq.merge(*runs, key=lambda position: -self.weights[position]):
+            yield self.weights[position], self.ids[position]
+
+    def nbytes(self):
+        keys = sys.getsizeof(self.keys) + sum(sys.getsizeof(key) for key in self.keys)
+        arrays = sum(sys.getsizeof(block) for block in self.block_tops) + sys.getsizeof(self.block_tops)
+        return keys + arrays + sys.getsizeof(self.weights) + sys.getsizeof(self.ids)
+
+
+def _keys(row, tier):
+    # Rows are in SOURCE_COLUMNS order: id, slug, title, original_title, director, release_year, total_ratings.
+    fields = (row[2], row[3]) if tier == TITLE_TIER else (row[4],)
+    return {normalize_suggest_key(field) for field in fields if field}
+
+
+def _entries(movies, tier):
+    for movie_id, row in movies.items():
+        for key in _keys(row, tier):
+            yield key, row[-1], movie_id
+
+
+class SuggestIndex:  # pylint: disable=too-many-instance-attributes
+    """Prefix tables over a snapshot of movies plus an overlay of movies changed since."""
+
+    def __init__(self, rows, synced_at=None, movie_generation=None, rebuild_generation=None):
+        self.movies = {row[0]: row for row in rows}
+        self.tables = {tier: PrefixTable(_entries(self.movies, tier)) for tier in (TITLE_TIER, DIRECTOR_TIER)}
+        self.overlay = {}
+        self.lock = threading.Lock()
+        self.built_at = self.checked_at = time.monotonic()
+        self.synced_at = synced_at
+        self.movie_generation = movie_generation
+        self.rebuild_generation = rebuild_generation
+
+    @classmethod
+    def build(cls, max_movies=None):
+        """Load the most rated movies (ties to the newest) and index them."""
+        max_movies = max_movies or settings.SUGGEST_INDEX_MAX_MOVIES
+        # Taken before reading, so writes that race with the build are synced afterwards.
+        synced_at = timezone.now() - SYNC_LOOKBACK
+        generations = get_generation("movies.movie"), get_generation(REBUILD_GENERATION)
+        with BUILD_SECONDS.time():
+            rows = Movie.objects.order_by("-total_ratings", "-id").values_list(*SOURCE_COLUMNS)[:max_movies]
+            index = cls(rows.iterator(chunk_size=10000), synced_at, *generations)
+        index.report()
+        return index
+
+    def __len__(self):
+        return sum(len(table) for table in self.tables.values())
+
+    def nbytes(self):
+        tables = sum(table.nbytes() for table in self.tables.values())
+        rows = sys.getsizeof(self.movies) + sum(
+            sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in self.movies.values()
+        )
+        return tables + rows
+
+    def report(self):
+        INDEX_ENTRIES.set(len(self))
+        INDEX_BYTES.set(self.nbytes())
+        INDEX_OVERLAY.set(len(self.overlay))
+
+    def upsert(self, row):
+        """Make a saved movie suggestible with its current fields (``SOURCE_COLUMNS`` order)."""
+        keys = {tier: _keys(row, tier) for tier in self.tables}
+        with self.lock:
+            # Copy on write, so searches iterate over the overlay without taking the lock.
+            self.overlay = {**self.overlay, row[0]: (row, keys)}
+        INDEX_OVERLAY.set(len(self.overlay))
+
+    def remove(self, movie_id):
+        """Stop suggesting a deleted movie."""
+        with self.lock:
+            self.overlay = {**self.overlay, movie_id: None}
+        INDEX_OVERLAY.set(len(self.overlay))
+
+    def search(self, text, limit):
+        """Return up to ``limit`` movies whose title, original title or director starts with ``text``."""
+        prefix = normalize_suggest_key(text)
+        overlay = self.overlay
+        ranked = []
+        for tier, table in self.tables.items():
+            found = set()
+            for weight, movie_id in table.matches(prefix):
+                if movie_id not in overlay and movie_id not in found:
+                    ranked.append((tier, weight, movie_id))
+                    found.add(movie_id)
+                    if len(found) >= limit:
+                        break
+        for movie_id, entry in overlay.items():
+            if entry is not None:
+                row, keys = entry
+                tier = next((tier for tier in self.tables if any(key.startswith(prefix) for key in keys[tier])), None)
+                if tier is not None:
+                    ranked.append((tier, row[-1], movie_id))
+        results, seen = [], set()
+        for _, _, movie_id in sorted(ranked, key=lambda match: (-match[0], -match[1], match[2])):
+            if movie_id not in seen:
+                seen.add(movie_id)
+                row = overlay[movie_id][0] if movie_id in overlay else self.movies[movie_id]
+                results.append(dict(zip(AUTOCOMPLETE_COLUMNS, row)))
+                if len(results) >= limit:
+                    break
+        return results
+
+    def sync(self):
+        """Pull movies saved by other workers since the last sync into the overlay."""
+        movie_generation, synced_at = get_generation("movies.movie"), timezone.now() - SYNC_LOOKBACK
+        for row in Movie.objects.filter(updated_at__gte=self.synced_at).values_list(*SOURCE_COLUMNS):
+            self.upsert(row)
+        self.synced_at, self.movie_generation = synced_at, movie_generation
+
+    def needs_rebuild(self):
+        return (
+            len(self.overlay) > settings.SUGGEST_INDEX_MAX_OVERLAY
+            or time.monotonic() - self.built_at > settings.SUGGEST_INDEX_MAX_AGE
+            or get_generation(REBUILD_GENERATION) != self.rebuild_generation
+        )
+
+
+_index = None
+_maintenance = None
+_maintenance_lock = threading.Lock()
+
+
+def current_suggest_index():
+    return _index
+
+
+def rebuild_suggest_index(max_movies=None):
+    """Build a fresh index from the database and swap it in for this process."""
+    global _index  # pylint: disable=global-statement
+    _index = SuggestIndex.build(max_movies)
+    return _index
+
+
+def request_rebuild():
+    """Make every worker rebuild its index at its next sync check."""
+    bump_generation(REBUILD_GENERATION)
+
+
+def _maintain():
+    try:
+        index = _index
+        if index is None or index.needs_rebuild():
+            rebuild_suggest_index()
+        elif get_generation("movies.movie") != index.movie_generation:
+            index.sync()
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Suggestion index maintenance failed")
+    finally:
+        close_old_connections()
+
+
+def schedule_maintenance():
+    """Build, rebuild or sync the index in a background thread unless that is already happening."""
+    global _maintenance  # pylint: disable=global-statement
+    with _maintenance_lock:
+        if _maintenance is None or not _maintenance.is_alive():
+            _maintenance = threading.Thread(target=_maintain, name="suggest-index-maintenance", daemon=True)
+            _maintenance.start()
+    return _maintenance
+
+
+def suggest_movies(text, limit):
+    """Answer from this process's index, or return ``None`` while it is still being built.
+
+    At most every ``SUGGEST_INDEX_SYNC_INTERVAL`` seconds a query also checks
+    whether the index is behind and, if so, schedules a background sync or
+    rebuild; the query itself never waits on the database.
+    """
+    index = _index
+    if index is None:
+        schedule_maintenance()
+        return None
+    now = time.monotonic()
+    if now - index.checked_at > settings.SUGGEST_INDEX_SYNC_INTERVAL:
+        index.checked_at = now
+        if index.needs_rebuild() or get_generation("movies.movie") != index.movie_generation:
+            schedule_maintenance()
+    return index.search(text, limit)
+
+
+def warm_suggest_index():
+    """Start building the index at worker start; a no-op unless ``AUTOCOMPLETE_ENGINE`` is ``"memory"``."""
+    if settings.AUTOCOMPLETE_ENGINE != "memory":
+        return None
+    return schedule_maintenance()
@@ -1,4 +1,9 @@
 from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from movies.fragments import render_fragments
+from movies.posters import FORMATS, SIZES, poster_srcset, variant_url
 
 register = template.Library()
 
@@ -6,3 +11,86 @@ register = template.Library()
 @register.filter
 def get_item(dictionary, key):
     return dictionary.get(key)
+
+
+def movie_card_version(movie):
+    # Rating aggregates are written by SQL updates that leave updated_at alone, and so is a backfilled poster_digest.
+    return movie.updated_at, movie.average_rating, movie.poster_digest
+
+
+@register.simple_tag
+def poster_picture(movie, variant="card", **attrs):
+    """Render the poster as a ``<picture>`` offering every width in each of ``FORMATS``, best format first.
+
+    ``variant`` (``thumb``, ``card`` or ``detail``) picks the layout ``sizes`` and the
+    fallback ``src``; keyword arguments become attributes of the ``<img>``. Movies
+    whose poster has no variants get a plain ``<img>`` of ``poster_url``.
+    """
+    attributes = flatatt({"alt": movie.title, **attrs})
+    digest = movie.poster_digest
+    if not digest:
+        return format_html('<img src="{}"{}>', movie.poster_url, attributes)
+    *preferred, fallback = FORMATS
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        ((FORMATS[ext], poster_srcset(digest, ext), SIZES[variant]) for ext in preferred),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        sources,
+        variant_url(digest, variant, fallback),
+        poster_srcset(digest, fallback),
+        SIZES[variant],
+        attributes,
+    )
+
+
+@register.simple_tag
+def movie_cards(movies, style="grid"):
+    """Render ``movies/includes/movie_card.html`` for each movie, cached per movie and ``style``.
+
+    ``style`` is ``grid`` (catalog and favorites), ``profile`` or ``compact`` (the trending row).
+    """
+    return render_fragments(
+        f"movie-card-{style}",
+        "movies/includes/movie_card.html",
+        movies,
+        movie_card_version,
+        lambda movie: {"movie": movie, "style": style},
+    )
+
+
+@register.simple_tag
+def movie_reviews(reviews, ratings, viewer):
+    """Render a movie page's review blocks; ``ratings`` maps each author's id to their ``Rating``."""
+    viewer_id = viewer.pk if viewer.is_authenticated else None
+
+    def version(review):
+        rating = ratings.get(review.user_id)
+        own = review.user_id == viewer_id
+        return review.updated_at, review.user.username, rating.score if rating else None, own
+
+    return render_fragments(
+        "movie-review",
+        "movies/includes/review.html",
+        reviews,
+        version,
+        lambda review: {
+            "review": review,
+            "rating": ratings.get(review.user_id),
+            "is_own": review.user_id == viewer_id,
+        },
+    )
+
+
+@register.simple_tag
+def profile_reviews(reviews):
+    """Render a profile's review blocks, each showing its movie's rating; ``reviews`` should select the movie."""
+    return render_fragments(
+        "profile-review",
+        "movies/includes/profile_review.html",
+        reviews,
+        lambda review: (review.updated_at, *movie_card_version(review.movie), review.movie.total_ratings),
+        lambda review: {"review": review},
+    )
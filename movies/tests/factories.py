@@ -0,0 +1,19 @@
+"""Test data shared by the movie tests."""
+
+from movies.models import Movie
+
+
+def create_movie(title, **fields):
+    """Create a movie that passes ``full_clean``; ``fields`` override the placeholder credits and details."""
+    return Movie.objects.create(
+        **{
+            "title": title,
+            "director": "Director",
+            "release_year": 1970,
+            "description": f"{title} description",
+            "runtime": 100,
+            "country": "Country",
+            "movement": "Movement",
+            **fields,
+        }
+    )
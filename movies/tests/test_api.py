@@ -1,9 +1,12 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from movies.models import Movie
+from movies.tests.factories import create_movie
 
 User = get_user_model()
 
@@ -37,8 +40,8 @@ class MovieAPITests(TestCase):
         """Test retrieving movie detail through API"""
         response = self.client.get(f"/api/v1/movies/{self.movie.slug}/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data["title"], self.movie.title)
-        self.assertEqual(response.data["description"], self.movie.description)
+        self.assertEqual(response.json()["title"], self.movie.title)
+        self.assertEqual(response.json()["description"], self.movie.description)
 
     def test_create_movie_with_html(self):
         """Test that HTML tags are rejected in movie data"""
@@ -278,3 +281,31 @@ class MovieAPITests(TestCase):
         # Test favoriting with invalid slug format
         with self.assertRaises(Movie.DoesNotExist):
             self.client.post("/api/v1/movies/invalid@slug/favorite/")
+
+
+class MovieFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.movie = create_movie("Test Movie", description="Test Description", runtime=120, slug="test-movie")
+
+    def test_list_uses_lean_representation(self):
+        """Test that the list returns the lean fields and does not load the description"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/v1/movies/")
+        self.assertEqual(set(response.data["results"][0]), {"id", "title", "director", "release_year", "slug"})
+        movie_selects = [q["sql"] for q in context.captured_queries if 'FROM "movies_movie"' in q["sql"]]
+        self.assertTrue(movie_selects)
+        self.assertFalse(any('"description"' in sql or '"search_vector"' in sql for sql in movie_selects))
+
+    def test_sparse_fieldsets(self):
+        """Test that ?fields= picks serializer fields for lists and details and rejects unknown names"""
+        response = self.client.get("/api/v1/movies/", {"fields": "title,description"})
+        self.assertEqual(response.data["results"], [{"title": "Test Movie", "description": "Test Description"}])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/v1/movies/{self.movie.slug}/", {"fields": "slug,runtime"})
+        self.assertEqual(response.data, {"slug": "test-movie", "runtime": 120})
+
+        response = self.client.get("/api/v1/movies/", {"fields": "title,search_vector"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("search_vector", response.data["fields"])
@@ -0,0 +1,207 @@
+"""Tests for ETag/Last-Modified revalidation of the catalog API and pages."""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.response import TemplateResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from movies.conditional import CONDITIONAL_REQUESTS, cached_response
+from movies.models import Movie
+from reviews.models import Rating, Review
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="poller", email="poller@example.com", password="testpass123")
+        self.movie = Movie.objects.create(
+            title="Tokyo Story",
+            director="Yasujirō Ozu",
+            release_year=1953,
+            description="An aging couple visits their children",
+            runtime=136,
+            country="Japan",
+            movement="Japanese Humanism",
+        )
+
+    def revalidate(self, url, response, **extra):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"], **extra)
+
+    def test_unchanged_movie_detail_is_not_modified(self):
+        """Test that a detail revalidation runs no query and returns 304 with the validators"""
+        url = f"/api/v1/movies/{self.movie.slug}/"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(0):
+            revalidated = self.revalidate(url, response)
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(revalidated["ETag"], response["ETag"])
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+
+    def test_movie_write_changes_detail_and_list_etags(self):
+        """Test that saving the movie invalidates both its detail and the list"""
+        detail = self.client.get(f"/api/v1/movies/{self.movie.slug}/")
+        listing = self.client.get("/api/v1/movies/")
+        self.movie.runtime = 137
+        self.movie.save()
+
+        revalidated = self.revalidate(f"/api/v1/movies/{self.movie.slug}/", detail)
+        self.assertEqual(revalidated.status_code, status.HTTP_200_OK)
+        self.assertEqual(revalidated.json()["runtime"], 137)
+        self.assertEqual(self.revalidate("/api/v1/movies/", listing).status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_representation(self):
+        """Test that JSON, MessagePack and ?fields= selections get distinct ETags"""
+        url = f"/api/v1/movies/{self.movie.slug}/"
+        etags = {
+            self.client.get(url)["ETag"],
+            self.client.get(url, HTTP_ACCEPT="application/msgpack")["ETag"],
+            self.client.get(url, {"fields": "title"})["ETag"],
+        }
+        self.assertEqual(len(etags), 3)
+
+    def test_browsable_api_is_not_versioned(self):
+        """Test that the browsable API is answered without validators"""
+        response = self.client.get("/api/v1/movies/", HTTP_ACCEPT="text/html")
+        self.assertNotIn("ETag", response)
+
+    def test_review_and_rating_lists(self):
+        """Test that review and rating lists revalidate until one of them is written"""
+        urls = ("/api/v1/reviews/reviews/", "/api/v1/reviews/ratings/")
+        responses = [self.client.get(url) for url in urls]
+        for url, response in zip(urls, responses):
+            self.assertEqual(self.revalidate(url, response).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Rating.objects.create(movie=self.movie, user=self.user, score=Decimal("4.0"))
+        for url, response in zip(urls, responses):
+            self.assertEqual(self.revalidate(url, response).status_code, status.HTTP_200_OK)
+
+    def test_detail_page_revalidation(self):
+        """Test that the detail page is versioned per user and by its reviews"""
+        url = reverse("movies:movie-detail", kwargs={"slug": self.movie.slug})
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(url, response).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.revalidate(url, response).status_code, status.HTTP_200_OK)
+        response = self.client.get(url)
+        Review.objects.create(movie=self.movie, user=self.user, text="Quietly devastating")
+        self.assertEqual(self.revalidate(url, response).status_code, status.HTTP_200_OK)
+
+    def test_list_page_favorites_bump(self):
+        """Test that the list page revalidates and favoriting a movie changes the detail page"""
+        url = reverse("movies:movie-list")
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(url, response).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        detail_url = reverse("movies:movie-detail", kwargs={"slug": self.movie.slug})
+        self.client.force_login(self.user)
+        detail = self.client.get(detail_url)
+        self.movie.favorited_by.add(self.user)
+        self.assertEqual(self.revalidate(detail_url, detail).status_code, status.HTTP_200_OK)
+
+    def test_not_modified_metric(self):
+        """Test that 304s and stale revalidations are counted per view"""
+        url = "/api/v1/movies/"
+
+        def count(outcome):
+            return CONDITIONAL_REQUESTS.labels("MovieViewSet", outcome)._value.get()
+
+        before = count("not_modified"), count("modified")
+        response = self.client.get(url)
+        self.revalidate(url, response)
+        self.client.get(url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual((count("not_modified"), count("modified")), (before[0] + 1, before[1] + 1))
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="visitor", email="visitor@example.com", password="testpass123")
+        self.movie = Movie.objects.create(
+            title="Wings of Desire",
+            director="Wim Wenders",
+            release_year=1987,
+            description="Angels listen to Berlin",
+            runtime=128,
+            country="West Germany",
+            movement="New German Cinema",
+        )
+
+    def test_anonymous_api_responses_are_cached_until_a_write(self):
+        """Test that repeated anonymous GETs run no queries and a movie save serves fresh data"""
+        url = f"/api/v1/movies/{self.movie.slug}/"
+        for path in ("/api/v1/movies/", "/api/v1/reviews/ratings/"):
+            first = self.client.get(path)
+            with self.assertNumQueries(0):
+                cached = self.client.get(path)
+            self.assertEqual(cached.content, first.content)
+            self.assertEqual(cached["Content-Type"], first["Content-Type"])
+
+        self.client.get(url)
+        self.movie.title = "Der Himmel über Berlin"
+        self.movie.save()
+        self.assertEqual(self.client.get(url).json()["title"], "Der Himmel über Berlin")
+        self.assertEqual(self.client.get("/api/v1/movies/").json()["results"][0]["title"], "Der Himmel über Berlin")
+
+    def test_cached_responses_keep_their_headers(self):
+        """Test that a cache hit carries the same headers as the miss that stored it"""
+        paths = ("/api/v1/movies/", f"/api/v1/movies/{self.movie.slug}/", reverse("movies:movie-list"))
+        for path in paths:
+            first = self.client.get(path)
+            self.assertIn("Vary", first)
+            with self.assertNumQueries(0):
+                cached = self.client.get(path)
+            self.assertEqual(dict(cached.items()), dict(first.items()))
+
+        # Headers set by the view itself, which nothing after the view would put back on a hit.
+        cache.clear()
+        request = RequestFactory().get("/")
+        headers = {"Content-Type": "text/plain", "Cache-Control": "max-age=60", "Vary": "Accept-Language"}
+        miss = cached_response(request, "headers-test", "test", lambda: HttpResponse(b"body", headers=headers))
+        hit = cached_response(request, "headers-test", "test", self.fail)
+        self.assertEqual((hit.content, dict(hit.items())), (b"body", dict(miss.items())))
+
+    def test_writes_bump_only_affected_generations(self):
+        """Test that a review leaves the cached movie list alone but refreshes the review list"""
+        self.client.get("/api/v1/movies/")
+        self.client.get("/api/v1/reviews/reviews/")
+        Review.objects.create(movie=self.movie, user=self.user, text="Peter Falk as himself")
+        with self.assertNumQueries(0):
+            self.client.get("/api/v1/movies/")
+        self.assertEqual(len(self.client.get("/api/v1/reviews/reviews/").json()["results"]), 1)
+
+    def test_anonymous_pages_are_cached(self):
+        """Test that the list and detail pages are cached for anonymous visitors and follow rating writes"""
+        detail_url = reverse("movies:movie-detail", kwargs={"slug": self.movie.slug})
+        for url in (reverse("movies:movie-list"), detail_url):
+            first = self.client.get(url)
+            self.assertNotIn("csrftoken", first.cookies)
+            with self.assertNumQueries(0):
+                cached = self.client.get(url)
+            self.assertEqual(cached.content, first.content)
+
+        Rating.objects.create(movie=self.movie, user=self.user, score=Decimal("4.5"))
+        self.assertContains(self.client.get(detail_url), "4.5")
+
+    def test_authenticated_requests_are_not_cached(self):
+        """Test that signed-in users always get their own rendering"""
+        url = reverse("movies:movie-detail", kwargs={"slug": self.movie.slug})
+        self.client.force_login(self.user)
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertContains(response, "csrfmiddlewaretoken")
+        self.assertIsInstance(response, TemplateResponse)
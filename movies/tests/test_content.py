@@ -0,0 +1,102 @@
+"""Tests for the content-based (TF-IDF) similar movies."""
+
+import shutil
+import tempfile
+
+import numpy as np
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from movies.content import build_content_similarity, current_content_index
+from movies.models import MovieSimilarity
+from movies.tests.factories import create_movie
+
+
+class ContentSimilarityTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        overridden = override_settings(MOVIE_CONTENT_INDEX_DIR=directory)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+
+        tarkovsky = {"director": "Andrei Tarkovsky", "movement": "Soviet Poetic Cinema", "country": "USSR"}
+        godard = {"director": "Jean-Luc Godard", "movement": "French New Wave", "country": "France"}
+        self.stalker = create_movie(
+            "Stalker",
+            description="A guide leads a writer and a professor through the Zone to a room that grants wishes",
+            cinematographer="Alexander Knyazhinsky",
+            **tarkovsky,
+        )
+        self.solaris = create_movie(
+            "Solaris",
+            description="A psychologist travels to a space station orbiting an ocean planet",
+            cinematographer="Vadim Yusov",
+            **tarkovsky,
+        )
+        self.breathless = create_movie(
+            "Breathless",
+            description="A small-time thief on the run in Paris romances an American student",
+            cinematographer="Raoul Coutard",
+            **godard,
+        )
+        self.vivre = create_movie(
+            "Vivre sa vie",
+            description="A young woman in Paris drifts into prostitution",
+            cinematographer="Raoul Coutard",
+            **godard,
+        )
+
+    def titles(self, movie, source=MovieSimilarity.CONTENT):
+        return [neighbour.title for neighbour in MovieSimilarity.neighbours(movie.pk, 10, source)]
+
+    def test_build_stores_nearest_movies_by_content(self):
+        """Test that movies sharing credits and words are each other's nearest content neighbours"""
+        scored, stored = build_content_similarity()
+        self.assertEqual(scored, 4)
+        self.assertGreater(stored, 0)
+        self.assertEqual(self.titles(self.stalker)[0], "Solaris")
+        self.assertEqual(self.titles(self.breathless)[0], "Vivre sa vie")
+        self.assertNotIn("Breathless", self.titles(self.stalker))
+
+    def test_index_is_memory_mapped_and_reloaded(self):
+        """Test that workers map the current build and pick up the next one"""
+        build_content_similarity()
+        index = current_content_index()
+        self.assertIsInstance(index.movie_ids, np.memmap)
+        self.assertIs(current_content_index(), index)
+        build_content_similarity()
+        self.assertNotEqual(current_content_index().build_id, index.build_id)
+
+    def test_saved_movies_are_rescored_after_commit(self):
+        """Test that a movie created after the build gets content neighbours once it commits"""
+        build_content_similarity()
+        with self.captureOnCommitCallbacks(execute=True):
+            ivan = create_movie(
+                "Ivan's Childhood",
+                description="A boy scout works behind German lines",
+                director="Andrei Tarkovsky",
+                movement="Soviet Poetic Cinema",
+                country="USSR",
+                cinematographer="Vadim Yusov",
+            )
+        self.assertEqual(self.titles(ivan)[0], "Solaris")
+
+    def test_similar_endpoint_falls_back_to_content(self):
+        """Test that unrated movies are answered from content neighbours and rating neighbours win otherwise"""
+        build_content_similarity()
+        url = f"/api/v1/movies/{self.breathless.slug}/similar/"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["source"], "content")
+        self.assertEqual(response.json()["results"][0]["slug"], self.vivre.slug)
+
+        MovieSimilarity.objects.create(
+            movie=self.breathless, similar=self.stalker, source="ratings", score=0.5, computed_at=timezone.now()
+        )
+        self.assertEqual(self.client.get(url).json()["source"], "ratings")
+        self.assertEqual(self.client.get(url, {"source": "content"}).json()["results"][0]["slug"], self.vivre.slug)
+        self.assertEqual(self.client.get(url, {"source": "tags"}).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,126 @@
+"""Tests for the stored movie detail documents."""
+
+from unittest import mock
+
+import msgpack
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from movies import documents
+from movies.models import Movie
+from movies.serializers import MovieSerializer
+
+
+class MovieDocumentTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.movie = Movie.objects.create(
+            title="Cléo from 5 to 7",
+            director="Agnès Varda",
+            release_year=1962,
+            description="Two hours in Paris",
+            runtime=90,
+            country="France",
+            movement="French New Wave",
+        )
+
+    def test_detail_is_served_from_the_stored_document(self):
+        """Test that the first GET stores the document under slug and id and later GETs run no query"""
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/v1/movies/{self.movie.slug}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), MovieSerializer(self.movie).data)
+        with self.assertNumQueries(0):
+            by_slug = self.client.get(f"/api/v1/movies/{self.movie.slug}/")
+            by_id = self.client.get(f"/api/v1/movies/{self.movie.pk}/")
+        self.assertEqual(by_slug.content, response.content)
+        self.assertEqual(by_id.content, response.content)
+        self.assertEqual(by_id["Content-Type"], "application/json")
+
+    def test_other_representations_use_the_serializer_path(self):
+        """Test that ?fields= and MessagePack requests are not answered from the document"""
+        self.client.get(f"/api/v1/movies/{self.movie.slug}/")
+        response = self.client.get(f"/api/v1/movies/{self.movie.slug}/", {"fields": "title"})
+        self.assertEqual(response.json(), {"title": self.movie.title})
+        url = f"/api/v1/movies/{self.movie.slug}/"
+        for response in (
+            self.client.get(url, HTTP_ACCEPT="application/msgpack"),
+            self.client.get(url, {"format": "msgpack"}),
+        ):
+            self.assertEqual(response["Content-Type"], "application/msgpack")
+            self.assertEqual(msgpack.unpackb(response.content), MovieSerializer(self.movie).data)
+
+    def test_document_responses_are_negotiated_like_the_serializer(self):
+        """Test that a response from the document carries the serializer path's Vary and Allow headers"""
+        url = f"/api/v1/movies/{self.movie.slug}/"
+        serialized = self.client.get(url, {"fields": ",".join(MovieSerializer.Meta.fields)})
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            stored = self.client.get(url)
+        self.assertEqual(stored.json(), serialized.json())
+        self.assertIn("Accept", stored["Vary"])
+        for header in ("Content-Type", "Vary", "Allow"):
+            self.assertEqual(stored[header], serialized[header])
+
+    def test_saves_rewrite_the_document(self):
+        """Test that a committed save stores the new document and retires a changed slug"""
+        old_slug = self.movie.slug
+        self.client.get(f"/api/v1/movies/{old_slug}/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie.title = "Cleo from 5 to 7"
+            self.movie.slug = "cleo-de-5-a-7"
+            self.movie.save()
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/v1/movies/cleo-de-5-a-7/")
+            self.assertEqual(documents.load_document(old_slug), documents.MISSING)
+        self.assertEqual(response.json()["title"], "Cleo from 5 to 7")
+
+    def test_uncommitted_saves_drop_the_document(self):
+        """Test that a save drops the stored document before its transaction commits"""
+        self.client.get(f"/api/v1/movies/{self.movie.slug}/")
+        self.movie.runtime = 89
+        self.movie.save()
+        self.assertEqual(self.client.get(f"/api/v1/movies/{self.movie.slug}/").json()["runtime"], 89)
+
+    def test_unknown_and_deleted_movies_are_cached_as_missing(self):
+        """Test negative entries for unknown slugs, and that creating or deleting a movie updates them"""
+        with self.assertNumQueries(1):
+            self.assertEqual(documents.load_document("la-pointe-courte"), documents.MISSING)
+        with self.assertNumQueries(0):
+            self.assertEqual(documents.load_document("la-pointe-courte"), documents.MISSING)
+
+        movie = Movie.objects.create(
+            title="La Pointe Courte",
+            director="Agnès Varda",
+            release_year=1955,
+            description="A couple in a fishing village",
+            runtime=80,
+            country="France",
+            movement="French New Wave",
+        )
+        self.assertNotEqual(documents.load_document(movie.slug), documents.MISSING)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            movie.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(documents.load_document("la-pointe-courte"), documents.MISSING)
+
+    def test_concurrent_misses_wait_for_one_rebuild(self):
+        """Test that a miss while another request holds the rebuild lock waits for its document"""
+        lock = documents._key("lock", self.movie.slug)
+        cache.add(lock, 1)
+        rebuilt = []
+
+        def other_worker_finishes(seconds):
+            if not rebuilt:
+                rebuilt.append(documents._rebuild(self.movie.slug))
+
+        try:
+            with mock.patch("movies.documents.time.sleep", other_worker_finishes):
+                document = documents.load_document(self.movie.slug)
+        finally:
+            cache.delete(lock)
+        self.assertEqual(document, rebuilt[0])
@@ -0,0 +1,163 @@
+"""Tests for the Director and Movement entities and their stored stats."""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from movies.models import Director, Movement, Movie
+from movies.tests.factories import create_movie
+from reviews.models import Rating
+
+User = get_user_model()
+
+
+class CatalogEntityTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            User.objects.create_user(username=f"user{i}", email=f"user{i}@example.com", password="testpass123")
+            for i in range(2)
+        ]
+        self.nosferatu = create_movie("Nosferatu", director="F. W. Murnau", movement="German Expressionism")
+        self.sunrise = create_movie("Sunrise", director="f. w. murnau", movement="German Expressionism")
+        self.breathless = create_movie("Breathless", director="Jean-Luc Godard", movement="French New Wave")
+
+    def test_credits_resolve_to_shared_entities(self):
+        """Test that names are resolved case-insensitively to one entity per director and movement"""
+        murnau = Director.objects.get(name="F. W. Murnau")
+        self.assertEqual(Director.objects.count(), 2)
+        self.assertEqual(self.sunrise.director_ref, murnau)
+        self.assertEqual(self.nosferatu.director_ref, murnau)
+        self.assertEqual(murnau.slug, "f-w-murnau")
+        self.assertEqual(murnau.movie_count, 2)
+        self.assertEqual(Movement.objects.get(name="French New Wave").movie_count, 1)
+
+    def test_recredit_and_delete_move_movie_counts(self):
+        """Test that changing a credit or deleting a movie moves it between entities"""
+        self.sunrise.director = "Jean-Luc Godard"
+        self.sunrise.save()
+        counts = dict(Director.objects.values_list("name", "movie_count"))
+        self.assertEqual(counts, {"F. W. Murnau": 1, "Jean-Luc Godard": 2})
+
+        self.breathless.delete()
+        self.assertEqual(Director.objects.get(name="Jean-Luc Godard").movie_count, 1)
+
+    def test_rating_writes_update_entity_averages(self):
+        """Test that rating inserts, updates and deletes reach the director and movement totals"""
+        first = Rating.objects.create(user=self.users[0], movie=self.nosferatu, score=Decimal("4.0"))
+        Rating.objects.create(user=self.users[1], movie=self.sunrise, score=Decimal("3.0"))
+        murnau = Director.objects.get(name="F. W. Murnau")
+        self.assertEqual((murnau.rating_count, murnau.avg_rating), (2, Decimal("3.50")))
+
+        first.score = Decimal("5.0")
+        first.save()
+        first.delete()
+        murnau.refresh_from_db()
+        self.assertEqual((murnau.rating_count, murnau.avg_rating), (1, Decimal("3.00")))
+        movement = Movement.objects.get(name="German Expressionism")
+        self.assertEqual((movement.rating_count, movement.rating_sum), (1, Decimal("3.0")))
+
+    def test_recompute_ratings_shifts_entities(self):
+        """Test that recomputing drifted movie totals also corrects the entity totals"""
+        Rating.objects.create(user=self.users[0], movie=self.breathless, score=Decimal("4.5"))
+        Rating.objects.filter(movie=self.breathless).update(score=Decimal("2.5"))
+        self.assertEqual(Movie.recompute_ratings([self.breathless.pk]), 1)
+        godard = Director.objects.get(name="Jean-Luc Godard")
+        self.assertEqual((godard.rating_count, godard.avg_rating), (1, Decimal("2.50")))
+
+    def test_top_movie_follows_ratings_and_credits(self):
+        """Test that the top movie is promoted and demoted by rating writes, re-credits and deletes"""
+        murnau = Director.objects.get(name="F. W. Murnau")
+        self.assertEqual(murnau.top_movie, self.nosferatu)
+
+        Rating.objects.create(user=self.users[0], movie=self.sunrise, score=Decimal("4.0"))
+        murnau.refresh_from_db()
+        self.assertEqual(murnau.top_movie, self.sunrise)
+
+        rating = Rating.objects.create(user=self.users[0], movie=self.nosferatu, score=Decimal("4.5"))
+        murnau.refresh_from_db()
+        self.assertEqual(murnau.top_movie, self.nosferatu)
+
+        rating.score = Decimal("3.0")
+        rating.save()
+        murnau.refresh_from_db()
+        self.assertEqual(murnau.top_movie, self.sunrise)
+
+        self.sunrise.director = "Jean-Luc Godard"
+        self.sunrise.save()
+        murnau.refresh_from_db()
+        godard = Director.objects.get(name="Jean-Luc Godard")
+        self.assertEqual((murnau.top_movie, godard.top_movie), (self.nosferatu, self.sunrise))
+
+        self.sunrise.delete()
+        godard.refresh_from_db()
+        self.assertEqual(godard.top_movie, self.breathless)
+
+    def test_refresh_stats_repairs_drift(self):
+        """Test that the refresh command recomputes stats changed behind the signals' back"""
+        Rating.objects.create(user=self.users[0], movie=self.breathless, score=Decimal("4.0"))
+        Movie.objects.filter(pk=self.sunrise.pk).update(director="Jean-Luc Godard", director_ref=None)
+        Director.objects.filter(name="Jean-Luc Godard").update(rating_count=7, top_movie=None)
+
+        out = StringIO()
+        call_command("refresh_entity_stats", stdout=out)
+        self.assertIn("Refreshed 2 directors", out.getvalue())
+        rows = Director.objects.values_list("name", "movie_count", "rating_count", "avg_rating", "top_movie")
+        self.assertEqual(
+            set(rows),
+            {
+                ("F. W. Murnau", 1, 0, None, self.nosferatu.pk),
+                ("Jean-Luc Godard", 1, 1, Decimal("4.00"), self.breathless.pk),
+            },
+        )
+        self.assertEqual(Director.refresh_stats(), 0)
+
+    def test_disagreeing_totals_have_no_average(self):
+        """Test that rating totals no 0-5 scores could add up to get a NULL average instead of a made-up one"""
+        create_movie("Faust", director="Fritz Lang", rating_sum=Decimal("12.0"), total_ratings=2)
+        self.assertIsNone(Director.objects.get(name="Fritz Lang").avg_rating)
+
+        Movie.objects.filter(title="Faust").update(rating_sum=Decimal("7.0"))
+        Director.refresh_stats()
+        self.assertEqual(Director.objects.get(name="Fritz Lang").avg_rating, Decimal("3.50"))
+
+        Movie.objects.filter(title="Faust").update(rating_sum=Decimal("-1.0"))
+        Director.refresh_stats()
+        self.assertIsNone(Director.objects.get(name="Fritz Lang").avg_rating)
+
+    def test_name_filters_use_the_foreign_key(self):
+        """Test that ?director= matches any case through the entity and ?director_id= filters directly"""
+        murnau = Director.objects.get(name="F. W. Murnau")
+        for params in ({"director": "F. W. MURNAU"}, {"director_id": murnau.pk}):
+            response = self.client.get("/api/v1/movies/", params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual({movie["title"] for movie in response.data["results"]}, {"Nosferatu", "Sunrise"})
+        response = self.client.get("/api/v1/movies/", {"director": "Nobody"})
+        self.assertEqual(response.data["results"], [])
+
+    def test_director_endpoints_are_paginated_and_cached(self):
+        """Test the director list and detail endpoints and that cached pages follow writes"""
+        response = self.client.get("/api/v1/directors/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(
+            [(row["director"], row["movie_count"]) for row in response.data["results"]],
+            [("F. W. Murnau", 2), ("Jean-Luc Godard", 1)],
+        )
+        with self.assertNumQueries(0):
+            self.client.get("/api/v1/directors/")
+
+        Rating.objects.create(user=self.users[0], movie=self.breathless, score=Decimal("4.0"))
+        godard = Director.objects.get(name="Jean-Luc Godard")
+        response = self.client.get(f"/api/v1/directors/{godard.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["avg_rating"], "4.00")
+        self.assertEqual(response.data["top_movie_slug"], self.breathless.slug)
+
+        response = self.client.post("/api/v1/directors/", {"director": "Someone"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,116 @@
+"""Tests for the materialized movie facet counts."""
+
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from movies.models import Movie, MovieFacet
+from movies.tests.factories import create_movie
+
+
+class MovieFacetTests(TestCase):
+    def setUp(self):
+        self.nosferatu = create_movie(
+            "Nosferatu", director="F. W. Murnau", release_year=1922, country="Germany", movement="German Expressionism"
+        )
+        self.sunrise = create_movie(
+            "Sunrise", director="F. W. Murnau", release_year=1927, country="USA", movement="German Expressionism"
+        )
+        self.breathless = create_movie(
+            "Breathless", director="Jean-Luc Godard", release_year=1960, country="France", movement="French New Wave"
+        )
+
+    def stored_counts(self):
+        return {(facet.facet, facet.value): facet.movie_count for facet in MovieFacet.objects.all()}
+
+    def expected_counts(self):
+        counts = {}
+        for movie in Movie.objects.all():
+            for key in movie.facet_values():
+                counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def test_create_edit_and_delete_move_counts(self):
+        """Test that every movie write keeps the facet counts exact"""
+        self.assertEqual(self.stored_counts()[("director", "F. W. Murnau")], 2)
+        self.assertEqual(self.stored_counts(), self.expected_counts())
+
+        sunrise = Movie.objects.get(pk=self.sunrise.pk)
+        sunrise.director = "Jean-Luc Godard"
+        sunrise.release_year = 1960
+        sunrise.save()
+        self.assertEqual(self.stored_counts()[("director", "F. W. Murnau")], 1)
+        self.assertEqual(self.stored_counts()[("release_year", "1960")], 2)
+        self.assertNotIn(("release_year", "1927"), self.stored_counts())
+        self.assertEqual(self.stored_counts(), self.expected_counts())
+
+        self.nosferatu.delete()
+        Movie.objects.filter(pk=self.breathless.pk).delete()
+        self.assertEqual(self.stored_counts(), self.expected_counts())
+        self.assertNotIn(("director", "F. W. Murnau"), self.stored_counts())
+
+    def test_save_of_unloaded_instance_reads_stored_values(self):
+        """Test that saving an instance built by hand still moves the old counts"""
+        movie = Movie(
+            pk=self.nosferatu.pk,
+            slug=self.nosferatu.slug,
+            created_at=self.nosferatu.created_at,
+            title="Nosferatu",
+            director="Werner Herzog",
+            release_year=1979,
+            description="Remake",
+            runtime=107,
+            country="West Germany",
+            movement="New German Cinema",
+        )
+        movie._state.adding = False
+        movie.save()
+        self.assertEqual(self.stored_counts(), self.expected_counts())
+
+    def test_rebuild_matches_incremental_counts(self):
+        """Test that the rebuild command reproduces the incrementally maintained counts"""
+        incremental = self.stored_counts()
+        Movie.objects.filter(pk=self.breathless.pk).update(country="Switzerland")
+        call_command("rebuild_movie_facets", stdout=StringIO())
+        rebuilt = self.stored_counts()
+        self.assertEqual(rebuilt, self.expected_counts())
+        self.assertEqual(set(incremental) - set(rebuilt), {("country", "France")})
+
+    def test_list_page_facets_cost_no_aggregate_queries(self):
+        """Test that the movie list renders its facet block without aggregating movies, even with a cold cache"""
+        # A warm cache would serve the whole anonymous page without rendering it.
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for query in context.captured_queries:
+            self.assertNotIn("GROUP BY", query["sql"].upper())
+            self.assertNotIn("DISTINCT", query["sql"].upper())
+        self.assertEqual(
+            response.context["directors"],
+            [{"director": "F. W. Murnau", "movie_count": 2}, {"director": "Jean-Luc Godard", "movie_count": 1}],
+        )
+        self.assertEqual(response.context["years"], [1960, 1927, 1922])
+
+    def test_facets_endpoint(self):
+        """Test the /api/v1/movies/facets/ payload"""
+        response = APIClient().get("/api/v1/movies/facets/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {"directors", "movements", "release_years", "countries"})
+        self.assertEqual(response.data["release_years"][0], {"release_year": 1960, "movie_count": 1})
+        self.assertIn({"country": "USA", "movie_count": 1}, response.data["countries"])
+        self.assertIn({"movement": "German Expressionism", "movie_count": 2}, response.data["movements"])
+
+    def test_facets_snapshot_follows_movie_writes(self):
+        """Test that the cached snapshot is invalidated by movie writes"""
+        self.assertEqual(len(MovieFacet.snapshot()["director"]), 2)
+        create_movie(
+            "Stalker", director="Andrei Tarkovsky", release_year=1979, country="USSR", movement="Soviet Cinema"
+        )
+        self.assertEqual(len(MovieFacet.snapshot()["director"]), 3)
@@ -0,0 +1,101 @@
+"""Tests for the row-based read path and the orjson renderer."""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from movies.fastpath import read_plan
+from movies.models import Movie
+from movies.renderers import FastJSONRenderer
+from movies.serializers import MovieListSerializer, MovieSerializer
+from movies.views_api import MovieViewSet
+
+
+def reference_view(viewset, actions):
+    """The same viewset serving every request through its serializers and DRF's JSONRenderer."""
+    view_class = type(
+        f"Reference{viewset.__name__}",
+        (viewset,),
+        {
+            "get_read_plan": lambda self: None,
+            "get_document": lambda self: None,
+            "renderer_classes": [JSONRenderer],
+            "throttle_classes": [],
+        },
+    )
+    return view_class.as_view(actions)
+
+
+def rendered(response):
+    # Stored movie documents are returned as plain HttpResponses.
+    return response.render() if hasattr(response, "render") else response
+
+
+class ReadPathTestMixin:
+    def assertSameResponse(self, viewset, path, params=None, actions=None, **kwargs):
+        actions = actions or {"get": "list"}
+        factory = APIRequestFactory()
+        fast_view = type(f"Fast{viewset.__name__}", (viewset,), {"throttle_classes": []}).as_view(actions)
+        fast = rendered(fast_view(factory.get(path, params or {}), **kwargs))
+        reference = rendered(reference_view(viewset, actions)(factory.get(path, params or {}), **kwargs))
+        self.assertEqual(fast.status_code, reference.status_code)
+        self.assertEqual(fast.content, reference.content)
+        return fast
+
+
+class MovieReadPathTests(ReadPathTestMixin, TestCase):
+    def setUp(self):
+        for i, title in enumerate(
+            ["Stalker", 'The "Mirror" & <Sacrifice>', "Amélie Poulain", "Tab\tand\nline\u2028separator"]
+        ):
+            Movie.objects.create(
+                title=title,
+                director=f"Director {i % 2}",
+                release_year=1970 + i,
+                description=f"{title} — description ✓",
+                runtime=90 + i,
+                country="Country",
+                movement="Movement",
+                average_rating=Decimal("3.75") if i else 0,
+            )
+
+    def test_plan_matches_the_serializer(self):
+        """Test that a plan builds the same dicts as the serializer for every movie"""
+        movies = Movie.objects.order_by("id")
+        for serializer_class, fields in (
+            (MovieSerializer, None),
+            (MovieListSerializer, None),
+            (MovieSerializer, ("slug", "runtime")),
+        ):
+            plan = read_plan(serializer_class, fields)
+            serializer = serializer_class(movies, many=True, **({"fields": list(fields)} if fields else {}))
+            self.assertEqual(plan.serialize_many(plan.rows(movies)), serializer.data)
+
+    def test_list_and_detail_bytes_match(self):
+        """Test that list, sparse, cursor, search and detail responses are byte-identical to the DRF path"""
+        self.assertSameResponse(MovieViewSet, "/api/v1/movies/")
+        self.assertSameResponse(MovieViewSet, "/api/v1/movies/", {"fields": ",".join(MovieSerializer.Meta.fields)})
+        self.assertSameResponse(MovieViewSet, "/api/v1/movies/", {"pagination": "cursor", "page_size": 2})
+        self.assertSameResponse(MovieViewSet, "/api/v1/movies/", {"director": "director 1", "ordering": "title"})
+        self.assertSameResponse(MovieViewSet, "/api/v1/movies/search/", {"search": "stalker"}, {"get": "search"})
+        movie = Movie.objects.get(title="Stalker")
+        detail = {"get": "retrieve"}
+        self.assertSameResponse(MovieViewSet, f"/api/v1/movies/{movie.slug}/", actions=detail, slug=movie.slug)
+        self.assertSameResponse(MovieViewSet, f"/api/v1/movies/{movie.pk}/", actions=detail, slug=str(movie.pk))
+
+    def test_renderer_matches_json_renderer(self):
+        """Test that the orjson renderer emits JSONRenderer's bytes for the types DRF encodes"""
+        data = {
+            "text": 'quote " backslash \\ control \x01 \u2028 \u2029 é ✓',
+            "decimal": Decimal("4.50"),
+            "when": datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            "nested": [{"n": 1, "none": None, "flag": True}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, "application/json; indent=2"),
+            JSONRenderer().render(data, "application/json; indent=2"),
+        )
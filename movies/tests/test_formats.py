@@ -0,0 +1,75 @@
+"""Tests for the orjson and MessagePack renderers and parsers."""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import msgpack
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from movies.models import Movie
+from movies.renderers import MessagePackRenderer
+from reviews.models import Rating
+
+User = get_user_model()
+
+MSGPACK = "application/msgpack"
+
+
+class APIFormatTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="syncjob", email="sync@example.com", password="testpass123")
+        self.movie = Movie.objects.create(
+            title="8½",
+            director="Federico Fellini",
+            release_year=1963,
+            description="A film about creative and personal crisis",
+            runtime=138,
+            country="Italy",
+            movement="Italian Neorealism",
+        )
+        Rating.objects.create(movie=self.movie, user=self.user, score=Decimal("4.5"))
+
+    def test_msgpack_is_negotiated_by_accept_and_format(self):
+        """Test that Accept and ?format= select MessagePack with the same data as JSON"""
+        for url in ("/api/v1/movies/", "/api/v1/reviews/ratings/"):
+            expected = self.client.get(url).json()
+            response = self.client.get(url, HTTP_ACCEPT=MSGPACK)
+            self.assertEqual(response["Content-Type"], MSGPACK)
+            self.assertEqual(msgpack.unpackb(response.content), expected)
+            response = self.client.get(url, {"format": "msgpack"})
+            self.assertEqual(msgpack.unpackb(response.content), expected)
+
+    def test_msgpack_request_bodies(self):
+        """Test that writes accept MessagePack bodies and reject malformed ones"""
+        self.client.force_authenticate(user=self.user)
+        body = msgpack.packb({"movie_id": self.movie.id, "score": "3.5"})
+        response = self.client.post("/api/v1/reviews/ratings/", body, content_type=MSGPACK, HTTP_ACCEPT=MSGPACK)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(msgpack.unpackb(response.content)["score"], "3.5")
+
+        response = self.client.post("/api/v1/reviews/ratings/", b"\xc1garbage", content_type=MSGPACK)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("MessagePack parse error", response.json()["detail"])
+
+    def test_json_parser(self):
+        """Test that JSON bodies are parsed by orjson and malformed ones are rejected like before"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            "/api/v1/reviews/ratings/",
+            f'{{"movie_id": {self.movie.id}, "score": 2.5}}',
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post("/api/v1/reviews/ratings/", '{"score": NaN}', content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("JSON parse error", response.json()["detail"])
+
+    def test_msgpack_renderer_encodes_like_json(self):
+        """Test that decimals and datetimes get the JSON encoder's representation"""
+        when = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+        data = msgpack.unpackb(MessagePackRenderer().render({"when": when, "score": Decimal("4.5"), "bytes": b"x"}))
+        self.assertEqual(data, {"when": "2024-05-01T12:30:00Z", "score": 4.5, "bytes": b"x"})
@@ -0,0 +1,95 @@
+"""Tests for the cached movie card and review fragments."""
+
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from movies import fragments
+from movies.models import Movie
+from movies.templatetags.movie_tags import movie_cards, movie_reviews
+from reviews.models import Rating, Review
+
+User = get_user_model()
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="cinephile", email="cinephile@example.com", password="pass1234")
+        self.movies = [
+            Movie.objects.create(
+                title=title,
+                director="Andrei Tarkovsky",
+                release_year=1972,
+                description=f"{title} description",
+                runtime=150,
+                country="USSR",
+                movement="Soviet Poetic Cinema",
+            )
+            for title in ("Stalker", "Solaris", "Mirror")
+        ]
+
+    def render_counting(self, render):
+        with mock.patch.object(fragments, "render_to_string", wraps=fragments.render_to_string) as rendered:
+            output = render()
+        return output, rendered.call_count
+
+    def test_cards_are_rendered_once_per_version(self):
+        """Test that cards come from one cache lookup until their movie or its rating changes"""
+        cards, rendered = self.render_counting(lambda: movie_cards(Movie.objects.order_by("pk")))
+        self.assertEqual(rendered, 3)
+        self.assertIn("Stalker", cards[0])
+
+        with mock.patch.object(fragments.cache, "get_many", wraps=fragments.cache.get_many) as get_many:
+            cards, rendered = self.render_counting(lambda: movie_cards(Movie.objects.order_by("pk")))
+        self.assertEqual((rendered, get_many.call_count), (0, 1))
+        self.assertIn("Solaris", cards[1])
+
+        stalker = self.movies[0]
+        stalker.title = "Stalker (restored)"
+        stalker.save()
+        Rating.objects.create(movie=self.movies[1], user=self.user, score=Decimal("4.5"))
+        cards, rendered = self.render_counting(lambda: movie_cards(Movie.objects.order_by("pk")))
+        self.assertEqual(rendered, 2)
+        self.assertIn("Stalker (restored)", cards[0])
+        self.assertIn("4.5", cards[1])
+
+        _, rendered = self.render_counting(lambda: movie_cards(Movie.objects.order_by("pk"), "profile"))
+        self.assertEqual(rendered, 3)
+
+    def test_review_blocks_vary_by_viewer_and_rating(self):
+        """Test that the author sees their own badge, and a new rating re-renders the review"""
+        review = Review.objects.create(movie=self.movies[0], user=self.user, text="The Zone")
+        reviews = Review.objects.select_related("user")
+
+        [block] = movie_reviews(reviews, {}, AnonymousUser())
+        self.assertNotIn("Your Review", block)
+        [block] = movie_reviews(reviews, {}, self.user)
+        self.assertIn("Your Review", block)
+
+        rating = Rating.objects.create(movie=self.movies[0], user=self.user, score=Decimal("5.0"))
+        [block], rendered = self.render_counting(lambda: movie_reviews(reviews, {review.user_id: rating}, self.user))
+        self.assertEqual(rendered, 1)
+        self.assertEqual(block.count("fas fa-star"), 5)
+
+    def test_pages_render_cards_and_record_render_time(self):
+        """Test that list, favorites and profile pages render cached cards and report template render time"""
+        labels = {"template": "movies/movie_list.html"}
+        before = REGISTRY.get_sample_value("template_render_seconds_count", labels) or 0
+        response = self.client.get(reverse("movies:movie-list"))
+        self.assertContains(response, "Mirror")
+        self.assertEqual(REGISTRY.get_sample_value("template_render_seconds_count", labels), before + 1)
+
+        self.movies[1].favorited_by.add(self.user)
+        Review.objects.create(movie=self.movies[2], user=self.user, text="Memories of a childhood")
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(reverse("users:favorites")), "Solaris")
+        response = self.client.get(reverse("users:profile"))
+        self.assertContains(response, "Solaris")
+        self.assertContains(response, "Memories of a childhood")
@@ -0,0 +1,94 @@
+"""Tests for the Bayesian weighted score and the top-rated leaderboards."""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from movies.models import Movie, RatingPrior
+from movies.tests.factories import create_movie
+from reviews.models import Rating
+
+User = get_user_model()
+
+
+class WeightedScoreTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            User.objects.create_user(username=f"user{i}", email=f"user{i}@example.com", password="testpass123")
+            for i in range(20)
+        ]
+        # One perfect score, twenty strong ones and twenty poor ones: global mean 141 / 41 = 3.44.
+        self.stalker = create_movie("Stalker", director="Andrei Tarkovsky", release_year=1979)
+        self.solaris = create_movie("Solaris", director="Andrei Tarkovsky", release_year=1972)
+        self.breathless = create_movie("Breathless", director="Jean-Luc Godard", release_year=1960)
+        Rating.objects.create(movie=self.solaris, user=self.users[0], score=Decimal("5.0"))
+        for user in self.users:
+            Rating.objects.create(movie=self.stalker, user=user, score=Decimal("4.8"))
+            Rating.objects.create(movie=self.breathless, user=user, score=Decimal("2.0"))
+        RatingPrior.refresh(weight=10)
+
+    def weighted_score(self, movie):
+        movie.refresh_from_db(fields=["weighted_score"])
+        return movie.weighted_score
+
+    def test_few_ratings_are_shrunk_towards_the_mean(self):
+        """Test that a single perfect rating ranks below many strong ones"""
+        self.assertEqual(RatingPrior.objects.get().mean, Decimal("3.44"))
+        self.assertEqual(self.weighted_score(self.stalker), Decimal("4.3467"))
+        self.assertEqual(self.weighted_score(self.solaris), Decimal("3.5818"))
+        self.assertEqual(self.weighted_score(self.breathless), Decimal("2.4800"))
+        self.assertEqual(list(Movie.leaderboard(3)), [self.stalker, self.solaris, self.breathless])
+
+    def test_rating_writes_update_the_score(self):
+        """Test that rating writes and recomputes keep the stored score current under the stored prior"""
+        rating = Rating.objects.create(movie=self.solaris, user=self.users[1], score=Decimal("1.0"))
+        self.assertEqual(self.weighted_score(self.solaris), Decimal("3.3667"))
+        rating.delete()
+        self.assertEqual(self.weighted_score(self.solaris), Decimal("3.5818"))
+
+        Movie.objects.filter(pk=self.solaris.pk).update(weighted_score=0)
+        Movie.recompute_ratings([self.solaris.pk])
+        self.assertEqual(self.weighted_score(self.solaris), Decimal("3.5818"))
+
+    def test_refresh_only_rescores_when_the_prior_moves(self):
+        """Test that an unchanged prior rescores nothing and a new weight rescores every rated movie"""
+        self.assertEqual(RatingPrior.refresh(weight=10), 0)
+        out = StringIO()
+        call_command("refresh_rating_prior", "--weight=0", stdout=out)
+        self.assertIn("rescored 3 movies", out.getvalue())
+        self.assertEqual(self.weighted_score(self.solaris), Decimal("5.0000"))
+
+    def test_leaderboards_per_scope(self):
+        """Test that leaderboards rank within a director or a decade"""
+        self.assertEqual(list(Movie.leaderboard(5, decade=1970)), [self.stalker, self.solaris])
+        godard = self.breathless.director_ref_id
+        self.assertEqual(list(Movie.leaderboard(5, director_ref=godard)), [self.breathless])
+        with self.assertRaises(ValueError):
+            Movie.leaderboard(5, decade=1970, director_ref=godard)
+
+    def test_top_rated_endpoint(self):
+        """Test that the endpoint ranks by weighted score and validates its scope"""
+        url = "/api/v1/movies/top-rated/"
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["results"]
+        self.assertEqual([entry["slug"] for entry in results], [self.stalker.slug, self.solaris.slug])
+        self.assertEqual(results[0]["weighted_score"], "4.3467")
+        self.assertEqual(results[1]["total_ratings"], 1)
+
+        def slugs(params):
+            return [entry["slug"] for entry in self.client.get(url, params).json()["results"]]
+
+        self.assertEqual(slugs({"decade": 1975}), [self.stalker.slug, self.solaris.slug])
+        self.assertEqual(slugs({"movement_id": self.breathless.movement_ref_id, "limit": 1}), [self.stalker.slug])
+        self.assertEqual(self.client.get(url, {"decade": "seventies"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(url, {"decade": 1970, "director_id": 1}).status_code, status.HTTP_400_BAD_REQUEST
+        )
@@ -0,0 +1,179 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from movies.models import Director, Movie
+from movies.pagination import CountingPaginator
+from movies.tests.factories import create_movie
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.movies = []
+        for i in range(30):
+            self.movies.append(
+                Movie.objects.create(
+                    title=f"Movie {i:02d}",
+                    director="Director A" if i % 2 else "Director B",
+                    release_year=2000 + i // 3,  # three movies share each year
+                    description=f"Description {i}",
+                    runtime=90,
+                    country="Country",
+                    movement="Movement",
+                    average_rating=Decimal(i % 3),
+                )
+            )
+
+    def walk(self, url, params=None):
+        """Follow next links from the first page and return the visited titles."""
+        titles = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles.extend(movie["title"] for movie in response.data["results"])
+            if not response.data["next"]:
+                return titles, response
+            response = self.client.get(response.data["next"])
+
+    def test_cursor_walk_matches_index_ordering(self):
+        """Test that cursor pages cover the table in (-release_year, -average_rating, -id) order"""
+        titles, _ = self.walk("/api/v1/movies/", {"pagination": "cursor", "page_size": 7})
+        expected = Movie.objects.order_by("-release_year", "-average_rating", "-id").values_list("title", flat=True)
+        self.assertEqual(titles, list(expected))
+
+    def test_cursor_response_has_no_count(self):
+        """Test that cursor pages skip the COUNT query and the count fields"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/v1/movies/", {"pagination": "cursor"})
+        self.assertEqual(set(response.data), {"next", "previous", "results"})
+        self.assertFalse(any("COUNT(" in query["sql"].upper() for query in context.captured_queries))
+        self.assertIsNone(response.data["previous"])
+
+    def test_previous_link_returns_prior_page(self):
+        """Test walking back with the previous cursor"""
+        first = self.client.get("/api/v1/movies/", {"pagination": "cursor", "page_size": 5})
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNotNone(back.data["next"])
+
+    def test_cursor_with_ordering_and_filters(self):
+        """Test that cursors honour the ordering parameter and MovieFilter filters"""
+        titles, _ = self.walk(
+            "/api/v1/movies/", {"pagination": "cursor", "page_size": 4, "ordering": "title", "director": "director a"}
+        )
+        expected = Movie.objects.filter(director="Director A").order_by("title").values_list("title", flat=True)
+        self.assertEqual(titles, list(expected))
+
+    def test_cursor_with_mixed_direction_ordering(self):
+        """Test that mixed ascending/descending orderings paginate without gaps"""
+        titles, _ = self.walk(
+            "/api/v1/movies/", {"pagination": "cursor", "page_size": 4, "ordering": "release_year,-title"}
+        )
+        expected = Movie.objects.order_by("release_year", "-title").values_list("title", flat=True)
+        self.assertEqual(titles, list(expected))
+
+    def test_invalid_cursor(self):
+        """Test that a tampered cursor is rejected"""
+        response = self.client.get("/api/v1/movies/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_from_other_ordering_is_rejected(self):
+        """Test that a cursor cannot be replayed against a different ordering"""
+        first = self.client.get("/api/v1/movies/", {"pagination": "cursor", "page_size": 5})
+        response = self.client.get(first.data["next"] + "&ordering=title")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_shape_is_default(self):
+        """Test that existing clients still get page-number responses"""
+        response = self.client.get("/api/v1/movies/", {"page": 2})
+        self.assertEqual(
+            set(response.data), {"count", "count_is_approximate", "next", "previous", "total_pages", "results"}
+        )
+        self.assertEqual(response.data["count"], 30)
+
+
+class CountingPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(30):
+            self.create_numbered_movie(i)
+
+    def create_numbered_movie(self, i):
+        return create_movie(f"Movie {i:02d}", director="Director A" if i % 2 else "Director B", release_year=1980 + i)
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, [query for query in context.captured_queries if "COUNT(" in query["sql"].upper()]
+
+    def test_exact_count_is_cached_until_movies_change(self):
+        """Test that repeated pages reuse the cached count and writes invalidate it"""
+        response, counts = self.count_queries("/api/v1/movies/", {"director": "director a"})
+        self.assertEqual(response.data["count"], 15)
+        self.assertFalse(response.data["count_is_approximate"])
+        self.assertEqual(len(counts), 1)
+
+        response, counts = self.count_queries("/api/v1/movies/", {"director": "director a", "page": 2})
+        self.assertEqual(response.data["count"], 15)
+        self.assertEqual(counts, [])
+
+        self.create_numbered_movie(31)
+        response, counts = self.count_queries("/api/v1/movies/", {"director": "director a"})
+        self.assertEqual(response.data["count"], 16)
+        self.assertEqual(len(counts), 1)
+
+    @override_settings(PAGINATION_ESTIMATE_THRESHOLD=10)
+    def test_large_results_use_planner_estimate(self):
+        """Test that results above the threshold are estimated instead of counted"""
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE movies_movie")
+        response, counts = self.count_queries("/api/v1/movies/")
+        self.assertTrue(response.data["count_is_approximate"])
+        self.assertEqual(response.data["count"], 30)
+        self.assertEqual(counts, [])
+
+    @override_settings(PAGINATION_ESTIMATE_THRESHOLD=10)
+    def test_pages_past_a_stale_estimate_are_served(self):
+        """Test that an underestimated count does not cut off the last rows"""
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE movies_movie")
+        for i in range(30, 40):
+            self.create_numbered_movie(i)
+
+        response, _ = self.count_queries("/api/v1/movies/", {"page": 3})
+        self.assertEqual(response.data["total_pages"], 3)
+        self.assertIsNotNone(response.data["next"])
+        response, _ = self.count_queries("/api/v1/movies/", {"page": 4})
+        self.assertEqual(len(response.data["results"]), 4)
+        self.assertIsNone(response.data["next"])
+        response = self.client.get("/api/v1/movies/", {"page": 5})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_movie_list_view_uses_counting_paginator(self):
+        """Test that the HTML movie list shares the paginator with the API"""
+        response = self.client.get("/")
+        self.assertIsInstance(response.context["paginator"], CountingPaginator)
+        self.assertEqual(response.context["paginator"].count, 30)
+
+    def test_entity_counts_follow_movie_writes(self):
+        """Test that counts filtering on entity stats are invalidated by movie writes, which update them in SQL"""
+        directors = Director.objects.filter(movie_count__gt=0)
+        self.assertEqual(CountingPaginator(directors, 10).count, 2)
+
+        Movie.objects.create(
+            title="Debut",
+            director="Director C",
+            release_year=2001,
+            description="Description",
+            runtime=90,
+            country="Country",
+            movement="Movement",
+        )
+        self.assertEqual(CountingPaginator(directors, 10).count, 3)
@@ -1,4 +1,5 @@
 import time
+from decimal import Decimal
 
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
@@ -9,6 +10,7 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 
 from movies.models import Movie
+from reviews.models import Rating, Review
 
 User = get_user_model()
 
@@ -101,3 +103,59 @@ class PerformanceTests(TestCase):
         # Assert total time is less than 2 seconds
         total_time = end_time - start_time
         self.assertLess(total_time, 2.0)
+
+
+class MovieDetailQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.movie = Movie.objects.create(
+            title="Le Samouraï",
+            director="Jean-Pierre Melville",
+            release_year=1967,
+            description="A hitman's last contract",
+            runtime=105,
+            country="France",
+            movement="French Noir",
+        )
+        self.viewer = User.objects.create_user(username="viewer", email="viewer@example.com", password="testpass123")
+        self.url = reverse("movies:movie-detail", kwargs={"slug": self.movie.slug})
+
+    def add_ratings(self, count, start=0):
+        users = User.objects.bulk_create(
+            User(username=f"rater{i}", email=f"rater{i}@example.com", password="!") for i in range(start, start + count)
+        )
+        Rating.objects.bulk_create(Rating(movie=self.movie, user=user, score=Decimal("4.0")) for user in users)
+        Review.objects.bulk_create(Review(movie=self.movie, user=user, text=f"Review {user.pk}") for user in users[:10])
+
+    def count_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_detail_page_query_count_is_constant(self):
+        """Test that the detail page runs the same few queries with 10 and with 10,000 ratings"""
+        self.add_ratings(10)
+        anonymous = self.count_queries()
+        self.client.force_login(self.viewer)
+        signed_in = self.count_queries()
+
+        self.add_ratings(9990, start=10)
+        self.assertEqual(self.count_queries(), signed_in)
+        self.client.logout()
+        self.assertEqual(self.count_queries(), anonymous)
+        # Movie, reviews, their ratings, precomputed neighbours and the director/movement fallback
+        self.assertEqual(anonymous, 5)
+
+    def test_detail_page_shows_scores_and_viewer_state(self):
+        """Test that review scores, the viewer's review and the favorite state come from the loader"""
+        self.add_ratings(3)
+        Review.objects.create(movie=self.movie, user=self.viewer, text="Alain Delon never blinks")
+        Rating.objects.create(movie=self.movie, user=self.viewer, score=Decimal("5.0"))
+        self.client.force_login(self.viewer)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["user_rating"].score, Decimal("5.0"))
+        self.assertEqual(response.context["user_review"].text, "Alain Delon never blinks")
+        self.assertFalse(response.context["is_favorite"])
+        self.assertEqual(len(response.context["user_ratings"]), 4)
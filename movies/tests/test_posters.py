@@ -0,0 +1,132 @@
+"""Tests for the responsive poster variants."""
+
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from movies.models import Movie
+from movies.posters import FORMATS, VARIANTS, variant_directory, variant_url
+from movies.templatetags.movie_tags import poster_picture
+from movies.tests.factories import create_movie
+
+
+def poster_upload(name="stalker.jpg", color=(120, 90, 40), size=(800, 1200)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+class PosterVariantTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        overridden = override_settings(MEDIA_ROOT=media, POSTER_WORKERS=0)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie = create_movie("Stalker", poster=poster_upload())
+
+    def test_upload_renders_every_variant(self):
+        """Test that an uploaded poster is hashed and rendered at every width and format once committed"""
+        digest = self.movie.poster_digest
+        self.assertRegex(digest, r"^[0-9a-f]{32}$")
+        for variant, width in VARIANTS.items():
+            for ext in FORMATS:
+                with Image.open(variant_directory(digest) / f"{variant}.{ext}") as image:
+                    self.assertEqual(image.size, (width, width * 3 // 2))
+
+    def test_digest_follows_poster_content(self):
+        """Test that only a new poster file changes the digest, and with it every variant URL"""
+        digest = self.movie.poster_digest
+        self.movie.title = "Stalker (restored)"
+        self.movie.save()
+        self.assertEqual(Movie.objects.get(pk=self.movie.pk).poster_digest, digest)
+
+        self.movie.poster = poster_upload(color=(10, 20, 30))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie.save()
+        self.assertNotEqual(self.movie.poster_digest, digest)
+        self.assertTrue((variant_directory(self.movie.poster_digest) / "card.webp").is_file())
+
+        self.movie.poster = None
+        self.movie.save()
+        self.assertIsNone(Movie.objects.get(pk=self.movie.pk).poster_digest)
+
+    def test_picture_tag_offers_webp_and_jpeg(self):
+        """Test that the tag lists every width per format and falls back to poster_url without variants"""
+        html = poster_picture(self.movie, "card", **{"class": "card-img-top", "loading": "lazy"})
+        digest = self.movie.poster_digest
+        self.assertIn('<source type="image/webp" srcset="', html)
+        self.assertIn(f"{variant_url(digest, 'detail', 'webp')} 640w", html)
+        self.assertIn(f'<img src="{variant_url(digest, "card", "jpg")}"', html)
+        self.assertIn('sizes="320px"', html)
+        self.assertIn('alt="Stalker" class="card-img-top" loading="lazy"', html)
+
+        plain = create_movie("Mirror")
+        self.assertEqual(poster_picture(plain), f'<img src="{plain.poster_url}" alt="Mirror">')
+
+    def test_missing_variant_is_rendered_on_request(self):
+        """Test that a variant missing from disk is rendered, stored and served as immutable"""
+        digest = self.movie.poster_digest
+        shutil.rmtree(variant_directory(digest))
+
+        response = self.client.get(variant_url(digest, "thumb", "webp"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertTrue((variant_directory(digest) / "detail.jpg").is_file())
+
+        self.assertEqual(self.client.get(variant_url("0" * 32, "thumb", "webp")).status_code, 404)
+        self.assertEqual(self.client.get(variant_url(digest, "poster", "webp")).status_code, 404)
+
+    def test_undecodable_poster_is_a_remembered_404(self):
+        """Test that a poster Pillow cannot decode logs once, answers 404 and is not rendered on every request"""
+        with self.assertLogs("movies.posters", "ERROR"), self.captureOnCommitCallbacks(execute=True):
+            broken = create_movie("Mirror", poster=SimpleUploadedFile("mirror.jpg", b"not an image"))
+        url = variant_url(broken.poster_digest, "card", "webp")
+
+        with mock.patch("movies.posters.render_variants") as render:
+            self.assertEqual(self.client.get(url).status_code, 404)
+        render.assert_not_called()
+
+        cache.clear()
+        with self.assertLogs("movies.posters", "ERROR") as logs:
+            self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertIn(broken.poster_digest, logs.output[0])
+
+    def test_api_exposes_variants(self):
+        """Test that the movie detail carries the variant URLs and a srcset per format"""
+        poster = self.client.get(f"/api/v1/movies/{self.movie.slug}/").json()["poster"]
+        digest = self.movie.poster_digest
+        thumb = {"width": 160, **{ext: variant_url(digest, "thumb", ext) for ext in FORMATS}}
+        self.assertEqual(poster["variants"]["thumb"], thumb)
+        self.assertTrue(poster["srcset"]["jpg"].endswith(f"{variant_url(digest, 'detail', 'jpg')} 640w"))
+
+        response = self.client.get("/api/v1/movies/", {"fields": "slug,poster"})
+        entry = response.json()["results"][0]
+        self.assertEqual(entry["poster"]["srcset"], poster["srcset"])
+
+    def test_command_backfills_digests(self):
+        """Test that generate_poster_variants hashes posters saved without a digest and renders their variants"""
+        Movie.objects.filter(pk=self.movie.pk).update(poster_digest=None)
+        digest = self.movie.poster_digest
+        shutil.rmtree(variant_directory(digest))
+        stale = variant_directory("f" * 32)
+        stale.mkdir(parents=True)
+
+        out = StringIO()
+        call_command("generate_poster_variants", "--prune", stdout=out)
+        self.assertEqual(Movie.objects.get(pk=self.movie.pk).poster_digest, digest)
+        self.assertEqual(len(list(variant_directory(digest).iterdir())), len(VARIANTS) * len(FORMATS))
+        self.assertFalse(stale.exists())
+        self.assertIn("for 1 posters (1 rehashed), pruned 1 stale directories", out.getvalue())
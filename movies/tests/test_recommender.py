@@ -0,0 +1,100 @@
+"""Tests for the offline-trained personalized recommendations."""
+
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from movies.recommender import current_recommender, recommend_movies, train_recommender
+from movies.tests.factories import create_movie
+from reviews.models import Rating
+
+User = get_user_model()
+
+
+class RecommenderTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        overridden = override_settings(RECOMMENDER_DIR=directory, RECOMMENDER_FACTORS=8)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+
+        self.users = [
+            User.objects.create_user(username=f"viewer{i}", email=f"viewer{i}@example.com", password="pass1234")
+            for i in range(5)
+        ]
+        self.stalker = create_movie("Stalker", director="Andrei Tarkovsky")
+        self.solaris = create_movie("Solaris", director="Andrei Tarkovsky")
+        self.breathless = create_movie("Breathless", director="Jean-Luc Godard")
+        self.vivre = create_movie("Vivre sa vie", director="Jean-Luc Godard")
+        # Two camps of viewers; the first user shares the Tarkovsky camp's taste.
+        for user in self.users[1:3]:
+            self.rate(user, {self.stalker: 5, self.solaris: 5, self.breathless: 1, self.vivre: 1})
+        for user in self.users[3:]:
+            self.rate(user, {self.stalker: 1, self.solaris: 1, self.breathless: 5, self.vivre: 5})
+        self.rate(self.users[0], {self.stalker: 5, self.breathless: 1})
+
+    def rate(self, user, scores):
+        for movie, score in scores.items():
+            Rating.objects.create(movie=movie, user=user, score=Decimal(score))
+
+    def test_recommends_unrated_movies_of_similar_users(self):
+        """Test that a user is recommended what like-minded users rated highly, never what they rated"""
+        model, rmse = train_recommender(iterations=10)
+        self.assertLess(rmse, 0.5)
+        self.assertIsInstance(current_recommender().user_factors, np.memmap)
+
+        recommendations = recommend_movies(self.users[0].pk, 10)
+        self.assertEqual([movie_id for movie_id, _ in recommendations], [self.solaris.pk, self.vivre.pk])
+        self.assertGreater(recommendations[0][1], 4)
+        self.assertEqual(len(recommend_movies(self.users[1].pk, 10)), 0)
+        self.assertEqual(model.factors, 8)
+
+    def test_training_warm_starts_from_the_current_model(self):
+        """Test that a run starts from the previous factors and adds users rated since"""
+        train_recommender(iterations=10)
+        previous = current_recommender()
+        newcomer = User.objects.create_user(username="newcomer", email="newcomer@example.com", password="pass1234")
+        self.assertEqual(recommend_movies(newcomer.pk, 10), [])
+        self.rate(newcomer, {self.breathless: 5, self.stalker: 1})
+
+        model, rmse = train_recommender(iterations=1)
+        self.assertNotEqual(model.build_id, previous.build_id)
+        self.assertLess(rmse, 0.5)
+        self.assertEqual(recommend_movies(newcomer.pk, 1)[0][0], self.vivre.pk)
+
+        # The movie factors pick up where the last run left off; a cold start lands elsewhere.
+        drift = np.abs(model.movie_factors - previous.movie_factors).max()
+        cold, _ = train_recommender(iterations=1, warm_start=False)
+        self.assertLess(drift, np.abs(cold.movie_factors - previous.movie_factors).max())
+
+    def test_command_reports_training(self):
+        """Test that the management command trains and reports the fit"""
+        out = StringIO()
+        call_command("train_recommender", "--iterations=5", stdout=out)
+        self.assertIn("Trained 5 users × 4 movies", out.getvalue())
+
+    def test_recommendations_endpoint(self):
+        """Test that the endpoint needs a login, says when it is not personalized yet, and ranks predictions"""
+        url = "/api/v1/users/me/recommendations/"
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(self.users[0])
+        self.assertEqual(self.client.get(url).json(), {"personalized": False, "results": []})
+
+        train_recommender(iterations=10)
+        response = self.client.get(url, {"limit": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.json()["personalized"])
+        [result] = response.json()["results"]
+        self.assertEqual(result["slug"], self.solaris.slug)
+        self.assertLessEqual(result["predicted_rating"], 5.0)
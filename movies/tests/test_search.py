@@ -0,0 +1,245 @@
+"""Tests for the faceted movie search endpoint."""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from movies.models import Movie
+from movies.tests.factories import create_movie
+from reviews.models import Rating
+
+User = get_user_model()
+
+
+class MovieSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        movies = [
+            ("Solaris", "Andrei Tarkovsky", 1972, "USSR", "Soviet Cinema", "4.5"),
+            ("Stalker", "Andrei Tarkovsky", 1979, "USSR", "Soviet Cinema", "4.8"),
+            ("Nostalghia", "Andrei Tarkovsky", 1983, "Italy", "Art Cinema", "3.9"),
+            ("Breathless", "Jean-Luc Godard", 1960, "France", "French New Wave", "4.1"),
+            ("Contempt", "Jean-Luc Godard", 1963, "France", "French New Wave", "5.0"),
+            ("Persona", "Ingmar Bergman", 1966, "Sweden", "Art Cinema", None),
+        ]
+        for title, director, year, country, movement, rating in movies:
+            # Each rated movie has a single rating of its average; Persona is unrated.
+            Movie.objects.create(
+                title=title,
+                director=director,
+                release_year=year,
+                description=f"{title} description",
+                runtime=100,
+                country=country,
+                movement=movement,
+                average_rating=Decimal(rating or "0"),
+                rating_sum=Decimal(rating or "0"),
+                total_ratings=0 if rating is None else 1,
+            )
+
+    def test_facets_follow_filters(self):
+        """Test that facet counts are restricted to the applied filters"""
+        response = self.client.get("/api/v1/movies/search/", {"director": "andrei tarkovsky"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["results"]), 3)
+        facets = response.data["facets"]
+        self.assertEqual(
+            facets["movements"],
+            [{"movement": "Soviet Cinema", "movie_count": 2}, {"movement": "Art Cinema", "movie_count": 1}],
+        )
+        self.assertEqual(facets["decades"], [{"decade": 1980, "movie_count": 1}, {"decade": 1970, "movie_count": 2}])
+        self.assertEqual(
+            facets["rating_buckets"], [{"rating_bucket": 4, "movie_count": 2}, {"rating_bucket": 3, "movie_count": 1}]
+        )
+        self.assertEqual(facets["directors"], [{"director": "Andrei Tarkovsky", "movie_count": 3}])
+
+    def test_unfiltered_facets(self):
+        """Test facet counts over the whole catalog"""
+        facets = self.client.get("/api/v1/movies/search/").data["facets"]
+        self.assertEqual(facets["directors"][0], {"director": "Andrei Tarkovsky", "movie_count": 3})
+        self.assertIn({"country": "France", "movie_count": 2}, facets["countries"])
+        self.assertEqual(
+            facets["rating_buckets"], [{"rating_bucket": 4, "movie_count": 4}, {"rating_bucket": 3, "movie_count": 1}]
+        )
+
+    def test_new_filters(self):
+        """Test the country, decade and rating bucket filters"""
+        response = self.client.get("/api/v1/movies/search/", {"decade": 1960, "country": "france"})
+        self.assertEqual({movie["title"] for movie in response.data["results"]}, {"Breathless", "Contempt"})
+        response = self.client.get("/api/v1/movies/", {"rating_bucket": 4})
+        self.assertEqual(
+            {movie["title"] for movie in response.data["results"]}, {"Solaris", "Stalker", "Breathless", "Contempt"}
+        )
+        response = self.client.get("/api/v1/movies/", {"rating_bucket": 9})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unrated_movies_have_no_rating_bucket(self):
+        """Test that an unrated movie is in no rating bucket while a movie rated 0 is in bucket 0"""
+        user = User.objects.create_user(username="critic", password="testpass123")
+        Rating.objects.create(user=user, movie=create_movie("Sátántangó"), score=Decimal("0.0"))
+        response = self.client.get("/api/v1/movies/", {"rating_bucket": 0})
+        self.assertEqual([movie["title"] for movie in response.data["results"]], ["Sátántangó"])
+        facets = self.client.get("/api/v1/movies/search/").data["facets"]
+        self.assertEqual(facets["rating_buckets"][-1], {"rating_bucket": 0, "movie_count": 1})
+
+    def test_rating_bucket_count_follows_ratings(self):
+        """Test that a cached rating bucket count is invalidated by rating writes"""
+        response = self.client.get("/api/v1/movies/", {"rating_bucket": 2})
+        self.assertEqual(response.data["count"], 0)
+
+        user = User.objects.create_user(username="critic", password="testpass123")
+        Rating.objects.create(user=user, movie=Movie.objects.get(title="Persona"), score=Decimal("2.5"))
+        response = self.client.get("/api/v1/movies/", {"rating_bucket": 2})
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual([movie["title"] for movie in response.data["results"]], ["Persona"])
+
+    def test_facets_use_one_query_and_are_cached(self):
+        """Test that facets and count come from a single query, then from the cache"""
+        with CaptureQueriesContext(connection) as context:
+            self.client.get("/api/v1/movies/search/", {"movement": "Art Cinema"})
+        grouping = [query for query in context.captured_queries if "GROUPING SETS" in query["sql"]]
+        counts = [query for query in context.captured_queries if "COUNT(*) AS" in query["sql"]]
+        self.assertEqual(len(grouping), 1)
+        self.assertEqual(counts, [])
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/v1/movies/search/", {"movement": "ART CINEMA", "page": 1})
+        self.assertFalse(any("GROUPING SETS" in query["sql"] for query in context.captured_queries))
+        self.assertEqual(response.data["count"], 2)
+
+    def test_cache_invalidated_by_movie_writes(self):
+        """Test that a movie write is reflected in the next facet response"""
+        self.client.get("/api/v1/movies/search/", {"country": "Sweden"})
+        Movie.objects.create(
+            title="Wild Strawberries",
+            director="Ingmar Bergman",
+            release_year=1957,
+            description="Wild Strawberries description",
+            runtime=91,
+            country="Sweden",
+            movement="Art Cinema",
+        )
+        response = self.client.get("/api/v1/movies/search/", {"country": "Sweden"})
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(response.data["facets"]["decades"][1], {"decade": 1950, "movie_count": 1})
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.mirror = create_movie(
+            "Mirror",
+            director="Andrei Tarkovsky",
+            release_year=1975,
+            description="A memory piece about a childhood home.",
+        )
+        self.ivan = create_movie(
+            "Ivan's Childhood", director="Andrei Tarkovsky", release_year=1962, description="A boy scout in the war."
+        )
+        self.home = create_movie(
+            "Tokyo Story", director="Yasujiro Ozu", release_year=1953, description="Aging parents visit their children."
+        )
+
+    def search(self, text, **params):
+        response = self.client.get("/api/v1/movies/", {"search": text, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [movie["title"] for movie in response.json()["results"]]
+
+    def test_title_matches_outrank_description_matches(self):
+        """Test that results are ranked by the weighted tsvector"""
+        self.assertEqual(self.search("childhood"), ["Ivan's Childhood", "Mirror"])
+
+    def test_words_match_as_prefixes_and_stems(self):
+        """Test prefix and stemmed matching across weighted fields"""
+        self.assertEqual(set(self.search("tarko")), {"Mirror", "Ivan's Childhood"})
+        self.assertEqual(self.search("parent visiting"), ["Tokyo Story"])
+        self.assertEqual(self.search("tarkovsky war"), ["Ivan's Childhood"])
+
+    def test_explicit_ordering_overrides_rank(self):
+        """Test that ?ordering= wins over the rank ordering"""
+        self.assertEqual(self.search("childhood", ordering="-release_year"), ["Mirror", "Ivan's Childhood"])
+
+    def test_trigger_keeps_vector_current(self):
+        """Test that edits are searchable immediately and rating updates leave the vector alone"""
+        self.home.cinematographer = "Yuharu Atsuta"
+        self.home.save()
+        self.assertEqual(self.search("atsuta"), ["Tokyo Story"])
+        Movie.objects.filter(pk=self.home.pk).update(average_rating=Decimal("4.00"))
+        # The queryset update bumps no generation, so drop the cached response to search the table again.
+        cache.clear()
+        self.assertEqual(self.search("atsuta"), ["Tokyo Story"])
+
+    def test_punctuation_only_search_is_ignored(self):
+        """Test that a search without words does not filter"""
+        self.assertEqual(len(self.search("&|!")), 3)
+
+    def test_movie_list_view_search(self):
+        """Test that the HTML movie list uses the same full-text search"""
+        response = self.client.get("/", {"search": "childhood"})
+        self.assertEqual([movie.title for movie in response.context["movies"]], ["Ivan's Childhood", "Mirror"])
+        self.assertEqual(response.context["current_search"], "childhood")
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.eight_and_half = create_movie(
+            "8½", original_title="Otto e mezzo", director="Federico Fellini", release_year=1963
+        )
+        self.stalker = create_movie("Stalker", original_title="Сталкер", director="Andrei Tarkovsky", release_year=1979)
+        self.amelie = create_movie(
+            "Amélie",
+            original_title="Le Fabuleux Destin d'Amélie Poulain",
+            director="Jean-Pierre Jeunet",
+            release_year=2001,
+        )
+        self.stagecoach = create_movie("Stagecoach", director="John Ford", release_year=1939)
+
+    def suggest(self, text, **params):
+        response = self.client.get("/api/v1/movies/autocomplete/", {"q": text, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [movie["title"] for movie in response.data["results"]]
+
+    def test_unaccented_and_original_title_matches(self):
+        """Test that accents, fractions and original titles are matched"""
+        self.assertEqual(self.suggest("8 1/2"), ["8½"])
+        self.assertEqual(self.suggest("otto e mez"), ["8½"])
+        self.assertEqual(self.suggest("amelie"), ["Amélie"])
+        self.assertEqual(self.suggest("poulain"), ["Amélie"])
+
+    def test_fuzzy_director_match(self):
+        """Test that misspelled names still match through trigram similarity"""
+        self.assertEqual(self.suggest("Tarkovski"), ["Stalker"])
+
+    def test_title_prefixes_rank_first(self):
+        """Test that title prefix matches come before director matches"""
+        create_movie("Jeanne Dielman", director="Chantal Akerman", release_year=1975)
+        self.assertEqual(self.suggest("jean"), ["Jeanne Dielman", "Amélie"])
+        self.assertEqual(set(self.suggest("sta")), {"Stagecoach", "Stalker"})
+
+    def test_payload_is_small_and_limited(self):
+        """Test the compact payload, limit, short-term guard and cache headers"""
+        response = self.client.get("/api/v1/movies/autocomplete/", {"q": "sta", "limit": 1})
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(
+            set(response.data["results"][0]), {"id", "slug", "title", "original_title", "director", "release_year"}
+        )
+        self.assertIn("max-age=", response["Cache-Control"])
+        self.assertEqual(self.suggest("s"), [])
+        self.assertEqual(self.suggest("100% _"), [])
+
+    def test_prefix_results_are_cached_until_movies_change(self):
+        """Test that repeated prefixes are served from the cache"""
+        self.suggest("Stalk")
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.suggest("  stalk "), ["Stalker"])
+        self.assertEqual(context.captured_queries, [])
+        create_movie("Stalker Redux", director="Someone Else", release_year=2020)
+        self.assertEqual(len(self.suggest("stalk")), 2)
@@ -0,0 +1,94 @@
+"""Tests for the precomputed item-to-item similar movies."""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from movies.models import MovieSimilarity
+from movies.similarity import ADJUSTED_COSINE, build_similarity, movies_rated_since_last_build
+from movies.tests.factories import create_movie
+from reviews.models import Rating
+
+User = get_user_model()
+
+
+class MovieSimilarityTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            User.objects.create_user(username=f"cinephile{i}", email=f"cinephile{i}@example.com", password="pass1234")
+            for i in range(5)
+        ]
+        self.stalker = create_movie("Stalker")
+        self.solaris = create_movie("Solaris")
+        self.mirror = create_movie("Mirror")
+        self.ivan = create_movie("Ivan's Childhood")
+        self.rate(self.stalker, [5, 4, 2, 1])
+        self.rate(self.solaris, [5, 4, 2, 1])
+        self.rate(self.mirror, [1, 2, 4, 5])
+        self.rate(self.ivan, [5], users=[self.users[0]])
+
+    def rate(self, movie, scores, users=None):
+        for user, score in zip(users or self.users, scores):
+            Rating.objects.create(movie=movie, user=user, score=Decimal(score))
+
+    def neighbours(self, movie):
+        neighbours = MovieSimilarity.neighbours(movie.pk, 10)
+        return [(neighbour.title, round(neighbour.similarity, 3)) for neighbour in neighbours]
+
+    def test_cosine_neighbours(self):
+        """Test that identically rated movies score 1, and pairs with too few common raters are skipped"""
+        scored, stored = build_similarity(workers=1)
+        self.assertEqual(scored, 4)
+        self.assertEqual(self.neighbours(self.stalker), [("Solaris", 1.0), ("Mirror", 0.565)])
+        self.assertEqual(self.neighbours(self.ivan), [])
+        self.assertEqual(stored, 6)
+
+    def test_adjusted_cosine_drops_opposite_tastes(self):
+        """Test that centering on each user's mean turns the inversely rated movie negative"""
+        build_similarity(measure=ADJUSTED_COSINE, workers=1)
+        self.assertEqual(self.neighbours(self.stalker), [("Solaris", 1.0)])
+
+    def test_incremental_build_rescores_newly_rated_movies(self):
+        """Test that an incremental build only rescores movies rated since the last build"""
+        build_similarity(workers=1)
+        self.assertIsNone(MovieSimilarity.objects.filter(movie=self.ivan).first())
+        self.rate(self.ivan, [4, 2, 3], users=self.users[1:3] + self.users[4:])
+
+        self.assertEqual(movies_rated_since_last_build(), {self.ivan.pk})
+        out = StringIO()
+        call_command("build_movie_similarity", "--incremental", "--workers=1", stdout=out)
+        self.assertIn("Scored 1 movies", out.getvalue())
+        self.assertEqual([title for title, _ in self.neighbours(self.ivan)], ["Stalker", "Solaris", "Mirror"])
+        # Other movies keep their rows until the next full build.
+        self.assertNotIn("Ivan's Childhood", [title for title, _ in self.neighbours(self.stalker)])
+
+    def test_full_build_drops_movies_without_ratings(self):
+        """Test that a full build removes neighbours of movies whose ratings were deleted"""
+        build_similarity(workers=1)
+        Rating.objects.filter(movie=self.mirror).delete()
+        build_similarity(workers=1)
+        self.assertEqual(self.neighbours(self.mirror), [])
+        self.assertEqual(self.neighbours(self.stalker), [("Solaris", 1.0)])
+
+    def test_similar_endpoint(self):
+        """Test that /similar/ lists neighbours best first with their scores"""
+        build_similarity(workers=1)
+        response = self.client.get(f"/api/v1/movies/{self.stalker.slug}/similar/", {"limit": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["movie"], self.stalker.slug)
+        self.assertEqual(response.json()["source"], "ratings")
+        [entry] = response.json()["results"]
+        self.assertEqual((entry["slug"], entry["score"]), (self.solaris.slug, 1.0))
+
+    def test_detail_page_uses_neighbours(self):
+        """Test that the detail page shows precomputed neighbours in score order"""
+        build_similarity(workers=1)
+        response = self.client.get(reverse("movies:movie-detail", kwargs={"slug": self.mirror.slug}))
+        self.assertEqual([movie.title for movie in response.context["similar_movies"]], ["Stalker", "Solaris"])
@@ -0,0 +1,84 @@
+"""Tests for the in-process suggestion index."""
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from movies import suggest
+from movies.caching import bump_generation
+from movies.models import Movie
+from movies.suggest import BLOCK_SIZE, SuggestIndex, rebuild_suggest_index
+from movies.tests.factories import create_movie
+
+
+class SuggestIndexTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.addCleanup(setattr, suggest, "_index", None)
+        self.stalker = create_movie("Stalker", original_title="Сталкер", director="Andrei Tarkovsky", total_ratings=50)
+        self.stagecoach = create_movie("Stagecoach", director="John Ford", total_ratings=80)
+        self.amelie = create_movie(
+            "Amélie",
+            original_title="Le Fabuleux Destin d'Amélie Poulain",
+            director="Jean-Pierre Jeunet",
+            total_ratings=10,
+        )
+        self.jeanne = create_movie("Jeanne Dielman", director="Chantal Akerman", total_ratings=5)
+
+    def titles(self, text, limit=8):
+        return [movie["title"] for movie in suggest.suggest_movies(text, limit)]
+
+    def test_prefix_matches_rank_titles_then_popularity(self):
+        """Test that title prefixes come first, most rated first, ignoring accents and case"""
+        rebuild_suggest_index()
+        self.assertEqual(self.titles("sta"), ["Stagecoach", "Stalker"])
+        self.assertEqual(self.titles("sta", limit=1), ["Stagecoach"])
+        self.assertEqual(self.titles("AMELIE"), ["Amélie"])
+        self.assertEqual(self.titles("le fabuleux"), ["Amélie"])
+        self.assertEqual(self.titles("jean"), ["Jeanne Dielman", "Amélie"])
+        self.assertEqual(self.titles("xyz"), [])
+
+    def test_saves_and_deletes_update_the_index(self):
+        """Test that committed saves and deletes are reflected without a rebuild"""
+        rebuild_suggest_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            create_movie("Stalker Redux", director="Someone Else", total_ratings=100)
+            self.stagecoach.title = "Rio Bravo"
+            self.stagecoach.save()
+            self.stalker.delete()
+        self.assertEqual(self.titles("sta"), ["Stalker Redux"])
+        self.assertEqual(self.titles("rio"), ["Rio Bravo"])
+
+    def test_sync_picks_up_other_workers_writes(self):
+        """Test that a sync pulls movies saved without this process's signals"""
+        index = rebuild_suggest_index()
+        Movie.objects.filter(pk=self.jeanne.pk).update(title="Stromboli")
+        bump_generation("movies.movie")
+        index.sync()
+        self.assertEqual(self.titles("str"), ["Stromboli"])
+
+    def test_wide_ranges_match_a_full_scan(self):
+        """Test that merging per-block top lists returns the same top-k as sorting every match"""
+        rows = [(i, f"m{i}", f"Night {i}", "", f"Director {i % 7}", 2000, (i * 7919) % 1000) for i in range(3000)]
+        index = SuggestIndex(rows)
+        self.assertGreater(len(rows), 2 * BLOCK_SIZE)
+        expected = sorted(rows, key=lambda row: (-row[-1], row[0]))[:20]
+        results = index.search("night", 20)
+        self.assertEqual([row[-1] for row in expected], [rows[movie["id"]][-1] for movie in results])
+
+    def test_endpoint_memory_engine_skips_the_database(self):
+        """Test that ?engine=memory answers from the index without queries"""
+        rebuild_suggest_index()
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/v1/movies/autocomplete/", {"q": "stag", "engine": "memory"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([movie["title"] for movie in response.data["results"]], ["Stagecoach"])
+
+    def test_workers_warm_an_index_only_on_the_memory_engine(self):
+        """Test that warming at worker start is a no-op on the database engine"""
+        self.assertIsNone(suggest.warm_suggest_index())
+        self.assertIsNone(suggest.current_suggest_index())
+
+        with override_settings(AUTOCOMPLETE_ENGINE="memory"):
+            suggest.warm_suggest_index().join()
+        self.assertIsNotNone(suggest.current_suggest_index())
@@ -0,0 +1,102 @@
+"""Tests for the time-decayed trending movies."""
+
+import time
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from movies.caching import get_generation
+from movies.tests.factories import create_movie
+from movies.trending import GENERATION, refresh_trending, trending_counters
+from reviews.models import Rating, Review
+
+User = get_user_model()
+
+DAY = 24 * 60 * 60
+
+
+class TrendingMoviesTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        trending_counters.clear()
+        self.addCleanup(trending_counters.clear)
+        self.user = User.objects.create_user(username="cinephile", email="cinephile@example.com", password="pass1234")
+        self.stalker = create_movie("Stalker")
+        self.solaris = create_movie("Solaris")
+        self.mirror = create_movie("Mirror")
+
+    def test_scores_decay_with_age(self):
+        """Test that a day-old event counts half with a one-day half-life and events past the window not at all"""
+        now = time.time()
+        trending_counters.add([self.stalker.pk] * 4, 1.0, now=now - DAY)
+        trending_counters.add([self.solaris.pk], 3.0, now=now)
+        trending_counters.add([self.mirror.pk], 100.0, now=now - 8 * DAY)
+        self.assertEqual(trending_counters.top(10, now=now), [(self.solaris.pk, 3.0), (self.stalker.pk, 2.0)])
+
+    def test_writes_are_counted_after_commit(self):
+        """Test that new ratings, reviews and favorites add their weights once committed"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Rating.objects.create(movie=self.stalker, user=self.user, score=Decimal("4.5"))
+            Review.objects.create(movie=self.solaris, user=self.user, text="Hypnotic")
+            self.mirror.favorited_by.add(self.user)
+        self.assertEqual(
+            trending_counters.top(10), [(self.solaris.pk, 3.0), (self.mirror.pk, 2.0), (self.stalker.pk, 1.0)]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Rating.objects.filter(movie=self.stalker).first().save()
+        self.assertEqual(dict(trending_counters.top(10))[self.stalker.pk], 1.0)
+
+    def test_endpoint_serves_the_cached_ranking(self):
+        """Test that the endpoint never reads activity tables and only changes when the list is re-ranked"""
+        trending_counters.add([self.stalker.pk], 2.0)
+        trending_counters.add([self.mirror.pk], 1.0)
+        refresh_trending()
+        trending_counters.add([self.mirror.pk], 5.0)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/v1/movies/trending/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry["slug"] for entry in response.json()["results"]], [self.stalker.slug, self.mirror.slug])
+        self.assertEqual(response.json()["results"][0]["score"], 2.0)
+        for table in ("reviews_rating", "reviews_review", "users_userfavoritemovie"):
+            self.assertFalse(any(table in query["sql"] for query in queries.captured_queries))
+
+        out = StringIO()
+        call_command("refresh_trending_movies", stdout=out)
+        self.assertIn("Ranked 2 trending movies", out.getvalue())
+        response = self.client.get("/api/v1/movies/trending/", {"limit": 1})
+        self.assertEqual([entry["slug"] for entry in response.json()["results"]], [self.mirror.slug])
+
+    def test_generation_follows_the_order(self):
+        """Test that a re-rank only invalidates pages showing the list when the order of its movies changes"""
+        trending_counters.add([self.stalker.pk], 2.0)
+        trending_counters.add([self.mirror.pk], 1.0)
+        refresh_trending()
+        generation = get_generation(GENERATION)
+
+        trending_counters.add([self.stalker.pk], 1.0)
+        self.assertNotEqual(refresh_trending()[0][1], 2.0)
+        self.assertEqual(get_generation(GENERATION), generation)
+
+        trending_counters.add([self.mirror.pk], 5.0)
+        refresh_trending()
+        self.assertNotEqual(get_generation(GENERATION), generation)
+
+    def test_home_page_shows_trending_section(self):
+        """Test that the movie list page shows trending movies, and no section without activity"""
+        self.assertNotContains(self.client.get("/"), "trending-movies")
+        trending_counters.add([self.solaris.pk], 1.0)
+        refresh_trending()
+        response = self.client.get("/")
+        self.assertContains(response, "trending-movies")
+        self.assertEqual(response.context["trending_movies"], [self.solaris])
@@ -32,6 +32,7 @@ class ViewInternalsTests(TestCase):
             country="Country 1",
             movement="Movement 1",
             average_rating=Decimal("4.5"),
+            rating_sum=Decimal("9.0"),
             total_ratings=2,
         )
 
@@ -44,6 +45,7 @@ class ViewInternalsTests(TestCase):
             country="Country 2",
             movement="Movement 2",
             average_rating=Decimal("4.0"),
+            rating_sum=Decimal("4.0"),
             total_ratings=1,
         )
 
@@ -157,8 +159,8 @@ class ViewInternalsTests(TestCase):
         self.assertEqual(len(directors), 2)
         director1 = next(d for d in directors if d["director"] == "Director 1")
         self.assertEqual(director1["movie_count"], 1)
-        self.assertEqual(director1["rated_count"], 0)
-        self.assertIsNone(director1["avg_rating"])
+        self.assertEqual(director1["rated_count"], 2)
+        self.assertEqual(director1["avg_rating"], Decimal("4.50"))
 
     def test_movement_list_view_get_queryset(self):
         """Test MovementListView's get_queryset method"""
@@ -171,8 +173,8 @@ class ViewInternalsTests(TestCase):
         self.assertEqual(len(movements), 2)
         movement1 = next(m for m in movements if m["movement"] == "Movement 1")
         self.assertEqual(movement1["movie_count"], 1)
-        self.assertEqual(movement1["rated_count"], 0)
-        self.assertIsNone(movement1["avg_rating"])
+        self.assertEqual(movement1["rated_count"], 2)
+        self.assertEqual(movement1["avg_rating"], Decimal("4.50"))
 
     def test_movie_filter_exact_matches(self):
         """Test MovieFilter with exact matches"""
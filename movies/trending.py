@@ -0,0 +1,161 @@
+"""Trending movies from time-decayed activity counters.
+
+Every new rating, review and favorite adds its ``EVENT_WEIGHTS`` weight to the
+movie's counter in the current hourly bucket. Buckets are Redis sorted sets shared
+by every worker (an in-process stand-in is used when the cache is not Redis) and
+expire once they leave the ``TRENDING_WINDOW_HOURS`` window. A movie's trending
+score is the sum of its buckets, each halved every ``TRENDING_HALF_LIFE_HOURS``
+since it was written, so recent activity outweighs a long tail of old ratings.
+
+The ``TRENDING_MOVIES_LIMIT`` best movies are ranked in one ``ZUNIONSTORE`` and
+cached for ``POPULAR_MOVIES_CACHE_TIMEOUT``; requests read that list and fetch its
+movies by primary key, and never touch the rating, review or favorite tables.
+``manage.py refresh_trending_movies`` re-ranks ahead of expiry, e.g. from cron.
+"""
+
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from prometheus_client import Histogram
+
+from movies.caching import bump_generation, get_redis_client
+from movies.models import Movie
+
+RANK_SECONDS = Histogram("movie_trending_rank_seconds", "Time spent ranking trending movies from the counters")
+
+# A favorite says more than a rating, a written review more than both.
+EVENT_WEIGHTS = {"rating": 1.0, "favorite": 2.0, "review": 3.0}
+BUCKET_SECONDS = 60 * 60
+BUCKET_KEY = "movies:trending:bucket:{}"
+RANKING_KEY = "movies:trending:ranking"
+RANKED_CACHE_KEY = "movies:trending:ranked"
+# Movie ids of the last ranked list, kept past its expiry so a re-rank can tell whether the order changed.
+RANKED_IDS_KEY = "movies:trending:ranked-ids"
+# Generation of the cached ranked list, so pages showing it are re-rendered when its order changes.
+GENERATION = "movies.trending"
+
+
+def current_bucket(now=None):
+    return int((time.time() if now is None else now) // BUCKET_SECONDS)
+
+
+def bucket_decays(now=None):
+    """Return ``{bucket: weight}`` for the buckets inside the window, 1.0 for the current one."""
+    now = time.time() if now is None else now
+    newest = current_bucket(now)
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 60 * 60
+    return {
+        bucket: 0.5 ** ((newest - bucket) * BUCKET_SECONDS / half_life)
+        for bucket in range(newest - settings.TRENDING_WINDOW_HOURS + 1, newest + 1)
+    }
+
+
+class TrendingCounters:
+    """Hourly activity counters per movie.
+
+    Backed by one Redis sorted set per bucket so every web worker shares them;
+    falls back to in-process counters when the cache is not Redis.
+    """
+
+    def __init__(self):
+        self._local = {}
+        self._lock = threading.Lock()
+
+    def add(self, movie_ids, weight, now=None):
+        bucket = current_bucket(now)
+        client = get_redis_client()
+        if client is not None:
+            key = BUCKET_KEY.format(bucket)
+            pipeline = client.pipeline(transaction=False)
+            for movie_id in movie_ids:
+                pipeline.zincrby(key, weight, movie_id)
+            pipeline.expire(key, (settings.TRENDING_WINDOW_HOURS + 1) * BUCKET_SECONDS)
+            pipeline.execute()
+            return
+        with self._lock:
+            counters = self._local.setdefault(bucket, Counter())
+            for movie_id in movie_ids:
+                counters[movie_id] += weight
+            for old in [old for old in self._local if old <= bucket - settings.TRENDING_WINDOW_HOURS]:
+                del self._local[old]
+
+    def top(self, limit, now=None):
+        """Return up to ``limit`` ``(movie id, decayed score)`` pairs, best first."""
+        decays = bucket_decays(now)
+        client = get_redis_client()
+        if client is not None:
+            pipeline = client.pipeline()
+            pipeline.zunionstore(RANKING_KEY, {BUCKET_KEY.format(bucket): decay for bucket, decay in decays.items()})
+            pipeline.zrevrange(RANKING_KEY, 0, limit - 1, withscores=True)
+            pipeline.delete(RANKING_KEY)
+            ranked = pipeline.execute()[1]
+            return [(int(movie_id), score) for movie_id, score in ranked]
+        scores = Counter()
+        with self._lock:
+            for bucket, counters in self._local.items():
+                decay = decays.get(bucket)
+                if decay is not None:
+                    for movie_id, count in counters.items():
+                        scores[movie_id] += count * decay
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def clear(self):
+        client = get_redis_client()
+        if client is not None:
+            client.delete(*[BUCKET_KEY.format(bucket) for bucket in bucket_decays()])
+        else:
+            with self._lock:
+                self._local.clear()
+
+
+trending_counters = TrendingCounters()
+
+
+def record_activity(event, movie_ids):
+    """Count an ``EVENT_WEIGHTS`` event on each of ``movie_ids`` once the current transaction commits."""
+    movie_ids, weight = list(movie_ids), EVENT_WEIGHTS[event]
+    transaction.on_commit(lambda: trending_counters.add(movie_ids, weight), robust=True)
+
+
+def refresh_trending():
+    """Rank the movies from the counters, cache the list and return it as ``[(movie id, score), ...]``.
+
+    The generation is only bumped when the order of the movies changed, so a
+    re-rank that merely decays the scores keeps the pages showing the list cached.
+    """
+    with RANK_SECONDS.time():
+        ranked = trending_counters.top(settings.TRENDING_MOVIES_LIMIT)
+    cache.set(RANKED_CACHE_KEY, ranked, timeout=settings.POPULAR_MOVIES_CACHE_TIMEOUT)
+    movie_ids = [movie_id for movie_id, _ in ranked]
+    if cache.get(RANKED_IDS_KEY) != movie_ids:
+        cache.set(RANKED_IDS_KEY, movie_ids, timeout=None)
+        bump_generation(GENERATION)
+    return ranked
+
+
+def ranked_trending():
+    """Return the cached ranked list, re-ranking first if it expired.
+
+    Views versioned by ``GENERATION`` call this before computing their stamp,
+    so a re-rank bumps the generation ahead of the stamp rather than mid-render.
+    """
+    ranked = cache.get(RANKED_CACHE_KEY)
+    return refresh_trending() if ranked is None else ranked
+
+
+def trending_movies(limit):
+    """Return up to ``limit`` trending movies, best first, each carrying its ``trending_score``."""
+    ranked = ranked_trending()[:limit]
+    movies = Movie.objects.in_bulk([movie_id for movie_id, _ in ranked])
+    trending = []
+    # Movies deleted since the list was ranked are skipped.
+    for movie_id, score in ranked:
+        movie = movies.get(movie_id)
+        if movie is not None:
+            movie.trending_score = score
+            trending.append(movie)
+    return trending
@@ -1,7 +1,9 @@
 # pylint: disable=relative-beyond-top-level
-from django.urls import path
+from django.conf import settings
+from django.urls import path, re_path
 
 from movies import views
+from movies.posters import VARIANTS_PATH
 
 app_name = "movies"
 
@@ -10,4 +12,11 @@ urlpatterns = [
     path("movies/<slug:slug>/", views.MovieDetailView.as_view(), name="movie-detail"),
     path("directors/", views.DirectorListView.as_view(), name="directors"),
     path("movements/", views.MovementListView.as_view(), name="movements"),
+    # Variants missing from MEDIA_ROOT, ahead of the static() media route in config/urls.py.
+    re_path(
+        rf"^{settings.MEDIA_URL.strip('/')}/{VARIANTS_PATH}"
+        r"(?P<digest>[0-9a-f]{32})/(?P<variant>\w+)\.(?P<ext>\w+)$",
+        views.poster_variant,
+        name="poster-variant",
+    ),
 ]
@@ -1,5 +1,7 @@
 # pylint: disable=relative-beyond-top-level
-from django.db.models import Avg, Count, Q
+from django.db.models import F
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_cache_control
 from django.utils.html import escape
 from django.views.generic import DetailView, ListView
 from django_filters import rest_framework as django_filters
@@ -7,10 +9,16 @@ from rest_framework import filters, permissions, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from .conditional import ConditionalPageMixin
+from .detail import load_detail_context
 from .filters import MovieFilter
-from .models import Movie
-from .pagination import CustomPagination
+from .fragments import TimedTemplateResponse
+from .models import Director, Movement, Movie, MovieFacet
+from .pagination import CountingPaginator, CustomPagination
+from .posters import FORMATS, IMMUTABLE_MAX_AGE, VARIANTS, render_poster_variants, source_path, variant_directory
+from .search import search_movies
 from .serializers import MovieSerializer
+from .trending import ranked_trending, trending_movies
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -20,11 +28,21 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         return request.user and request.user.is_staff
 
 
-class MovieListView(ListView):
+class MovieListView(ConditionalPageMixin, ListView):
     model = Movie
     template_name = "movies/movie_list.html"
     context_object_name = "movies"
+    response_class = TimedTemplateResponse
     paginate_by = 12
+    paginator_class = CountingPaginator
+    # "movies.trending" is bumped whenever the order of the trending section's ranked list changes.
+    version_models = ("movies.movie", "reviews.rating", "movies.trending")
+    trending_shown = 6
+
+    def get_version(self):
+        # An expired ranking is recomputed (and its generation bumped) before the stamp is taken.
+        ranked_trending()
+        return super().get_version()
 
     def get_queryset(self):
         queryset = Movie.objects.all()
@@ -44,91 +62,127 @@ class MovieListView(ListView):
         if year:
             queryset = queryset.filter(release_year=year)
 
+        # Full-text search, best matches first
+        search = self.request.GET.get("search", "").strip()
+        if search:
+            queryset = search_movies(queryset, search)
+            if "search_rank" in queryset.query.annotations:
+                return queryset.order_by("-search_rank", "-id")
+
         return queryset.order_by("-release_year", "-average_rating")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Get unique directors with their movie counts
-        context["directors"] = (
-            Movie.objects.values("director").annotate(movie_count=Count("id")).order_by("director").distinct()
-        )
-
-        # Get unique movements with their movie counts
-        context["movements"] = (
-            Movie.objects.values("movement").annotate(movie_count=Count("id")).order_by("movement").distinct()
-        )
-
-        # Get unique years
-        context["years"] = Movie.objects.values_list("release_year", flat=True).order_by("-release_year").distinct()
+        # Facet counts come from the materialized MovieFacet rows (cached), not from aggregating movies
+        facets = MovieFacet.snapshot()
+        context["directors"] = facets["director"]
+        context["movements"] = facets["movement"]
+        context["countries"] = facets["country"]
+        context["years"] = [entry["release_year"] for entry in facets["release_year"]]
+        context["trending_movies"] = trending_movies(self.trending_shown)
 
         # Get current filters
         context["current_director"] = self.request.GET.get("director", "")
         context["current_movement"] = self.request.GET.get("movement", "")
         context["current_year"] = self.request.GET.get("year", "")
+        context["current_search"] = self.request.GET.get("search", "")
 
         return context
 
 
-class MovieDetailView(DetailView):
+class MovieDetailView(ConditionalPageMixin, DetailView):
     model = Movie
     template_name = "movies/movie_detail.html"
     context_object_name = "movie"
+    response_class = TimedTemplateResponse
     slug_url_kwarg = "slug"
+    # The page shows similar movies, recent reviews with their ratings, and the user's favorites.
+    version_models = (
+        "movies.movie",
+        "movies.moviesimilarity",
+        "reviews.review",
+        "reviews.rating",
+        "users.userfavoritemovie",
+    )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        movie = self.get_object()
-
-        # Get reviews with related user and rating data
-        reviews = movie.reviews.select_related("user").prefetch_related("user__ratings").order_by("-created_at")[:5]
-
-        # Create a dictionary of user ratings for this movie
-        user_ratings = {}
-        for review in reviews:
-            rating = review.user.ratings.filter(movie=movie).first()
-            if rating:
-                user_ratings[review.user.id] = rating
-
-        context["reviews"] = reviews
-        context["user_ratings"] = user_ratings
-        context["similar_movies"] = Movie.objects.filter(
-            Q(director=movie.director) | Q(movement=movie.movement)
-        ).exclude(id=movie.id)[:4]
-
-        # Add user's review and rating if authenticated
-        if self.request.user.is_authenticated:
-            context["user_review"] = movie.reviews.filter(user=self.request.user).first()
-            context["user_rating"] = movie.ratings.filter(user=self.request.user).first()
-
+        context.update(load_detail_context(self.object, self.request.user))
         return context
 
 
-class DirectorListView(ListView):
+class DirectorListView(ConditionalPageMixin, ListView):
     template_name = "movies/director_list.html"
     context_object_name = "directors"
+    paginate_by = 60
+    paginator_class = CountingPaginator
+    version_models = ("movies.movie", "reviews.rating")
 
     def get_queryset(self):
+        # Stats are stored on Director and kept current on write, so nothing is aggregated here.
         return (
-            Movie.objects.values("director")
-            .annotate(movie_count=Count("id"), rated_count=Count("ratings"), avg_rating=Avg("ratings__score"))
-            .order_by("director")
-            .distinct()
+            Director.objects.filter(movie_count__gt=0)
+            .order_by("name")
+            .values(
+                "id",
+                "slug",
+                "movie_count",
+                "avg_rating",
+                director=F("name"),
+                rated_count=F("rating_count"),
+                top_movie_title=F("top_movie__title"),
+                top_movie_slug=F("top_movie__slug"),
+            )
         )
 
 
-class MovementListView(ListView):
+class MovementListView(ConditionalPageMixin, ListView):
     template_name = "movies/movement_list.html"
     context_object_name = "movements"
+    paginate_by = 60
+    paginator_class = CountingPaginator
+    version_models = ("movies.movie", "reviews.rating")
 
     def get_queryset(self):
         return (
-            Movie.objects.values("movement")
-            .annotate(movie_count=Count("id"), rated_count=Count("ratings"), avg_rating=Avg("ratings__score"))
-            .order_by("movement")
-            .distinct()
+            Movement.objects.filter(movie_count__gt=0)
+            .order_by("name")
+            .values(
+                "id",
+                "slug",
+                "movie_count",
+                "avg_rating",
+                movement=F("name"),
+                rated_count=F("rating_count"),
+                top_movie_title=F("top_movie__title"),
+                top_movie_slug=F("top_movie__slug"),
+            )
         )
 
 
+def poster_variant(request, digest, variant, ext):
+    """Serve a poster variant, rendering the poster's missing variants to disk first if this one is not there.
+
+    A poster that cannot be decoded has no variants and answers 404. Web
+    servers should serve existing files from ``MEDIA_ROOT`` themselves and only
+    pass misses on to this view.
+    """
+    if variant not in VARIANTS or ext not in FORMATS:
+        raise Http404("Unknown poster variant")
+    path = variant_directory(digest) / f"{variant}.{ext}"
+    if not path.is_file():
+        name = Movie.objects.filter(poster_digest=digest).values_list("poster", flat=True).first()
+        source = source_path(name)
+        if source is None:
+            raise Http404("Unknown poster")
+        render_poster_variants(source, digest)
+        if not path.is_file():
+            raise Http404("Unreadable poster")
+    response = FileResponse(path.open("rb"), content_type=FORMATS[ext])
+    patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    return response
+
+
 # API Views
 class MovieViewSet(viewsets.ModelViewSet):
     queryset = Movie.objects.all()
@@ -1,14 +1,36 @@
 # pylint: disable=relative-beyond-top-level,duplicate-code
+from django.conf import settings
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.functional import cached_property
 from django.utils.text import slugify
 from django_filters import rest_framework as django_filters
 from rest_framework import filters, permissions, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.throttling import UserRateThrottle
 
+from .conditional import ConditionalGetMixin
+from .documents import MISSING, load_document
+from .fastpath import ReadPlanMixin
 from .filters import MovieFilter
-from .models import Movie
-from .pagination import CustomPagination
-from .serializers import DirectorSerializer, MovementSerializer, MovieSerializer
+from .models import CatalogEntity, Director, Movement, Movie, MovieFacet, MovieSimilarity
+from .pagination import CustomPagination, KeysetPagination, remember_count
+from .renderers import FastJSONRenderer
+from .search import (
+    AUTOCOMPLETE_MAX_LIMIT,
+    MovieSearchFilter,
+    cached_autocomplete,
+    normalize_autocomplete_term,
+    search_facets,
+)
+from .serializers import DirectorSerializer, MovementSerializer, MovieListSerializer, MovieSerializer
+from .suggest import suggest_movies
+from .trending import trending_movies
+
+TOP_RATED_MAX_LIMIT = 100
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -18,24 +40,144 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         return request.user and request.user.is_staff
 
 
-class MovieViewSet(viewsets.ModelViewSet):
+class AutocompleteRateThrottle(UserRateThrottle):
+    """Per-user (or per-IP) rate for typeahead, which fires a request per keystroke."""
+
+    scope = "autocomplete"
+
+
+class MovieViewSet(ConditionalGetMixin, ReadPlanMixin, viewsets.ModelViewSet):
+    # Each public method is a routed action or a DRF hook.
+    # pylint: disable=too-many-public-methods
     queryset = Movie.objects.all()
     serializer_class = MovieSerializer
     permission_classes = [IsAdminOrReadOnly]
     pagination_class = CustomPagination
-    filter_backends = [django_filters.DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [django_filters.DjangoFilterBackend, filters.OrderingFilter, MovieSearchFilter]
     filterset_class = MovieFilter
-    search_fields = ["title", "director", "description"]
-    ordering_fields = ["release_year", "title"]
+    ordering_fields = ["release_year", "title", "weighted_score"]
     ordering = ["-release_year"]
     lookup_field = "slug"
+    # Collections use the lean serializer unless ?fields= picks from MovieSerializer's fields.
+    collection_actions = ("list", "search")
+    # Read-only actions load only the columns they serialize, plus anything they order or paginate by.
+    sparse_actions = (*collection_actions, "retrieve")
+    ordering_columns = ("id", "release_year", "average_rating", "title", "weighted_score")
+    # Serializer fields read from a column of another name.
+    field_columns = {"poster": "poster_digest"}
+    # Pages can be ordered by average_rating; a single movie's representation only holds its own columns.
+    version_models = ("movies.movie", "reviews.rating")
+    _plan_object = None
+    _paginator = None
+
+    def get_sparse_fields(self):
+        """Return the field names requested with ``?fields=a,b``, or ``None``; unknown names are a 400."""
+        if self.request is None or self.action not in self.sparse_actions:
+            return None
+        requested = [name.strip() for name in self.request.query_params.get("fields", "").split(",") if name.strip()]
+        if not requested:
+            return None
+        unknown = sorted(set(requested) - set(MovieSerializer.Meta.fields))
+        if unknown:
+            raise ValidationError({"fields": f"Unknown fields: {', '.join(unknown)}"})
+        return requested
+
+    def get_document(self):
+        """Return the stored detail document (or ``MISSING``) for a plain JSON retrieve, ``None`` otherwise."""
+        return self._document
+
+    @cached_property
+    def _document(self):
+        renderer = getattr(self.request, "accepted_renderer", None)
+        if (
+            self.action == "retrieve"
+            and renderer is not None
+            and renderer.format == FastJSONRenderer.format
+            and self.request.accepted_media_type == renderer.media_type
+            and set(self.request.query_params) <= {"format"}
+        ):
+            return load_document(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        return None
+
+    def get_version(self):
+        """Version a single movie by its ``updated_at``, which also serves as its ``Last-Modified``."""
+        if self.action != "retrieve":
+            return super().get_version()
+        document = self.get_document()
+        if document == MISSING:
+            return None
+        plan = self.get_read_plan()
+        if document is not None:
+            updated_at = document[1]
+        elif plan is not None:
+            # The row read for the stamp is the one the response serializes.
+            updated_at = self.get_plan_object(plan).updated_at
+        else:
+            updated_at = self.get_object().updated_at
+        return (updated_at.isoformat(),), updated_at
+
+    def should_cache(self, request):
+        # Stored documents are already served without a query.
+        return super().should_cache(request) and self.get_document() is None
+
+    def get_serializer_class(self):
+        if self.action in self.collection_actions and self.get_sparse_fields() is None:
+            return MovieListSerializer
+        return super().get_serializer_class()
+
+    def get_read_fields(self):
+        return self.get_sparse_fields()
+
+    def get_plan_rows(self, plan, queryset):
+        # Cursors are encoded from the ordering fields of the last row; a single movie is versioned by its row.
+        if self.action == "retrieve":
+            return plan.rows(queryset, "updated_at")
+        extra = self.ordering_columns if isinstance(self.paginator, KeysetPagination) else ()
+        return plan.rows(queryset, *extra)
+
+    def get_plan_object(self, plan):
+        # Read once for both the version stamp and the response.
+        if self._plan_object is None:
+            self._plan_object = super().get_plan_object(plan)
+        return self._plan_object
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs["fields"] = fields
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.sparse_actions:
+            fields = self.get_sparse_fields() or self.get_serializer_class().Meta.fields
+            columns = {self.field_columns.get(name, name) for name in fields}
+            queryset = queryset.only(*{*columns, *self.ordering_columns})
+        return queryset
 
-    def get_object(self):
+    @property
+    def paginator(self):
+        """Use keyset pagination when a cursor is requested, page numbers otherwise.
+
+        Page-number responses (with ``count``/``total_pages``) stay the default for
+        existing clients; ``?pagination=cursor`` or a ``cursor`` switches to
+        opaque next/previous cursors with no COUNT query and no OFFSET.
+        """
+        if self._paginator is None:
+            params = self.request.query_params if self.request is not None else {}
+            if "cursor" in params or params.get("pagination") == "cursor":
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_object(self, queryset=None):
         """
         Returns the object the view is displaying.
         Try to use the slug first, then fall back to pk/id.
         """
-        queryset = self.filter_queryset(self.get_queryset())
+        if queryset is None:
+            queryset = self.filter_queryset(self.get_queryset())
 
         # Perform the lookup filtering.
         lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
@@ -63,6 +205,22 @@ class MovieViewSet(viewsets.ModelViewSet):
 
         return obj
 
+    def retrieve(self, request, *args, **kwargs):
+        # Only a plain JSON representation comes from the document; every other format goes through the serializer.
+        if self.get_document() is None:
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional(self.retrieve_document, request, *args, **kwargs)
+
+    def retrieve_document(self, request, *args, **kwargs):
+        """Return the stored JSON bytes of the requested movie, negotiated like the serializer's response."""
+        document = self.get_document()
+        if document == MISSING:
+            raise Movie.DoesNotExist("Movie matching query does not exist.")
+        response = HttpResponse(document[0], content_type=request.accepted_renderer.media_type)
+        # The same URL also serves MessagePack and the browsable API.
+        patch_vary_headers(response, ["Accept"])
+        return response
+
     def perform_create(self, serializer):
         title = serializer.validated_data.get("title", "")
         slug = slugify(title)
@@ -84,14 +242,190 @@ class MovieViewSet(viewsets.ModelViewSet):
         movie.favorited_by.add(user)
         return Response({"status": "favorited"})
 
+    @action(detail=True, methods=["get"], pagination_class=None, filter_backends=[])
+    def similar(self, request, slug=None):
+        """Movies most similar to this one, best first, with their cosine ``score``.
+
+        Neighbours by ratings (``manage.py build_movie_similarity``) are used when the
+        movie has any, neighbours by description and credits (``build_content_similarity``)
+        otherwise; ``?source=ratings|content`` picks one and ``source`` reports it.
+        ``?limit=`` defaults to 10 and is capped at ``MOVIE_SIMILARITY_TOP_K``.
+        """
+        movie = self.get_object()
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), settings.MOVIE_SIMILARITY_TOP_K)
+        except ValueError:
+            limit = 10
+        source = request.query_params.get("source")
+        if source is not None and source not in MovieSimilarity.SOURCES:
+            raise ValidationError({"source": f"Expected one of {', '.join(MovieSimilarity.SOURCES)}"})
+        neighbours = MovieSimilarity.neighbours(movie.pk, limit, source)
+        results = MovieListSerializer(neighbours, many=True).data
+        for entry, neighbour in zip(results, neighbours):
+            entry["score"] = round(neighbour.similarity, 4)
+        source = neighbours[0].similarity_source if neighbours else source
+        return Response({"movie": movie.slug, "source": source, "results": results})
+
+    @action(detail=False, methods=["get"], pagination_class=None, filter_backends=[])
+    def trending(self, request):
+        """Movies with the most recent ratings, reviews and favorites, best first, with their decayed ``score``.
+
+        Read from the ranked list cached by ``movies.trending``; ``?limit=`` defaults
+        to 10 and is capped at ``TRENDING_MOVIES_LIMIT``.
+        """
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), settings.TRENDING_MOVIES_LIMIT)
+        except ValueError:
+            limit = 10
+        movies = trending_movies(limit)
+        results = MovieListSerializer(movies, many=True).data
+        for entry, movie in zip(results, movies):
+            entry["score"] = round(movie.trending_score, 4)
+        return Response({"results": results})
+
+    @action(detail=False, methods=["get"], url_path="top-rated", pagination_class=None, filter_backends=[])
+    def top_rated(self, request):
+        """Best movies by the Bayesian ``weighted_score``, overall or within one scope.
+
+        The scope is one of ``?director_id=``, ``?movement_id=`` or ``?decade=`` (e.g.
+        1970), and each leaderboard is read in order from its own index; ``?limit=`` defaults
+        to 10 and is capped at ``TOP_RATED_MAX_LIMIT``.
+        """
+        scopes = {"director_id": "director_ref", "movement_id": "movement_ref", "decade": "decade"}
+        scope = {}
+        for param, field in scopes.items():
+            value = request.query_params.get(param)
+            if value is None:
+                continue
+            try:
+                scope[field] = int(value)
+            except ValueError as error:
+                raise ValidationError({param: "Expected an integer"}) from error
+        if len(scope) > 1:
+            raise ValidationError({"detail": f"Use at most one of {', '.join(scopes)}"})
+        if "decade" in scope:
+            scope["decade"] -= scope["decade"] % 10
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), TOP_RATED_MAX_LIMIT)
+        except ValueError:
+            limit = 10
+        movies = Movie.leaderboard(limit, **scope)
+        results = MovieListSerializer(movies, many=True).data
+        for entry, movie in zip(results, movies):
+            entry["weighted_score"] = str(movie.weighted_score)
+            entry["average_rating"] = str(movie.average_rating)
+            entry["total_ratings"] = movie.total_ratings
+        return Response({"results": results})
+
+    @action(detail=False, methods=["get"], pagination_class=None, filter_backends=[])
+    def facets(self, request):
+        """Movie counts per director, movement, release year and country, read from ``MovieFacet``."""
+        facets = MovieFacet.snapshot()
+        return Response(
+            {
+                "directors": facets["director"],
+                "movements": facets["movement"],
+                "release_years": facets["release_year"],
+                "countries": facets["country"],
+            }
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        pagination_class=None,
+        filter_backends=[],
+        throttle_classes=[AutocompleteRateThrottle],
+    )
+    def autocomplete(self, request):
+        """Typeahead suggestions for ``?q=`` matched on title, original title and director.
+
+        Accent- and case-insensitive prefix plus fuzzy (trigram) matching; returns
+        at most ``limit`` (default 8, max 20) compact entries. ``engine=memory``
+        (or ``AUTOCOMPLETE_ENGINE``) answers prefixes from the in-process
+        suggestion index instead, falling back to the database while it builds.
+        """
+        text = request.query_params.get("q", "")
+        try:
+            limit = min(max(int(request.query_params.get("limit", 8)), 1), AUTOCOMPLETE_MAX_LIMIT)
+        except ValueError:
+            limit = 8
+        engine = request.query_params.get("engine", settings.AUTOCOMPLETE_ENGINE)
+        results = None
+        if len(normalize_autocomplete_term(text)) < 2:
+            results = []
+        elif engine == "memory":
+            results = suggest_movies(text, limit)
+        if results is None:
+            results = cached_autocomplete(text, limit)
+        response = Response({"query": text, "results": results})
+        patch_cache_control(response, public=True, max_age=settings.AUTOCOMPLETE_CACHE_TIMEOUT)
+        return response
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """Paginated movies plus facet counts restricted to the same ``MovieFilter``/search filters.
+
+        The facets (directors, movements, decades, countries, rating buckets) and
+        the total come from one GROUPING SETS query, cached per normalized filter
+        key; the total also primes the paginator's count.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        filterset = self.filterset_class(request.query_params, queryset=queryset, request=request)
+        filterset.is_valid()
+        applied = filterset.normalized_filters()
+        terms = " ".join(request.query_params.get(MovieSearchFilter.search_param, "").lower().split())
+        if terms:
+            applied.append(("search", terms))
+
+        total, facets = search_facets(queryset, applied)
+        plan = self.get_read_plan()
+        if plan is not None:
+            queryset = self.get_plan_rows(plan, queryset)
+        remember_count(queryset, total)
+        page = self.paginate_queryset(queryset)
+        data = self.get_serializer(page, many=True).data if plan is None else plan.serialize_many(page)
+        response = self.get_paginated_response(data)
+        response.data["facets"] = facets
+        return response
+
+
+class CatalogEntityViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """Paginated directors or movements with their stored stats.
+
+    Entities are derived from movie credits, so the endpoints are read-only.
+    Their stats move with movie and rating writes.
+    """
 
-class DirectorViewSet(viewsets.ModelViewSet):
-    queryset = Movie.objects.values("director").distinct()
-    serializer_class = DirectorSerializer
     permission_classes = [IsAdminOrReadOnly]
+    version_models = ("movies.movie", "reviews.rating")
+    entity: type[CatalogEntity] | None = None
+    name_field: str | None = None
+
+    def get_queryset(self):
+        return (
+            self.entity.objects.filter(movie_count__gt=0)
+            .order_by("name")
+            .values(
+                "id",
+                "slug",
+                "movie_count",
+                "rating_count",
+                "avg_rating",
+                top_movie_title=F("top_movie__title"),
+                top_movie_slug=F("top_movie__slug"),
+                **{self.name_field: F("name")},
+            )
+        )
 
 
-class MovementViewSet(viewsets.ModelViewSet):
-    queryset = Movie.objects.values("movement").distinct()
+class DirectorViewSet(CatalogEntityViewSet):
+    serializer_class = DirectorSerializer
+    entity = Director
+    name_field = "director"
+
+
+class MovementViewSet(CatalogEntityViewSet):
     serializer_class = MovementSerializer
-    permission_classes = [IsAdminOrReadOnly]
+    entity = Movement
+    name_field = "movement"
@@ -1,6 +1,8 @@
 # pylint: disable=relative-beyond-top-level
 from django.contrib import admin
 
+from movies.pagination import CountingPaginator
+
 from .models import Rating, Review
 
 
@@ -11,6 +13,8 @@ class ReviewAdmin(admin.ModelAdmin):
     search_fields = ("movie__title", "user__username", "text")
     readonly_fields = ("created_at", "updated_at")
     raw_id_fields = ("movie", "user")
+    paginator = CountingPaginator
+    show_full_result_count = False
 
 
 @admin.register(Rating)
@@ -20,3 +24,5 @@ class RatingAdmin(admin.ModelAdmin):
     search_fields = ("movie__title", "user__username")
     readonly_fields = ("created_at", "updated_at")
     raw_id_fields = ("movie", "user")
+    paginator = CountingPaginator
+    show_full_result_count = False
@@ -0,0 +1,154 @@
+"""Deferred maintenance of movie rating aggregates.
+
+With ``RATING_AGGREGATES_MODE = "deferred"`` rating writes only mark their
+movie as dirty. A flusher (the ``flush_rating_aggregates`` management command,
+or an in-process thread when ``RATING_AGGREGATES_IN_PROCESS_FLUSHER`` is set)
+drains the dirty set in batches and recomputes each batch with a single
+set-based UPDATE, so hot movies take one aggregate write per flush instead of
+one per rating.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from prometheus_client import Counter, Gauge, Histogram
+
+from movies.caching import bump_generation, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+DIRTY_MOVIES_KEY = "reviews:rating-aggregates:dirty-movies"
+
+QUEUE_DEPTH = Gauge("movie_rating_recompute_queue_depth", "Movies waiting for a rating aggregate recompute")
+FLUSH_SECONDS = Histogram("movie_rating_recompute_flush_seconds", "Time spent flushing one batch of dirty movies")
+FLUSHED_MOVIES = Counter("movie_rating_recompute_flushed_movies_total", "Movies whose rating aggregates were flushed")
+
+
+def deferred_mode_enabled():
+    return getattr(settings, "RATING_AGGREGATES_MODE", "sync") == "deferred"
+
+
+class DirtyMovieQueue:
+    """Set of movie ids waiting for a recompute.
+
+    Backed by a Redis set so every web worker and the flusher share it; falls
+    back to an in-process set when the cache is not Redis.
+    """
+
+    def __init__(self):
+        self._local = set()
+        self._lock = threading.Lock()
+
+    def add(self, movie_id):
+        client = get_redis_client()
+        if client is not None:
+            client.sadd(DIRTY_MOVIES_KEY, movie_id)
+        else:
+            with self._lock:
+                self._local.add(movie_id)
+        QUEUE_DEPTH.set(self.depth())
+
+    def pop(self, count):
+        client = get_redis_client()
+        if client is not None:
+            return [int(movie_id) for movie_id in client.spop(DIRTY_MOVIES_KEY, count) or []]
+        with self._lock:
+            return [self._local.pop() for _ in range(min(count, len(self._local)))]
+
+    def depth(self):
+        client = get_redis_client()
+        if client is not None:
+            return client.scard(DIRTY_MOVIES_KEY)
+        return len(self._local)
+
+    def requeue(self, movie_ids):
+        for movie_id in movie_ids:
+            self.add(movie_id)
+
+
+dirty_movies = DirtyMovieQueue()
+
+
+def mark_movie_dirty(movie_id):
+    """Queue a movie for recompute once the current transaction commits."""
+    transaction.on_commit(lambda: dirty_movies.add(movie_id))
+    if getattr(settings, "RATING_AGGREGATES_IN_PROCESS_FLUSHER", False):
+        start_background_flusher()
+
+
+def flush_dirty_movies(batch_size=None):
+    """Recompute one batch of dirty movies and return how many were flushed."""
+    # pylint: disable=import-outside-toplevel
+    from movies.models import Movie
+
+    batch_size = batch_size or settings.RATING_AGGREGATES_BATCH_SIZE
+    movie_ids = dirty_movies.pop(batch_size)
+    if not movie_ids:
+        QUEUE_DEPTH.set(0)
+        return 0
+    with FLUSH_SECONDS.time():
+        try:
+            Movie.recompute_ratings(movie_ids)
+        except Exception:
+            dirty_movies.requeue(movie_ids)
+            raise
+    # Generation-keyed entries (cached pages, ETags) read the aggregates written above.
+    bump_generation("reviews.rating")
+    FLUSHED_MOVIES.inc(len(movie_ids))
+    QUEUE_DEPTH.set(dirty_movies.depth())
+    return len(movie_ids)
+
+
+def flush_all(batch_size=None):
+    """Drain the dirty set batch by batch and return the number of movies flushed."""
+    flushed = 0
+    while True:
+        count = flush_dirty_movies(batch_size)
+        if not count:
+            return flushed
+        flushed += count
+
+
+class RatingAggregateFlusher(threading.Thread):
+    """Daemon thread that drains the dirty set every staleness window."""
+
+    def __init__(self, interval):
+        super().__init__(name="rating-aggregate-flusher", daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        # pylint: disable=import-outside-toplevel
+        from django.db import close_old_connections
+
+        while not self.stopped.wait(self.interval):
+            started = time.monotonic()
+            try:
+                flushed = flush_all()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Rating aggregate flush failed")
+                continue
+            finally:
+                close_old_connections()
+            if flushed:
+                logger.info("Flushed rating aggregates for %s movies in %.3fs", flushed, time.monotonic() - started)
+
+    def stop(self):
+        self.stopped.set()
+
+
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def start_background_flusher():
+    """Start the in-process flusher once per process."""
+    global _flusher  # pylint: disable=global-statement
+    with _flusher_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = RatingAggregateFlusher(settings.RATING_AGGREGATES_MAX_STALENESS)
+            _flusher.start()
+    return _flusher
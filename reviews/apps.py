@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class ReviewsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "reviews"
+
+    def ready(self):
+        """Import signals when the app is ready."""
+        # pylint: disable=import-outside-toplevel,unused-import
+        import reviews.signals  # noqa: F401  # This import is needed to register signals
@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from reviews.aggregates import dirty_movies, flush_all
+
+
+class Command(BaseCommand):
+    help = "Recompute rating aggregates for movies marked dirty by deferred rating writes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit.")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.RATING_AGGREGATES_MAX_STALENESS,
+            help="Seconds between flushes; bounds how stale the aggregates can get.",
+        )
+        parser.add_argument("--batch-size", type=int, default=settings.RATING_AGGREGATES_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            flushed = flush_all(options["batch_size"])
+            if flushed or options["once"]:
+                self.stdout.write(
+                    f"Flushed {flushed} movies in {time.monotonic() - started:.3f}s "
+                    f"({dirty_movies.depth()} still queued)"
+                )
+            if options["once"]:
+                return
+            close_old_connections()
+            time.sleep(options["interval"])
@@ -2,9 +2,11 @@ from decimal import Decimal
 
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django_prometheus.models import ExportModelOperationsMixin
 
+from .aggregates import deferred_mode_enabled, mark_movie_dirty
+
 
 class Review(ExportModelOperationsMixin('review'), models.Model):
     movie = models.ForeignKey("movies.Movie", on_delete=models.CASCADE, related_name="reviews")
@@ -44,14 +46,67 @@ class Rating(ExportModelOperationsMixin('rating'), models.Model):
         ]
         constraints = [models.UniqueConstraint(fields=["movie", "user"], name="unique_rating_per_movie_user")]
 
+    _stored_movie_id = None
+    _stored_score = None
+
     def __str__(self):
         return f"{self.score} stars by {self.user.username} for {self.movie.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_stored_state()
+        return instance
+
+    def _remember_stored_state(self):
+        """Keep the persisted movie/score so later writes can apply a delta."""
+        score = self.__dict__.get("score")
+        self._stored_movie_id = self.__dict__.get("movie_id")
+        self._stored_score = Decimal(str(score)) if score is not None else None
+
+    def _apply_to_movie(self, movie_id, score_delta, count_delta):
+        from movies.models import Movie  # pylint: disable=import-outside-toplevel
+
+        if deferred_mode_enabled():
+            mark_movie_dirty(movie_id)
+            return
+
+        totals = Movie.apply_rating_delta(movie_id, score_delta, count_delta)
+        movie_field = self._meta.get_field("movie")
+        if totals and movie_field.is_cached(self) and self.movie.pk == movie_id:
+            self.movie.rating_sum, self.movie.total_ratings, self.movie.average_rating = totals
+            self.movie.remember_ratings(("rating_sum", "total_ratings", "average_rating"))
+
+    def _apply_score_change(self, score):
+        if self._stored_score is None and deferred_mode_enabled():
+            mark_movie_dirty(self.movie_id)
+        elif self._stored_score is None:
+            # Instance was not loaded from the database, so the previous score is unknown.
+            self.movie.update_rating()
+        elif self._stored_movie_id != self.movie_id:
+            self._apply_to_movie(self._stored_movie_id, -self._stored_score, -1)
+            self._apply_to_movie(self.movie_id, score, 1)
+        elif self._stored_score != score:
+            self._apply_to_movie(self.movie_id, score - self._stored_score, 0)
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.movie.update_rating()
+        adding = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        touches_score = update_fields is None or bool({"score", "movie"} & set(update_fields))
+        score = Decimal(str(self.score))
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                self._apply_to_movie(self.movie_id, score, 1)
+            elif touches_score:
+                self._apply_score_change(score)
+        self._remember_stored_state()
+
+    def remove_from_movie(self):
+        """Take this deleted rating's stored score out of its movie's aggregates.
 
-    def delete(self, *args, **kwargs):
-        movie = self.movie
-        super().delete(*args, **kwargs)
-        movie.update_rating()
+        Called by ``reviews.signals`` for every deleted rating, so cascades and
+        queryset deletes are counted like ``Rating.delete()``.
+        """
+        score = Decimal(str(self.score if self._stored_score is None else self._stored_score))
+        self._apply_to_movie(self._stored_movie_id or self.movie_id, -score, -1)
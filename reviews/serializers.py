@@ -63,8 +63,6 @@ class ReviewSerializer(serializers.ModelSerializer):
 
         # Create or update the rating
         Rating.objects.update_or_create(movie=review.movie, user=review.user, defaults={"score": score})
-
-        review.movie.update_rating()
         return review
 
     def update(self, instance, validated_data):
@@ -72,7 +70,6 @@ class ReviewSerializer(serializers.ModelSerializer):
             score = validated_data.pop("score")
             # Update the associated rating
             Rating.objects.update_or_create(movie=instance.movie, user=instance.user, defaults={"score": score})
-            instance.movie.update_rating()
 
         # Update the review
         review = super().update(instance, validated_data)
@@ -103,11 +100,4 @@ class RatingSerializer(serializers.ModelSerializer):
         validated_data["user"] = self.context["request"].user
         movie_id = validated_data.pop("movie_id")
         validated_data["movie"] = Movie.objects.get(id=movie_id)
-        rating = super().create(validated_data)
-        rating.movie.update_rating()
-        return rating
-
-    def update(self, instance, validated_data):
-        rating = super().update(instance, validated_data)
-        rating.movie.update_rating()
-        return rating
+        return super().create(validated_data)
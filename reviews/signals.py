@@ -0,0 +1,25 @@
+# Signal handlers for reviews app
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from movies.models import Movie
+
+from .models import Rating
+
+
+def _deletes_movie(origin):
+    """Whether the delete that started at ``origin`` is deleting movies, so every rating in it goes with its movie."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is Movie
+
+
+@receiver(post_delete, sender=Rating)
+def remove_deleted_rating(sender, instance, origin=None, **kwargs):
+    """Shift the movie's aggregates for every deleted rating, including cascades from deleting its rater.
+
+    Ratings deleted along with their movie are skipped: the movie's totals leave
+    its director and movement with the movie itself.
+    """
+    if not _deletes_movie(origin):
+        instance.remove_from_movie()
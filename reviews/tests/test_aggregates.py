@@ -0,0 +1,87 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from movies.models import Movie
+from reviews.aggregates import dirty_movies, flush_dirty_movies
+from reviews.models import Rating
+
+User = get_user_model()
+
+
+@override_settings(RATING_AGGREGATES_MODE="deferred")
+class DeferredRatingAggregateTests(TestCase):
+    def setUp(self):
+        dirty_movies.pop(dirty_movies.depth())
+        self.users = [
+            User.objects.create_user(username=f"rater{i}", email=f"rater{i}@example.com", password="testpass123")
+            for i in range(3)
+        ]
+        self.movies = [
+            Movie.objects.create(
+                title=f"Test Movie {i}",
+                director="Test Director",
+                release_year=2020,
+                description="Test Description",
+                runtime=120,
+                country="Test Country",
+                movement="Test Movement",
+            )
+            for i in range(2)
+        ]
+
+    def test_writes_only_mark_movie_dirty(self):
+        """Test that deferred writes queue the movie instead of updating it"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Rating.objects.create(user=self.users[0], movie=self.movies[0], score=Decimal("4.0"))
+            Rating.objects.create(user=self.users[1], movie=self.movies[0], score=Decimal("3.0"))
+        self.movies[0].refresh_from_db()
+        self.assertEqual(self.movies[0].total_ratings, 0)
+        self.assertEqual(dirty_movies.depth(), 1)
+
+    def test_flush_recomputes_dirty_movies(self):
+        """Test that a flush recomputes every dirty movie and empties the queue"""
+        with self.captureOnCommitCallbacks(execute=True):
+            for user, score in zip(self.users, ("4.0", "3.0", "5.0")):
+                Rating.objects.create(user=user, movie=self.movies[0], score=Decimal(score))
+            Rating.objects.create(user=self.users[0], movie=self.movies[1], score=Decimal("2.5"))
+
+        self.assertEqual(flush_dirty_movies(), 2)
+        self.assertEqual(dirty_movies.depth(), 0)
+        for movie in self.movies:
+            movie.refresh_from_db()
+        self.assertEqual((self.movies[0].total_ratings, self.movies[0].average_rating), (3, Decimal("4.00")))
+        self.assertEqual((self.movies[1].total_ratings, self.movies[1].rating_sum), (1, Decimal("2.5")))
+
+    def test_flush_respects_batch_size(self):
+        """Test that each flush handles at most one batch"""
+        with self.captureOnCommitCallbacks(execute=True):
+            for movie in self.movies:
+                Rating.objects.create(user=self.users[0], movie=movie, score=Decimal("4.0"))
+        self.assertEqual(flush_dirty_movies(batch_size=1), 1)
+        self.assertEqual(dirty_movies.depth(), 1)
+
+    def test_delete_marks_movie_dirty(self):
+        """Test that deleting a rating is picked up by the next flush"""
+        with self.captureOnCommitCallbacks(execute=True):
+            rating = Rating.objects.create(user=self.users[0], movie=self.movies[0], score=Decimal("4.0"))
+        flush_dirty_movies()
+        with self.captureOnCommitCallbacks(execute=True):
+            rating.delete()
+        flush_dirty_movies()
+        self.movies[0].refresh_from_db()
+        self.assertEqual(self.movies[0].total_ratings, 0)
+        self.assertEqual(self.movies[0].average_rating, Decimal("0.00"))
+
+    def test_management_command_drains_queue(self):
+        """Test the flush_rating_aggregates command in --once mode"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Rating.objects.create(user=self.users[0], movie=self.movies[0], score=Decimal("4.5"))
+        out = StringIO()
+        call_command("flush_rating_aggregates", "--once", stdout=out)
+        self.assertIn("Flushed 1 movies", out.getvalue())
+        self.movies[0].refresh_from_db()
+        self.assertEqual(self.movies[0].average_rating, Decimal("4.50"))
@@ -0,0 +1,61 @@
+"""Tests for the row-based read path of the review and rating endpoints."""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from movies.models import Movie
+from movies.tests.test_fastpath import ReadPathTestMixin
+from reviews.models import Rating, Review
+from reviews.views import RatingViewSet, ReviewViewSet
+
+User = get_user_model()
+
+
+class ReviewReadPathTests(ReadPathTestMixin, TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f"user{i}", email=f"user{i}@example.com", password="testpass123")
+            for i in range(3)
+        ]
+        self.movie = Movie.objects.create(
+            title="Stalker",
+            director="Andrei Tarkovsky",
+            release_year=1979,
+            description="The Zone",
+            runtime=162,
+            country="USSR",
+            movement="Soviet Poetic Cinema",
+        )
+        for user, score in zip(self.users, (Decimal("5.0"), Decimal("3.5"))):
+            Rating.objects.create(movie=self.movie, user=user, score=score)
+        # The last review has no rating, so its rating_score is null.
+        self.reviews = [
+            Review.objects.create(movie=self.movie, user=user, text=f"Review «{user.username}»\n")
+            for user in self.users
+        ]
+
+    def test_review_responses_match(self):
+        """Test that review list and detail responses are byte-identical to the serializer path"""
+        self.assertSameResponse(ReviewViewSet, "/api/v1/reviews/reviews/")
+        self.assertSameResponse(ReviewViewSet, "/api/v1/reviews/reviews/", {"movie": self.movie.pk})
+        review = self.reviews[0]
+        self.assertSameResponse(
+            ReviewViewSet, f"/api/v1/reviews/reviews/{review.pk}/", actions={"get": "retrieve"}, pk=str(review.pk)
+        )
+
+    def test_rating_responses_match(self):
+        """Test that rating list and detail responses are byte-identical to the serializer path"""
+        self.assertSameResponse(RatingViewSet, "/api/v1/reviews/ratings/", {"ordering": "score"})
+        rating = Rating.objects.first()
+        self.assertSameResponse(
+            RatingViewSet, f"/api/v1/reviews/ratings/{rating.pk}/", actions={"get": "retrieve"}, pk=str(rating.pk)
+        )
+
+    def test_review_list_query_count(self):
+        """Test that the review list no longer issues a rating query per review"""
+        # Count estimate, exact count and the page itself, with rating scores joined in.
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/v1/reviews/reviews/")
+        self.assertEqual([review["rating_score"] for review in response.json()["results"]], [None, "3.5", "5.0"])
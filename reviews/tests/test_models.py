@@ -1,10 +1,12 @@
+import re
 import threading
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError, transaction
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 
 from movies.models import Movie
 from reviews.models import Rating, Review
@@ -288,3 +290,172 @@ class RatingTransactionTests(TransactionTestCase):
         self.movie.refresh_from_db()
         self.assertEqual(self.movie.average_rating, Decimal("5.0"))
         self.assertEqual(self.movie.total_ratings, 1)
+
+
+class RatingAggregateTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f"rater{i}", email=f"rater{i}@example.com", password="testpass123")
+            for i in range(3)
+        ]
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            director="Test Director",
+            release_year=2020,
+            description="Test Description",
+            runtime=120,
+            country="Test Country",
+            movement="Test Movement",
+        )
+
+    def movie_updates(self, queries):
+        # Rating deltas reach the movie (and its director and movement) in one statement, possibly a CTE.
+        return [q["sql"] for q in queries if re.search(r'\bUPDATE "?movies_movie"?\s', q["sql"])]
+
+    def test_running_sum_tracks_writes(self):
+        """Test that inserts, updates and deletes shift the stored aggregates"""
+        first = Rating.objects.create(user=self.users[0], movie=self.movie, score=Decimal("4.0"))
+        Rating.objects.create(user=self.users[1], movie=self.movie, score=Decimal("3.5"))
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.rating_sum, Decimal("7.5"))
+        self.assertEqual(self.movie.total_ratings, 2)
+        self.assertEqual(self.movie.average_rating, Decimal("3.75"))
+
+        first = Rating.objects.get(pk=first.pk)
+        first.score = Decimal("5.0")
+        first.save()
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.rating_sum, Decimal("8.5"))
+        self.assertEqual(self.movie.average_rating, Decimal("4.25"))
+
+        first.delete()
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.rating_sum, Decimal("3.5"))
+        self.assertEqual(self.movie.total_ratings, 1)
+        self.assertEqual(self.movie.average_rating, Decimal("3.50"))
+
+    def test_cached_movie_instance_is_refreshed(self):
+        """Test that the rating's cached movie sees the new aggregates without a reload"""
+        rating = Rating.objects.create(user=self.users[0], movie=self.movie, score=Decimal("4.5"))
+        self.assertEqual(self.movie.total_ratings, 1)
+        self.assertEqual(rating.movie.average_rating, Decimal("4.50"))
+
+    def test_one_movie_update_per_write(self):
+        """Test that each logical rating write issues exactly one movie UPDATE"""
+        with CaptureQueriesContext(connection) as context:
+            rating = Rating.objects.create(user=self.users[0], movie=self.movie, score=Decimal("4.0"))
+        self.assertEqual(len(self.movie_updates(context.captured_queries)), 1)
+
+        with CaptureQueriesContext(connection) as context:
+            Rating.objects.update_or_create(movie=self.movie, user=self.users[0], defaults={"score": Decimal("2.0")})
+        self.assertEqual(len(self.movie_updates(context.captured_queries)), 1)
+
+        rating.refresh_from_db()
+        with CaptureQueriesContext(connection) as context:
+            rating.delete()
+        self.assertEqual(len(self.movie_updates(context.captured_queries)), 1)
+
+    def test_unchanged_score_skips_movie_update(self):
+        """Test that re-saving the same score leaves the movie row alone"""
+        Rating.objects.create(user=self.users[0], movie=self.movie, score=Decimal("4.0"))
+        with CaptureQueriesContext(connection) as context:
+            Rating.objects.update_or_create(movie=self.movie, user=self.users[0], defaults={"score": Decimal("4.0")})
+        self.assertEqual(self.movie_updates(context.captured_queries), [])
+
+    def test_moving_rating_between_movies(self):
+        """Test that reassigning a rating moves its contribution"""
+        other = Movie.objects.create(
+            title="Other Movie",
+            director="Test Director",
+            release_year=2021,
+            description="Test Description",
+            runtime=100,
+            country="Test Country",
+            movement="Test Movement",
+        )
+        rating = Rating.objects.create(user=self.users[0], movie=self.movie, score=Decimal("4.0"))
+        rating = Rating.objects.get(pk=rating.pk)
+        rating.movie = other
+        rating.save()
+        self.movie.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.movie.total_ratings, self.movie.rating_sum), (0, Decimal("0.0")))
+        self.assertEqual((other.total_ratings, other.average_rating), (1, Decimal("4.00")))
+
+    def test_cascade_deletes_shift_aggregates(self):
+        """Test that cascade and queryset deletes shift the aggregates, and a stale movie save keeps them"""
+        stale = Movie.objects.get(pk=self.movie.pk)
+        for user, score in zip(self.users, ("4.0", "2.0", "5.0")):
+            Rating.objects.create(user=user, movie=self.movie, score=Decimal(score))
+
+        self.users[0].delete()
+        self.movie.refresh_from_db()
+        self.assertEqual((self.movie.total_ratings, self.movie.rating_sum), (2, Decimal("7.0")))
+
+        Rating.objects.filter(user=self.users[1]).delete()
+        stale.title = "Retitled Movie"
+        stale.save()
+        self.movie.refresh_from_db()
+        self.assertEqual((self.movie.title, self.movie.total_ratings), ("Retitled Movie", 1))
+
+        Rating.objects.create(user=self.users[1], movie=self.movie, score=Decimal("3.0"))
+        self.movie.refresh_from_db()
+        self.assertEqual((self.movie.total_ratings, self.movie.average_rating), (2, Decimal("4.00")))
+        self.assertEqual(self.movie.total_ratings, Rating.objects.filter(movie=self.movie).count())
+        director = self.movie.director_ref
+        director.refresh_from_db()
+        self.assertEqual((director.rating_count, director.rating_sum), (2, Decimal("8.0")))
+
+    def test_edited_aggregates_are_saved_only_when_named(self):
+        """Test that a plain save keeps aggregates edited in memory out with a warning, and update_fields writes them"""
+        Rating.objects.create(user=self.users[0], movie=self.movie, score=Decimal("4.0"))
+        self.movie.title = "Retitled Movie"
+        with self.assertNoLogs("movies.models", "WARNING"):
+            self.movie.save()
+
+        movie = Movie.objects.get(pk=self.movie.pk)
+        movie.average_rating = Decimal("1.00")
+        with self.assertLogs("movies.models", "WARNING") as logs:
+            movie.save()
+        self.assertIn("average_rating", logs.output[0])
+        movie.refresh_from_db()
+        self.assertEqual(movie.average_rating, Decimal("4.00"))
+
+        movie.average_rating = Decimal("1.00")
+        with self.assertNoLogs("movies.models", "WARNING"):
+            movie.save(update_fields=["average_rating"])
+        movie.refresh_from_db()
+        self.assertEqual(movie.average_rating, Decimal("1.00"))
+        with self.assertNoLogs("movies.models", "WARNING"):
+            movie.save()
+
+    def test_deleting_rated_movie_leaves_entity_totals(self):
+        """Test that deleting a rated movie takes its ratings out of its director exactly once"""
+        other = Movie.objects.create(
+            title="Other Movie",
+            director="Test Director",
+            release_year=2021,
+            description="Test Description",
+            runtime=100,
+            country="Test Country",
+            movement="Test Movement",
+        )
+        Rating.objects.create(user=self.users[0], movie=self.movie, score=Decimal("4.0"))
+        Rating.objects.create(user=self.users[1], movie=self.movie, score=Decimal("2.0"))
+        Rating.objects.create(user=self.users[0], movie=other, score=Decimal("3.0"))
+
+        Movie.objects.get(pk=self.movie.pk).delete()
+        director = other.director_ref
+        director.refresh_from_db()
+        self.assertEqual((director.movie_count, director.rating_count, director.rating_sum), (1, 1, Decimal("3.0")))
+
+    def test_update_rating_reconciles_bulk_writes(self):
+        """Test that a full recompute repairs aggregates after bulk inserts"""
+        Rating.objects.bulk_create(
+            [Rating(user=user, movie=self.movie, score=Decimal(score)) for user, score in zip(self.users, "345")]
+        )
+        self.movie.update_rating()
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.rating_sum, Decimal("12.0"))
+        self.assertEqual(self.movie.total_ratings, 3)
+        self.assertEqual(self.movie.average_rating, Decimal("4.00"))
@@ -1,25 +1,43 @@
 # pylint: disable=relative-beyond-top-level
+from django.db.models import OuterRef, Subquery, TextField
+from django.db.models.functions import Cast
 from django.shortcuts import get_object_or_404
 from rest_framework import filters, permissions, serializers, viewsets
 from rest_framework.authentication import BasicAuthentication, SessionAuthentication
-from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from movies.conditional import ConditionalGetMixin
+from movies.fastpath import ReadPlanMixin
 from movies.models import Movie
+from movies.parsers import FastJSONParser, MessagePackParser
 
 from .models import Rating, Review
 from .permissions import IsOwnerOrReadOnly
 from .serializers import RatingSerializer, ReviewSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, ReadPlanMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     authentication_classes = [JWTAuthentication, SessionAuthentication, BasicAuthentication]
-    parser_classes = (MultiPartParser, FormParser, JSONParser)
+    parser_classes = (MultiPartParser, FormParser, FastJSONParser, MessagePackParser)
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ["created_at"]
     ordering = ["-created_at"]
+    # Usernames are not versioned: users.user is bumped by every login's last_login update.
+    version_models = ("reviews.review", "reviews.rating", "movies.movie")
+    read_sources = (
+        ("user", "user__username"),
+        # str() of the stored score, as ReviewSerializer.get_rating_score returns it.
+        (
+            "rating_score",
+            Cast(
+                Subquery(Rating.objects.filter(movie=OuterRef("movie"), user=OuterRef("user")).values("score")[:1]),
+                TextField(),
+            ),
+        ),
+    )
 
     def get_queryset(self):
         queryset = Review.objects.select_related("user", "movie")
@@ -55,13 +73,15 @@ class ReviewViewSet(viewsets.ModelViewSet):
             self.permission_denied(request)
 
 
-class RatingViewSet(viewsets.ModelViewSet):
+class RatingViewSet(ConditionalGetMixin, ReadPlanMixin, viewsets.ModelViewSet):
     serializer_class = RatingSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     authentication_classes = [JWTAuthentication, SessionAuthentication, BasicAuthentication]
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ["created_at", "score"]
     ordering = ["-created_at"]
+    read_sources = (("user", "user__username"),)
+    version_models = ("reviews.rating", "movies.movie")
 
     def get_queryset(self):
         queryset = Rating.objects.select_related("user", "movie")
@@ -81,17 +101,9 @@ class RatingViewSet(viewsets.ModelViewSet):
         rating, _ = Rating.objects.update_or_create(
             movie=movie, user=self.request.user, defaults={"score": serializer.validated_data["score"]}
         )
-        movie.update_rating()
         serializer.instance = rating  # Set the instance so it's included in the response
         return rating
 
-    def perform_destroy(self, instance):
-        movie = instance.movie
-        super().perform_destroy(instance)
-        # Force a refresh from the database to ensure we have the latest state
-        movie.refresh_from_db()
-        movie.update_rating()
-
     def check_object_permissions(self, request, obj):
         """Explicitly check object permissions"""
         super().check_object_permissions(request, obj)
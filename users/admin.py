@@ -2,6 +2,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
+from movies.pagination import CountingPaginator
+
 from .models import User, UserFavoriteMovie
 
 
@@ -10,6 +12,8 @@ class CustomUserAdmin(UserAdmin):
     list_display = ("username", "email", "is_staff", "date_joined")
     search_fields = ("username", "email")
     ordering = ("-date_joined",)
+    paginator = CountingPaginator
+    show_full_result_count = False
 
     fieldsets = (
         (None, {"fields": ("username", "password")}),
@@ -35,3 +39,5 @@ class UserFavoriteMovieAdmin(admin.ModelAdmin):
     list_filter = ("created_at",)
     search_fields = ("user__username", "movie__title")
     ordering = ("-created_at",)
+    paginator = CountingPaginator
+    show_full_result_count = False
@@ -9,6 +9,7 @@ router = DefaultRouter()
 router.register(r"users", views.UserViewSet)
 
 urlpatterns = [
+    path("me/recommendations/", views.RecommendationsView.as_view(), name="user-recommendations"),
     path("", include(router.urls)),
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
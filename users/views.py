@@ -11,6 +11,12 @@ from django.views.generic.edit import CreateView, UpdateView
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from movies.fragments import TimedTemplateResponse
+from movies.models import Movie
+from movies.recommender import recommend_movies
+from movies.serializers import MovieListSerializer
 
 from .forms import UserRegistrationForm, UserUpdateForm
 from .serializers import UserCreateSerializer, UserSerializer, UserUpdateSerializer
@@ -40,9 +46,21 @@ class LogoutView(AuthLogoutView):
     next_page = reverse_lazy("movies:movie-list")
 
 
-class ProfileView(LoginRequiredMixin, UpdateView):
+class ProfileContextMixin:
+    """The favorites and reviews ``users/profile.html`` lists, each review with its movie."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        user = self.get_object()
+        context["favorite_movies"] = user.favorite_movies
+        context["user_reviews"] = user.reviews.select_related("movie")
+        return context
+
+
+class ProfileView(LoginRequiredMixin, ProfileContextMixin, UpdateView):
     model = User
     template_name = "users/profile.html"
+    response_class = TimedTemplateResponse
     fields = ["email", "bio", "profile_image"]
     success_url = reverse_lazy("users:profile")
 
@@ -65,9 +83,10 @@ class ProfileView(LoginRequiredMixin, UpdateView):
         return super().form_invalid(form)
 
 
-class ProfileUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
+class ProfileUpdateView(LoginRequiredMixin, ProfileContextMixin, SuccessMessageMixin, UpdateView):
     model = User
     template_name = "users/profile.html"
+    response_class = TimedTemplateResponse
     form_class = UserUpdateForm
     success_url = reverse_lazy("users:profile")
     success_message = "Your profile was updated successfully."
@@ -79,6 +98,7 @@ class ProfileUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
 class FavoritesView(LoginRequiredMixin, ListView):
     template_name = "users/favorites.html"
     context_object_name = "favorite_movies"
+    response_class = TimedTemplateResponse
 
     def get_queryset(self):
         return self.request.user.favorited_movies.all()
@@ -123,3 +143,32 @@ class UserViewSet(viewsets.ModelViewSet):
             serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class RecommendationsView(APIView):
+    """Movies the current user has not rated, best predicted first, with their ``predicted_rating``.
+
+    Predictions come from the model trained offline by ``manage.py train_recommender``;
+    ``personalized`` is false (and ``results`` empty) until it has been trained, and users
+    who joined or first rated after the last run get no results until the next one.
+    ``?limit=`` defaults to 10 and is capped at ``MAX_LIMIT``.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_LIMIT = 100
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), self.MAX_LIMIT)
+        except ValueError:
+            limit = 10
+        recommendations = recommend_movies(request.user.pk, limit)
+        if recommendations is None:
+            return Response({"personalized": False, "results": []})
+        movies = Movie.objects.in_bulk([movie_id for movie_id, _ in recommendations])
+        # Movies deleted since training are dropped.
+        ranked = [(movies[movie_id], predicted) for movie_id, predicted in recommendations if movie_id in movies]
+        results = MovieListSerializer([movie for movie, _ in ranked], many=True).data
+        for entry, (_, predicted) in zip(results, ranked):
+            entry["predicted_rating"] = round(min(max(predicted, 0.0), 5.0), 2)
+        return Response({"personalized": True, "results": results})